@@ -1,20 +1,40 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, select
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import joinedload
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 import os
 from dotenv import load_dotenv
 import json
+import threading
+from proctor_pool import ProctorPool
+from violation_writer import ViolationWriter
+from scoring import ScoringEngine
+from question_index import QuestionIndex
+from exam_session_store import create_exam_session_store, session_ttl
+from event_hub import EventHub
+from pagination import keyset_paginate, stream_csv
+from query_budget import QueryCounter, query_budget
+from dashboard_stats import DashboardStats
+from db_pool import database_url, engine_options, pool_stats
+from soal_io import SOAL_FIELDS, soal_hash
+from preprocess import capture_config
+from monitoring_wall import BOUNDARY, MonitoringWall
 
 load_dotenv()
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'mysql+pymysql://root:@localhost/ujian_proctor'
+app.config['SQLALCHEMY_DATABASE_URI'] = database_url()
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options()
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 db = SQLAlchemy(app)
+query_counter = QueryCounter(app)
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
@@ -28,6 +48,11 @@ class User(UserMixin, db.Model):
     role = db.Column(db.String(20), nullable=False, default='siswa')  # admin, siswa
     nama_lengkap = db.Column(db.String(100), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Index juga dibuat oleh migrations/0001 untuk database yang sudah ada
+    __table_args__ = (
+        db.Index('ix_user_role_id', 'role', 'id'),
+    )
 
 class BankSoal(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -40,6 +65,33 @@ class BankSoal(db.Model):
     kategori = db.Column(db.String(50), nullable=False)
     tingkat_kesulitan = db.Column(db.String(20), default='sedang')  # mudah, sedang, sulit
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    soal_hash = db.Column(db.String(64))  # dedup import, lihat soal_io.soal_hash
+    
+    __table_args__ = (
+        db.Index('ix_bank_soal_kategori_id', 'kategori', 'id', 'tingkat_kesulitan'),
+        db.Index('uq_bank_soal_soal_hash', 'soal_hash', unique=True),
+    )
+
+SOAL_HASH_FIELDS = ('pertanyaan', 'pilihan_a', 'pilihan_b', 'pilihan_c', 'pilihan_d')
+
+@event.listens_for(BankSoal, 'before_insert')
+def set_soal_hash(mapper, connection, target):
+    target.soal_hash = soal_hash(*(getattr(target, field) for field in SOAL_HASH_FIELDS))
+
+@event.listens_for(BankSoal, 'before_update')
+def update_soal_hash(mapper, connection, target):
+    # Hanya dihitung ulang jika isi soal berubah: soal lama yang hash-nya NULL
+    # (duplikat saat backfill migration 0002) tetap bisa diedit kolom lainnya
+    state = sa_inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in SOAL_HASH_FIELDS):
+        return
+    value = soal_hash(*(getattr(target, field) for field in SOAL_HASH_FIELDS))
+    table = BankSoal.__table__
+    duplicate = connection.execute(
+        select(table.c.id).where(table.c.soal_hash == value, table.c.id != target.id).limit(1)
+    ).first()
+    # Soal hasil edit yang sama dengan soal lain disimpan tanpa hash, seperti backfill
+    target.soal_hash = None if duplicate else value
 
 class Ujian(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -49,12 +101,17 @@ class Ujian(db.Model):
     durasi_menit = db.Column(db.Integer, nullable=False)
     status = db.Column(db.String(20), default='aktif')  # aktif, nonaktif
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_ujian_status_id', 'status', 'id'),
+    )
 
 class HasilUjian(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     ujian_id = db.Column(db.Integer, db.ForeignKey('ujian.id'), nullable=False)
     jawaban = db.Column(db.Text, nullable=False)  # JSON format
+    soal_ids = db.Column(db.Text)  # JSON list soal yang diberikan ke peserta
     nilai = db.Column(db.Float, nullable=False)
     waktu_mulai = db.Column(db.DateTime, nullable=False)
     waktu_selesai = db.Column(db.DateTime, nullable=False)
@@ -63,6 +120,12 @@ class HasilUjian(db.Model):
     
     user = db.relationship('User', backref=db.backref('hasil_ujian', lazy=True))
     ujian = db.relationship('Ujian', backref=db.backref('hasil_ujian', lazy=True))
+    
+    # Satu hasil per siswa per ujian: submit ganda ditolak oleh database
+    __table_args__ = (
+        db.Index('uq_hasil_ujian_user_ujian', 'user_id', 'ujian_id', unique=True),
+        db.Index('ix_hasil_ujian_ujian_id', 'ujian_id', 'id'),
+    )
 
 class LogPelanggaran(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -75,6 +138,22 @@ class LogPelanggaran(db.Model):
     
     user = db.relationship('User', backref=db.backref('log_pelanggaran', lazy=True))
     ujian = db.relationship('Ujian', backref=db.backref('log_pelanggaran', lazy=True))
+    
+    # Kunci urutan listing admin (keyset pagination), dengan dan tanpa filter
+    __table_args__ = (
+        db.Index('ix_log_pelanggaran_timestamp_id', 'timestamp', 'id'),
+        db.Index('ix_log_pelanggaran_ujian_timestamp', 'ujian_id', 'timestamp', 'id'),
+        db.Index('ix_log_pelanggaran_user_timestamp', 'user_id', 'timestamp', 'id'),
+    )
+
+# Query profile: relasi yang ikut dimuat agar template tidak memicu query per baris
+HASIL_PROFILE = (joinedload(HasilUjian.user), joinedload(HasilUjian.ujian))
+PELANGGARAN_PROFILE = (joinedload(LogPelanggaran.user), joinedload(LogPelanggaran.ujian))
+
+scoring_engine = ScoringEngine(db, BankSoal, HasilUjian)
+question_index = QuestionIndex(db, BankSoal)
+exam_sessions = create_exam_session_store()
+dashboard_stats = DashboardStats(app, db, BankSoal, Ujian, User, HasilUjian, LogPelanggaran)
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -117,43 +196,80 @@ def logout():
 
 @app.route('/admin/dashboard')
 @login_required
+@query_budget(1)
 def admin_dashboard():
     if current_user.role != 'admin':
         return redirect(url_for('siswa_dashboard'))
     
-    total_soal = BankSoal.query.count()
-    total_ujian = Ujian.query.count()
-    total_siswa = User.query.filter_by(role='siswa').count()
-    total_hasil = HasilUjian.query.count()
-    
+    # Counter dan agregat dibaca dari memori, bukan COUNT(*) per request
     return render_template('admin/dashboard.html', 
-                         total_soal=total_soal,
-                         total_ujian=total_ujian, 
-                         total_siswa=total_siswa,
-                         total_hasil=total_hasil)
+                         statistik_ujian=dashboard_stats.ujian_summary(),
+                         **dashboard_stats.snapshot())
 
 @app.route('/siswa/dashboard')
 @login_required
+@query_budget(4)
 def siswa_dashboard():
     if current_user.role != 'siswa':
         return redirect(url_for('admin_dashboard'))
     
     ujian_tersedia = Ujian.query.filter_by(status='aktif').all()
-    hasil_ujian = HasilUjian.query.filter_by(user_id=current_user.id).all()
+    hasil_ujian = HasilUjian.query.options(joinedload(HasilUjian.ujian)) \
+        .filter_by(user_id=current_user.id).all()
     
     return render_template('siswa/dashboard.html', 
                          ujian_tersedia=ujian_tersedia,
                          hasil_ujian=hasil_ujian)
 
 # Admin Routes
+def admin_filters():
+    """Filter listing admin dari query string"""
+    filters = {}
+    for name in ('ujian_id', 'user_id'):
+        value = request.args.get(name, type=int)
+        if value:
+            filters[name] = value
+    for name in ('level', 'status', 'kategori'):
+        value = request.args.get(name)
+        if value:
+            filters[name] = value
+    return filters
+
+def csv_response(filename, header, rows):
+    """Response CSV yang di-stream baris demi baris"""
+    return Response(stream_with_context(stream_csv(header, rows)),
+                    mimetype='text/csv',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
 @app.route('/admin/bank-soal')
 @login_required
+@query_budget(3)
 def admin_bank_soal():
     if current_user.role != 'admin':
         return redirect(url_for('siswa_dashboard'))
     
-    soal_list = BankSoal.query.all()
-    return render_template('./admin/bank_soal.html', soal_list=soal_list)
+    filters = admin_filters()
+    query = BankSoal.query
+    if 'kategori' in filters:
+        query = query.filter(BankSoal.kategori == filters['kategori'])
+    
+    page = keyset_paginate(query, [BankSoal.id], after=request.args.get('after'),
+                           per_page=request.args.get('per_page', type=int))
+    return render_template('./admin/bank_soal.html', soal_list=page.items, page=page, filters=filters)
+
+@app.route('/admin/bank-soal/export.csv')
+@login_required
+def admin_bank_soal_export():
+    if current_user.role != 'admin':
+        return redirect(url_for('siswa_dashboard'))
+    
+    # Format sama dengan input import_soal.py
+    query = db.session.query(*(getattr(BankSoal, field) for field in SOAL_FIELDS))
+    filters = admin_filters()
+    if 'kategori' in filters:
+        query = query.filter(BankSoal.kategori == filters['kategori'])
+    rows = query.order_by(BankSoal.id).yield_per(1000)
+    return csv_response('bank_soal.csv', SOAL_FIELDS, rows)
 
 @app.route('/admin/ujian')
 @login_required
@@ -166,30 +282,98 @@ def admin_ujian():
 
 @app.route('/admin/peserta')
 @login_required
+@query_budget(3)
 def admin_peserta():
     if current_user.role != 'admin':
         return redirect(url_for('siswa_dashboard'))
     
-    peserta_list = User.query.filter_by(role='siswa').all()
-    return render_template('admin/peserta.html', peserta_list=peserta_list)
+    page = keyset_paginate(User.query.filter_by(role='siswa'), [User.id],
+                           after=request.args.get('after'),
+                           per_page=request.args.get('per_page', type=int))
+    return render_template('admin/peserta.html', peserta_list=page.items, page=page, filters={})
+
+def filter_hasil(query, filters):
+    if 'ujian_id' in filters:
+        query = query.filter(HasilUjian.ujian_id == filters['ujian_id'])
+    if 'user_id' in filters:
+        query = query.filter(HasilUjian.user_id == filters['user_id'])
+    if 'status' in filters:
+        query = query.filter(HasilUjian.status_ujian == filters['status'])
+    return query
 
 @app.route('/admin/hasil')
 @login_required
+@query_budget(3)
 def admin_hasil():
     if current_user.role != 'admin':
         return redirect(url_for('siswa_dashboard'))
     
-    hasil_list = HasilUjian.query.all()
-    return render_template('admin/hasil.html', hasil_list=hasil_list)
+    filters = admin_filters()
+    query = filter_hasil(HasilUjian.query.options(*HASIL_PROFILE), filters)
+    page = keyset_paginate(query, [HasilUjian.id],
+                           after=request.args.get('after'),
+                           per_page=request.args.get('per_page', type=int),
+                           descending=True)
+    return render_template('admin/hasil.html', hasil_list=page.items, page=page, filters=filters)
+
+@app.route('/admin/hasil/export.csv')
+@login_required
+def admin_hasil_export():
+    if current_user.role != 'admin':
+        return redirect(url_for('siswa_dashboard'))
+    
+    query = db.session.query(
+        HasilUjian.id, User.username, User.nama_lengkap, Ujian.nama_ujian, HasilUjian.nilai,
+        HasilUjian.waktu_mulai, HasilUjian.waktu_selesai, HasilUjian.jumlah_pelanggaran,
+        HasilUjian.status_ujian
+    ).join(User, HasilUjian.user_id == User.id).join(Ujian, HasilUjian.ujian_id == Ujian.id)
+    rows = filter_hasil(query, admin_filters()).order_by(HasilUjian.id.desc()).yield_per(1000)
+    
+    header = ['id', 'username', 'nama_lengkap', 'ujian', 'nilai', 'waktu_mulai',
+              'waktu_selesai', 'jumlah_pelanggaran', 'status']
+    return csv_response('hasil_ujian.csv', header, rows)
+
+def filter_pelanggaran(query, filters):
+    if 'ujian_id' in filters:
+        query = query.filter(LogPelanggaran.ujian_id == filters['ujian_id'])
+    if 'user_id' in filters:
+        query = query.filter(LogPelanggaran.user_id == filters['user_id'])
+    if 'level' in filters:
+        query = query.filter(LogPelanggaran.tingkat_pelanggaran == filters['level'])
+    return query
 
 @app.route('/admin/pelanggaran')
 @login_required
+@query_budget(3)
 def admin_pelanggaran():
     if current_user.role != 'admin':
         return redirect(url_for('siswa_dashboard'))
     
-    pelanggaran_list = LogPelanggaran.query.order_by(LogPelanggaran.timestamp.desc()).all()
-    return render_template('admin/pelanggaran.html', pelanggaran_list=pelanggaran_list)
+    filters = admin_filters()
+    query = filter_pelanggaran(LogPelanggaran.query.options(*PELANGGARAN_PROFILE), filters)
+    page = keyset_paginate(query, [LogPelanggaran.timestamp, LogPelanggaran.id],
+                           after=request.args.get('after'),
+                           per_page=request.args.get('per_page', type=int),
+                           descending=True)
+    return render_template('admin/pelanggaran.html', pelanggaran_list=page.items, page=page, filters=filters)
+
+@app.route('/admin/pelanggaran/export.csv')
+@login_required
+def admin_pelanggaran_export():
+    if current_user.role != 'admin':
+        return redirect(url_for('siswa_dashboard'))
+    
+    query = db.session.query(
+        LogPelanggaran.timestamp, User.username, User.nama_lengkap, Ujian.nama_ujian,
+        LogPelanggaran.jenis_pelanggaran, LogPelanggaran.tingkat_pelanggaran,
+        LogPelanggaran.screenshot_path
+    ).join(User, LogPelanggaran.user_id == User.id).join(Ujian, LogPelanggaran.ujian_id == Ujian.id)
+    rows = filter_pelanggaran(query, admin_filters()) \
+        .order_by(LogPelanggaran.timestamp.desc(), LogPelanggaran.id.desc()).yield_per(1000)
+    
+    header = ['timestamp', 'username', 'nama_lengkap', 'ujian', 'jenis_pelanggaran',
+              'tingkat_pelanggaran', 'screenshot_path']
+    return csv_response('log_pelanggaran.csv', header, rows)
 
 # Siswa Ujian Routes
 @app.route('/siswa/ujian/<int:ujian_id>/mulai')
@@ -206,23 +390,48 @@ def mulai_ujian(ujian_id):
         flash('Anda sudah mengerjakan ujian ini!', 'error')
         return redirect(url_for('siswa_dashboard'))
     
-    # Get random questions
-    import random
-    all_soal = BankSoal.query.filter_by(kategori=ujian.kategori).all()
-    if len(all_soal) < ujian.jumlah_soal:
-        flash('Soal tidak mencukupi untuk ujian ini!', 'error')
-        return redirect(url_for('siswa_dashboard'))
-    
-    selected_soal = random.sample(all_soal, ujian.jumlah_soal)
-    
-    # Store in session
-    session['ujian_active'] = {
-        'ujian_id': ujian_id,
-        'soal_ids': [s.id for s in selected_soal],
-        'start_time': datetime.utcnow().isoformat()
-    }
-    
-    return render_template('siswa/ujian.html', ujian=ujian, soal_list=selected_soal)
+    # Lanjutkan sesi yang masih aktif (mis. halaman di-reload)
+    active = exam_sessions.get(current_user.id, ujian_id)
+    if active:
+        selected_soal = question_index.fetch(active['soal_ids'])
+        start_time = active['start_time']
+        jawaban = active['jawaban']
+        save_seq = active['seq']
+    else:
+        selected_soal = pilih_soal(ujian)
+        if selected_soal is None:
+            flash('Soal tidak mencukupi untuk ujian ini!', 'error')
+            return redirect(url_for('siswa_dashboard'))
+        
+        # Store in server-side exam session
+        start_time = datetime.utcnow().isoformat()
+        jawaban = {}
+        save_seq = 0
+        exam_sessions.create(current_user.id, ujian_id, [s.id for s in selected_soal],
+                             start_time, session_ttl(ujian))
+    
+    elapsed = (datetime.utcnow() - datetime.fromisoformat(start_time)).total_seconds()
+    sisa_detik = max(0, int(ujian.durasi_menit * 60 - elapsed))
+    
+    return render_template('siswa/ujian.html', ujian=ujian, soal_list=selected_soal,
+                           jawaban=jawaban, sisa_detik=sisa_detik, save_seq=save_seq)
+
+def pilih_soal(ujian):
+    """Pilih soal acak untuk ujian; return None jika soal tidak mencukupi"""
+    # Sampel ID dari indeks, lalu muat soal terpilih saja
+    soal_ids = question_index.sample_ids(ujian.kategori, ujian.jumlah_soal)
+    if soal_ids is None:
+        return None
+    
+    selected_soal = question_index.fetch(soal_ids)
+    if len(selected_soal) < len(soal_ids):
+        # Ada soal yang baru dihapus: indeks usang, ambil sampel ulang sekali
+        question_index.invalidate(ujian.kategori)
+        soal_ids = question_index.sample_ids(ujian.kategori, ujian.jumlah_soal)
+        selected_soal = question_index.fetch(soal_ids) if soal_ids else []
+        if len(selected_soal) < ujian.jumlah_soal:
+            return None
+    return selected_soal
 
 # API Routes for AJAX
 @app.route('/api/ujian/submit', methods=['POST'])
@@ -233,28 +442,28 @@ def api_submit_ujian():
     jawaban = data.get('jawaban', {})
     pelanggaran_count = data.get('pelanggaran_count', 0)
     
-    if 'ujian_active' not in session:
-        return jsonify({'error': 'Ujian tidak aktif'}), 400
-    
     ujian = Ujian.query.get_or_404(ujian_id)
-    start_time = datetime.fromisoformat(session['ujian_active']['start_time'])
-    
-    # Calculate score
-    soal_ids = session['ujian_active']['soal_ids']
-    correct_answers = 0
+    active = exam_sessions.get(current_user.id, ujian.id)
+    if active is None:
+        return jsonify({'error': 'Ujian tidak aktif'}), 400
     
-    for soal_id in soal_ids:
-        soal = BankSoal.query.get(soal_id)
-        if str(soal_id) in jawaban and jawaban[str(soal_id)] == soal.jawaban_benar:
-            correct_answers += 1
+    start_time = datetime.fromisoformat(active['start_time'])
+    # Jawaban yang sudah di-autosave dilengkapi jawaban terakhir dari browser
+    jawaban = dict(active['jawaban'], **jawaban)
     
-    nilai = (correct_answers / len(soal_ids)) * 100
+    # Calculate score (kunci jawaban diambil sekali per ujian)
+    soal_ids = active['soal_ids']
+    # Hanya jawaban untuk soal sesi ini yang disimpan
+    allowed = {str(soal_id) for soal_id in soal_ids}
+    jawaban = {soal_id: pilihan for soal_id, pilihan in jawaban.items() if soal_id in allowed}
+    nilai = scoring_engine.score(ujian, soal_ids, jawaban)
     
     # Save result
     hasil = HasilUjian(
         user_id=current_user.id,
         ujian_id=ujian_id,
         jawaban=json.dumps(jawaban),
+        soal_ids=json.dumps(soal_ids),
         nilai=nilai,
         waktu_mulai=start_time,
         waktu_selesai=datetime.utcnow(),
@@ -263,34 +472,279 @@ def api_submit_ujian():
     )
     
     db.session.add(hasil)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Submit ganda (mis. dua tab): hasil pertama yang dipakai
+        db.session.rollback()
+        existing = HasilUjian.query.filter_by(user_id=current_user.id, ujian_id=ujian.id).first()
+        exam_sessions.delete(current_user.id, ujian.id)
+        return jsonify({'error': 'Ujian sudah dikumpulkan',
+                        'nilai': existing.nilai if existing else None}), 409
     
     # Clear session
-    session.pop('ujian_active', None)
+    exam_sessions.delete(current_user.id, ujian.id)
+    proctor_pool.end_session(current_user.id, ujian.id)
+    monitoring_wall.remove(current_user.id, ujian.id)
+    pop_proctor_events(current_user.id, ujian.id)
     
     return jsonify({'nilai': nilai, 'status': 'success'})
 
+@app.route('/api/admin/ujian/<int:ujian_id>/rescore', methods=['POST'])
+@login_required
+def api_admin_rescore_ujian(ujian_id):
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Akses ditolak'}), 403
+    
+    ujian = Ujian.query.get_or_404(ujian_id)
+    updated = scoring_engine.rescore_ujian(ujian)
+    # bulk update nilai tidak melewati event ORM
+    dashboard_stats.reconcile()
+    
+    return jsonify({'status': 'success', 'updated': updated})
+
+def insert_violation_rows(rows):
+    """Bulk insert baris LogPelanggaran dari ViolationWriter dalam satu transaksi"""
+    rows = [dict(row, timestamp=datetime.fromisoformat(row['timestamp'])) for row in rows]
+    with app.app_context():
+        try:
+            db.session.execute(LogPelanggaran.__table__.insert(), rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    # insert Core tidak memicu event ORM, laporkan langsung ke statistik
+    dashboard_stats.record_violations(rows)
+
+VIOLATION_LEVELS = ('ringan', 'berat')
+
+violation_writer = ViolationWriter(
+    insert_violation_rows,
+    spool_dir=os.path.join(app.instance_path, 'violation_spool'),
+    # Baris yang ditolak database (mis. NOT NULL) masuk dead-letter, bukan diulang terus
+    permanent_errors=(IntegrityError, DataError, ValueError, KeyError, TypeError)
+)
+
+def log_violation(user_id, ujian_id, message, level, screenshot_path=None):
+    """Antrekan log pelanggaran untuk ditulis secara batch; return False jika buffer penuh"""
+    return violation_writer.enqueue({
+        'user_id': user_id,
+        'ujian_id': ujian_id,
+        'jenis_pelanggaran': message,
+        'tingkat_pelanggaran': level,
+        'screenshot_path': screenshot_path,
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
+@app.route('/api/ujian/save-progress', methods=['POST'])
+@login_required
+def api_save_progress():
+    """Autosave delta: hanya jawaban yang berubah sejak autosave sebelumnya"""
+    data = request.get_json() or {}
+    ujian_id = data.get('ujian_id')
+    seq = data.get('seq')
+    changes = data.get('changes', {})
+    
+    if not isinstance(seq, int) or seq < 1 or not isinstance(changes, dict):
+        return jsonify({'error': 'Data autosave tidak valid'}), 400
+    
+    answers = {str(soal_id): pilihan for soal_id, pilihan in changes.items()
+               if pilihan in ('A', 'B', 'C', 'D')}
+    applied = exam_sessions.save_answers(current_user.id, ujian_id, answers, seq)
+    if applied is None:
+        return jsonify({'error': 'Ujian tidak aktif'}), 400
+    
+    return jsonify({'status': 'success', 'seq': seq, 'applied': applied})
+
 @app.route('/api/proctor/violation', methods=['POST'])
 @login_required
 def api_proctor_violation():
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     ujian_id = data.get('ujian_id')
     message = data.get('message')
     level = data.get('level')
     
-    # Save violation log
-    violation = LogPelanggaran(
-        user_id=current_user.id,
-        ujian_id=ujian_id,
-        jenis_pelanggaran=message,
-        tingkat_pelanggaran=level
-    )
+    # Baris yang tidak valid tidak boleh masuk antrean writer
+    if (not isinstance(ujian_id, int) or isinstance(ujian_id, bool)
+            or not isinstance(message, str) or not message.strip()
+            or level not in VIOLATION_LEVELS):
+        return jsonify({'error': 'Data pelanggaran tidak valid'}), 400
     
-    db.session.add(violation)
-    db.session.commit()
+    if not exam_sessions.is_active(current_user.id, ujian_id):
+        return jsonify({'error': 'Ujian tidak aktif'}), 400
+    
+    message = message.strip()[:LogPelanggaran.jenis_pelanggaran.type.length]
+    
+    # Save violation log (ditulis ke database oleh ViolationWriter)
+    if not log_violation(current_user.id, ujian_id, message, level):
+        return jsonify({'error': 'Server sibuk, coba lagi'}), 503
     
     return jsonify({'status': 'success'})
 
+@app.route('/api/admin/metrics')
+@login_required
+def api_admin_metrics():
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Akses ditolak'}), 403
+    
+    return jsonify({
+        'violation_writer': violation_writer.stats(),
+        'proctor_pool': proctor_pool.stats(),
+        'proctor_hub': proctor_hub.stats(),
+        'monitoring_wall': monitoring_wall.stats(),
+        'db_pool': pool_stats(db.engine)
+    })
+
+# Proctoring server-side: frame dari browser dianalisis oleh worker pool,
+# hasilnya di-push lewat SSE; event untuk siswa yang tidak sedang terhubung
+# ditahan dan ikut dikirim pada respons/koneksi berikutnya
+proctor_hub = EventHub()
+proctor_events = {}
+proctor_events_lock = threading.Lock()
+MAX_PENDING_EVENTS = 20
+
+def handle_proctor_events(key, events):
+    """Simpan pelanggaran dari worker proctor dan kirim ke browser"""
+    user_id, ujian_id = key
+    violations = [e for e in events if 'action' not in e]
+    
+    for v in violations:
+        if not log_violation(user_id, ujian_id, v['message'], v['level'], v.get('screenshot_path')):
+            print(f"Violation log buffer penuh, pelanggaran user {user_id} tidak tercatat")
+    
+    undelivered = [e for e in events if proctor_hub.publish(key, e) == 0]
+    if undelivered:
+        with proctor_events_lock:
+            pending = proctor_events.setdefault(key, [])
+            pending.extend(undelivered)
+            del pending[:-MAX_PENDING_EVENTS]
+
+def pop_proctor_events(user_id, ujian_id):
+    with proctor_events_lock:
+        return proctor_events.pop((user_id, ujian_id), [])
+
+# Monitoring wall admin: thumbnail di-encode worker, di-cache di sini untuk semua viewer
+monitoring_wall = MonitoringWall()
+
+def handle_proctor_thumbnail(key, jpeg, level):
+    monitoring_wall.update(key[0], key[1], jpeg, level)
+
+proctor_pool = ProctorPool(on_events=handle_proctor_events, on_thumbnail=handle_proctor_thumbnail)
+
+# Layanan background dijalankan sekali per proses yang melayani request: bukan di
+# proses induk reloader debug, dan tetap jalan di setiap worker WSGI (gunicorn dsb.)
+background_lock = threading.Lock()
+background_started = False
+
+def start_background_services():
+    """Jalankan violation writer, worker proctor dan rekonsiliasi statistik (idempotent)"""
+    global background_started
+    if background_started:
+        return
+    with background_lock:
+        if background_started:
+            return
+        violation_writer.start()
+        # Worker proctor memuat dan memanaskan model sebelum frame pertama masuk
+        proctor_pool.start()
+        # Pemanasan statistik di app context sendiri: query-nya bukan milik
+        # request pertama yang kebetulan memicu start
+        with app.app_context():
+            dashboard_stats.start()
+        background_started = True
+
+@app.before_request
+def ensure_background_services():
+    # Test memakai app tanpa proses worker dan thread background
+    if not app.testing:
+        start_background_services()
+
+@app.route('/api/proctor/capture-config')
+@login_required
+def api_proctor_capture_config():
+    # Browser mengirim frame seukuran yang benar-benar dipakai detektor
+    return jsonify(capture_config())
+
+@app.route('/api/proctor/process-frame', methods=['POST'])
+@login_required
+def api_proctor_process_frame():
+    frame = request.files.get('frame')
+    ujian_id = request.form.get('ujian_id', type=int)
+    
+    if frame is None or ujian_id is None:
+        return jsonify({'error': 'Frame tidak valid'}), 400
+    
+    if not exam_sessions.is_active(current_user.id, ujian_id):
+        return jsonify({'error': 'Ujian tidak aktif'}), 400
+    
+    # Tidak menunggu hasil deteksi: frame diantrekan, hasil frame sebelumnya ikut dikembalikan
+    status = proctor_pool.submit(current_user.id, ujian_id, frame.read(),
+                                 thumbnail=monitoring_wall.wants_thumbnail(current_user.id, ujian_id))
+    events = pop_proctor_events(current_user.id, ujian_id)
+    violations = [e for e in events if 'action' not in e]
+    
+    return jsonify({
+        'status': status,
+        'violation': bool(violations),
+        'violations': violations,
+        'should_end_exam': any(e.get('action') == 'end_exam' for e in events)
+    })
+
+@app.route('/api/proctor/stream/<int:ujian_id>')
+@login_required
+def api_proctor_stream(ujian_id):
+    """Server-Sent Events: pelanggaran dan perintah end_exam untuk siswa ini"""
+    key = (current_user.id, ujian_id)
+    initial_events = pop_proctor_events(*key)
+    
+    return Response(proctor_hub.stream(key, initial_events),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/admin/monitor/<int:ujian_id>')
+@login_required
+def admin_monitor(ujian_id):
+    if current_user.role != 'admin':
+        return redirect(url_for('siswa_dashboard'))
+    
+    ujian = Ujian.query.get_or_404(ujian_id)
+    active = monitoring_wall.active_users(ujian_id)
+    peserta = {u.id: u.nama_lengkap for u in User.query.filter(User.id.in_(active))} if active else {}
+    return render_template('admin/monitor.html', ujian=ujian, peserta=peserta)
+
+@app.route('/admin/monitor/<int:ujian_id>/stream')
+@login_required
+def admin_monitor_stream(ujian_id):
+    """Thumbnail semua sesi aktif sebagai multipart/mixed (satu part per tile yang berubah)"""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Akses ditolak'}), 403
+    
+    return Response(monitoring_wall.stream(ujian_id),
+                    mimetype=f'multipart/mixed; boundary={BOUNDARY}',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/admin/monitor/<int:ujian_id>/<int:user_id>.mjpg')
+@login_required
+def admin_monitor_session(ujian_id, user_id):
+    """MJPEG satu siswa untuk tampilan diperbesar"""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Akses ditolak'}), 403
+    
+    return Response(monitoring_wall.stream_session(user_id, ujian_id),
+                    mimetype=f'multipart/x-mixed-replace; boundary={BOUNDARY}',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/proctor/status/<int:ujian_id>')
+@login_required
+def api_proctor_status(ujian_id):
+    """Fallback polling untuk browser tanpa EventSource"""
+    events = pop_proctor_events(current_user.id, ujian_id)
+    
+    return jsonify({
+        'violations': [e for e in events if 'action' not in e],
+        'should_end_exam': any(e.get('action') == 'end_exam' for e in events)
+    })
+
 def create_sample_data():
     """Create sample data for testing"""
     # Create admin user
@@ -369,4 +823,5 @@ if __name__ == '__main__':
     with app.app_context():
         db.create_all()
         create_sample_data()
+    
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,159 @@
+import queue
+import threading
+import time
+
+from preprocess import PREPROCESS_CONFIG
+
+# Pengaturan micro-batching YOLO
+BATCH_CONFIG = {
+    'max_batch_size': 8,  # jumlah frame maksimum dalam satu predict
+    'max_wait': 0.05,     # detik menunggu frame lain sebelum batch dijalankan
+    'conf': 0.5,
+    'imgsz': PREPROCESS_CONFIG['input_sizes']['object'],  # frame sudah di-letterbox ke ukuran ini
+}
+
+
+def predict_objects(model, frames, conf=0.5, imgsz=None):
+    """Jalankan satu predict YOLO untuk banyak frame.
+
+    Return list deteksi per frame, tiap deteksi berupa (label, confidence, (x1, y1, x2, y2)).
+    """
+    if not frames:
+        return []
+    if hasattr(model, 'detect'):
+        # Backend dari detector_backends (ultralytics/onnxruntime)
+        return model.detect(list(frames), conf=conf, imgsz=imgsz)
+
+    options = {'imgsz': imgsz} if imgsz else {}
+    results = model.predict(source=list(frames), conf=conf, verbose=False, **options)
+    detections = []
+    for r in results:
+        boxes = []
+        for box in r.boxes:
+            cls = int(box.cls[0])
+            x1, y1, x2, y2 = map(int, box.xyxy[0])
+            boxes.append((model.names[cls], float(box.conf[0]), (x1, y1, x2, y2)))
+        detections.append(boxes)
+    return detections
+
+
+class YoloBatcher:
+    """Kumpulkan frame dari banyak sesi lalu jalankan YOLO sekali per batch"""
+
+    def __init__(self, model, max_batch_size=None, max_wait=None, conf=None, imgsz=None):
+        self.model = model
+        self.max_batch_size = max_batch_size or BATCH_CONFIG['max_batch_size']
+        self.max_wait = BATCH_CONFIG['max_wait'] if max_wait is None else max_wait
+        self.conf = conf or BATCH_CONFIG['conf']
+        self.imgsz = imgsz or BATCH_CONFIG['imgsz']
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self.is_running = False
+        self._stats = {'batches': 0, 'frames': 0, 'errors': 0}
+        self._stats_lock = threading.Lock()
+
+    def start(self):
+        """Jalankan thread batching"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Hentikan thread batching"""
+        if not self.is_running:
+            return
+        self.is_running = False
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def submit(self, frame, callback):
+        """Antrekan frame; callback(detections) dipanggil dari thread batching"""
+        if not self.is_running:
+            self.start()
+        self._queue.put((frame, callback))
+
+    def predict(self, frame, timeout=5.0):
+        """Versi blocking dari submit untuk dipakai thread monitoring per sesi"""
+        done = threading.Event()
+        holder = []
+
+        def _callback(detections):
+            holder.append(detections)
+            done.set()
+
+        self.submit(frame, _callback)
+        if not done.wait(timeout):
+            return []
+        return holder[0]
+
+    def predict_many(self, frames):
+        """Jalankan batch langsung tanpa antrean (untuk caller yang sudah punya batch)"""
+        detections = predict_objects(self.model, frames, self.conf, self.imgsz)
+        self._record(len(frames))
+        return detections
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['avg_batch_size'] = stats['frames'] / stats['batches'] if stats['batches'] else 0
+        stats['queued'] = self._queue.qsize()
+        return stats
+
+    def _record(self, size, error=False):
+        with self._stats_lock:
+            self._stats['batches'] += 1
+            self._stats['frames'] += size
+            if error:
+                self._stats['errors'] += 1
+
+    def _collect_batch(self):
+        try:
+            first = self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self.is_running = False
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        """Loop utama batching"""
+        while self.is_running:
+            batch = self._collect_batch()
+            if batch is None:
+                break
+            if not batch:
+                continue
+
+            frames = [frame for frame, _ in batch]
+            try:
+                detections = predict_objects(self.model, frames, self.conf, self.imgsz)
+                self._record(len(frames))
+            except Exception as e:
+                print(f"Error batch YOLO: {e}")
+                detections = [[] for _ in frames]
+                self._record(len(frames), error=True)
+
+            for (_, callback), boxes in zip(batch, detections):
+                try:
+                    callback(boxes)
+                except Exception as e:
+                    print(f"Error batch callback: {e}")
@@ -0,0 +1,184 @@
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select, text
+
+import migrate
+from app import db
+
+# Volume default: kira-kira satu sekolah besar setelah beberapa semester
+SEED_CONFIG = {
+    'siswa': 5000,
+    'soal': 20000,
+    'kategori': 20,
+    'ujian': 40,
+    'hasil_per_siswa': 6,
+    'pelanggaran': 200000,
+    'chunk': 5000,
+}
+
+TINGKAT = ['mudah', 'sedang', 'sulit']
+JENIS = ['Wajah tidak terdeteksi', 'Lebih dari satu wajah', 'Objek mencurigakan: cell phone',
+         'Pandangan ke samping', 'Objek mencurigakan: book']
+
+
+def insert_chunks(conn, table, rows, chunk):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk:
+            conn.execute(table.insert(), batch)
+            batch = []
+    if batch:
+        conn.execute(table.insert(), batch)
+
+
+def seed(engine, config):
+    """Isi database dengan data sintetis; return parameter untuk query benchmark"""
+    tables = db.metadata.tables
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    chunk = config['chunk']
+    kategori = [f'Kategori {i}' for i in range(config['kategori'])]
+
+    with engine.begin() as conn:
+        insert_chunks(conn, tables['user'], (
+            {'username': f'siswa{i}', 'email': f'siswa{i}@example.com', 'password_hash': 'x',
+             'role': 'admin' if i < 5 else 'siswa', 'nama_lengkap': f'Siswa {i}', 'created_at': now}
+            for i in range(config['siswa'])
+        ), chunk)
+        insert_chunks(conn, tables['bank_soal'], (
+            {'pertanyaan': f'Soal {i}', 'pilihan_a': 'A', 'pilihan_b': 'B', 'pilihan_c': 'C',
+             'pilihan_d': 'D', 'jawaban_benar': rng.choice('ABCD'), 'kategori': rng.choice(kategori),
+             'tingkat_kesulitan': rng.choice(TINGKAT), 'created_at': now}
+            for i in range(config['soal'])
+        ), chunk)
+        insert_chunks(conn, tables['ujian'], (
+            {'nama_ujian': f'Ujian {i}', 'kategori': kategori[i % len(kategori)], 'jumlah_soal': 20,
+             'durasi_menit': 60, 'status': 'aktif' if i % 8 == 0 else 'nonaktif', 'created_at': now}
+            for i in range(config['ujian'])
+        ), chunk)
+
+        user_ids = [row.id for row in conn.execute(select(tables['user'].c.id))]
+        ujian_ids = [row.id for row in conn.execute(select(tables['ujian'].c.id))]
+
+        def hasil_rows():
+            for user_id in user_ids:
+                for ujian_id in rng.sample(ujian_ids, min(config['hasil_per_siswa'], len(ujian_ids))):
+                    yield {'user_id': user_id, 'ujian_id': ujian_id, 'jawaban': '{}',
+                           'nilai': rng.uniform(0, 100), 'waktu_mulai': now, 'waktu_selesai': now,
+                           'jumlah_pelanggaran': 0, 'status_ujian': 'selesai'}
+        insert_chunks(conn, tables['hasil_ujian'], hasil_rows(), chunk)
+
+        insert_chunks(conn, tables['log_pelanggaran'], (
+            {'user_id': rng.choice(user_ids), 'ujian_id': rng.choice(ujian_ids),
+             'jenis_pelanggaran': rng.choice(JENIS), 'tingkat_pelanggaran': rng.choice(['ringan', 'berat']),
+             'screenshot_path': None, 'timestamp': now - timedelta(seconds=rng.randint(0, 90 * 86400))}
+            for _ in range(config['pelanggaran'])
+        ), chunk)
+
+    return {'kategori': kategori[0], 'user_id': user_ids[-1], 'ujian_id': ujian_ids[len(ujian_ids) // 2]}
+
+
+def hot_queries(params):
+    """Query jalur panas aplikasi (sama predikat dan urutannya dengan app.py)"""
+    t = db.metadata.tables
+    user, soal, ujian, hasil, log = t['user'], t['bank_soal'], t['ujian'], t['hasil_ujian'], t['log_pelanggaran']
+    return [
+        ('sampel soal per kategori',
+         select(soal.c.id, soal.c.tingkat_kesulitan).where(soal.c.kategori == params['kategori'])),
+        ('cek sudah mengerjakan',
+         select(hasil.c.id).where(hasil.c.user_id == params['user_id'],
+                                  hasil.c.ujian_id == params['ujian_id']).limit(1)),
+        ('hasil per ujian (rescore)',
+         select(hasil.c.id, hasil.c.jawaban).where(hasil.c.ujian_id == params['ujian_id'])),
+        ('listing peserta',
+         select(user.c.id, user.c.username).where(user.c.role == 'siswa').order_by(user.c.id).limit(51)),
+        ('ujian aktif',
+         select(ujian.c.id, ujian.c.nama_ujian).where(ujian.c.status == 'aktif')),
+        ('log pelanggaran terbaru',
+         select(log.c.id).order_by(log.c.timestamp.desc(), log.c.id.desc()).limit(51)),
+        ('log pelanggaran per ujian',
+         select(log.c.id).where(log.c.ujian_id == params['ujian_id'])
+         .order_by(log.c.timestamp.desc(), log.c.id.desc()).limit(51)),
+    ]
+
+
+def explain(conn, statement):
+    sql = str(statement.compile(conn, compile_kwargs={'literal_binds': True}))
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+    return [' | '.join(str(value) for value in row) for row in conn.execute(text(prefix + sql))]
+
+
+def measure(engine, queries, repeat):
+    results = {}
+    with engine.connect() as conn:
+        for name, statement in queries:
+            conn.execute(statement).fetchall()  # warm-up cache halaman
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                conn.execute(statement).fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            results[name] = {
+                'median': statistics.median(timings),
+                'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+                'plan': explain(conn, statement),
+            }
+    return results
+
+
+def print_plans(title, results):
+    print(f"\n📋 Query plan {title}")
+    for name, result in results.items():
+        print(f"   {name}:")
+        for line in result['plan']:
+            print(f"      {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark index jalur panas (sebelum/sesudah migration 0001)')
+    parser.add_argument('--database-url', default='sqlite:///benchmark_db.sqlite',
+                        help='database KHUSUS benchmark; semua tabel di-drop dan dibuat ulang')
+    parser.add_argument('--repeat', type=int, default=50)
+    for name, value in SEED_CONFIG.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=value)
+    args = parser.parse_args()
+    config = {name: getattr(args, name) for name in SEED_CONFIG}
+
+    engine = create_engine(args.database_url)
+    db.metadata.drop_all(engine)
+    migrate.schema_migrations.drop(engine, checkfirst=True)
+    db.metadata.create_all(engine)
+
+    # Mulai dari skema tanpa index tambahan (kondisi sebelum migration)
+    migrate.upgrade(engine)
+    migrate.downgrade(engine, '0000')
+
+    print("🌱 Mengisi data benchmark...")
+    start = time.perf_counter()
+    params = seed(engine, config)
+    print(f"   selesai dalam {time.perf_counter() - start:.1f} detik")
+
+    queries = hot_queries(params)
+    before = measure(engine, queries, args.repeat)
+    migrate.upgrade(engine)
+    after = measure(engine, queries, args.repeat)
+
+    print_plans('SEBELUM index', before)
+    print_plans('SESUDAH index', after)
+
+    print(f"\n⏱️  Latensi (ms, {args.repeat} kali per query)")
+    print(f"   {'query':<30} {'sebelum p50':>12} {'p95':>9} {'sesudah p50':>12} {'p95':>9} {'speedup':>8}")
+    for name, _ in queries:
+        b, a = before[name], after[name]
+        speedup = b['median'] / a['median'] if a['median'] else float('inf')
+        print(f"   {name:<30} {b['median']:>12.3f} {b['p95']:>9.3f} {a['median']:>12.3f} {a['p95']:>9.3f} {speedup:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from benchmark_proctor import load_clip, percentile, synthetic_clip
+from detector_backends import DETECTOR_CONFIG, OnnxDetector, UltralyticsDetector, export_onnx
+from preprocess import FramePreprocessor
+
+# Pengaturan perbandingan backend detektor
+PARITY_CONFIG = {
+    'iou': 0.5,          # kotak dianggap sama jika IoU >= nilai ini dan labelnya sama
+    'conf': 0.5,
+    'calibration_frames': 64,
+}
+
+
+def iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, x2 - x1) * max(0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def compare(reference, candidate, threshold=None):
+    """Bandingkan deteksi kandidat dengan referensi (PyTorch), per kotak dan per frame"""
+    threshold = threshold or PARITY_CONFIG['iou']
+    tp = fp = fn = 0
+    same_frames = 0
+    for ref_boxes, cand_boxes in zip(reference, candidate):
+        unmatched = list(ref_boxes)
+        for label, _, box in cand_boxes:
+            match = next((r for r in unmatched if r[0] == label and iou(r[2], box) >= threshold), None)
+            if match is None:
+                fp += 1
+            else:
+                tp += 1
+                unmatched.remove(match)
+        fn += len(unmatched)
+        # Yang menentukan pelanggaran: himpunan label benda terlarang di frame
+        if {b[0] for b in ref_boxes} == {b[0] for b in cand_boxes}:
+            same_frames += 1
+    return {
+        'precision': tp / (tp + fp) if tp + fp else 1.0,
+        'recall': tp / (tp + fn) if tp + fn else 1.0,
+        'frame_agreement': same_frames / len(reference) if reference else 1.0,
+    }
+
+
+def run_backend(detector, images, conf, imgsz):
+    """Deteksi semua frame satu per satu, return (deteksi, latensi ms per frame)"""
+    detector.detect(images[:1], conf=conf, imgsz=imgsz)  # pemanasan
+    detections, latencies = [], []
+    for image in images:
+        start = time.perf_counter()
+        detections.extend(detector.detect([image], conf=conf, imgsz=imgsz))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return detections, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Bandingkan akurasi dan latensi backend detektor (PyTorch vs ONNX Runtime)')
+    parser.add_argument('videos', nargs='*', help='klip benchmark (sama dengan benchmark_proctor.py)')
+    parser.add_argument('--synthetic', type=int, default=0, help='tambahkan klip sintetis N frame')
+    parser.add_argument('--max-frames', type=int, default=300, help='batasi jumlah frame per klip')
+    parser.add_argument('--int8', action='store_true', help='ikut uji model ONNX int8 (kalibrasi dari klip)')
+    parser.add_argument('--json', help='simpan hasil ke file JSON')
+    parser.add_argument('--min-agreement', type=float,
+                        help='gagal jika kesesuaian per frame backend ONNX di bawah nilai ini (0-1)')
+    args = parser.parse_args()
+
+    clips = [load_clip(path, args.max_frames) for path in args.videos]
+    if args.synthetic or not clips:
+        clips.append(synthetic_clip(args.synthetic or 100))
+
+    # Input sama persis dengan ProctorSystem: frame di-letterbox ke ukuran input YOLO
+    preprocessor = FramePreprocessor()
+    images = [preprocessor.letterbox(frame)[0].copy() for clip in clips for frame in clip['frames']]
+    imgsz = preprocessor.input_sizes['object']
+    conf = PARITY_CONFIG['conf']
+    print(f"🎞️  {len(images)} frame dari {len(clips)} klip, input {imgsz}x{imgsz}, "
+          f"kelas: {', '.join(DETECTOR_CONFIG['classes'])}")
+
+    print("🔥 Menyiapkan backend...")
+    backends = [('pytorch', UltralyticsDetector()),
+                ('onnx-fp32', OnnxDetector(export_onnx(imgsz=imgsz)))]
+    if args.int8:
+        step = max(1, len(images) // PARITY_CONFIG['calibration_frames'])
+        path = export_onnx(imgsz=imgsz, int8=True, calibration_images=images[::step])
+        backends.append(('onnx-int8', OnnxDetector(path)))
+
+    report = []
+    reference = None
+    failed = []
+    print(f"\n   {'backend':<10} {'p50 ms':>8} {'p95 ms':>8} {'speedup':>8} {'precision':>10} {'recall':>7} {'frame':>7}")
+    for name, detector in backends:
+        detections, latencies = run_backend(detector, images, conf, imgsz)
+        entry = {'backend': name, 'p50_ms': percentile(latencies, 50), 'p95_ms': percentile(latencies, 95),
+                 'mean_ms': float(np.mean(latencies))}
+        if reference is None:
+            reference = (detections, entry['p50_ms'])
+            entry.update(precision=1.0, recall=1.0, frame_agreement=1.0, speedup=1.0)
+        else:
+            entry.update(compare(reference[0], detections))
+            entry['speedup'] = reference[1] / entry['p50_ms'] if entry['p50_ms'] else 0.0
+            if args.min_agreement is not None and entry['frame_agreement'] < args.min_agreement:
+                failed.append(f"{name}: kesesuaian {entry['frame_agreement']:.3f}")
+        report.append(entry)
+        print(f"   {name:<10} {entry['p50_ms']:>8.2f} {entry['p95_ms']:>8.2f} {entry['speedup']:>7.2f}x "
+              f"{entry['precision']:>10.3f} {entry['recall']:>7.3f} {entry['frame_agreement']:>7.3f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if failed:
+        print("\n❌ Akurasi backend di bawah ambang:")
+        for line in failed:
+            print(f"   - {line}")
+        sys.exit(1)
+    print("\n✅ Perbandingan selesai")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from model_registry import model_registry
+from proctor_system import ProctorSystem
+from scene_gate import DETECTORS
+
+# Tahap yang diukur: metode ProctorSystem -> nama di laporan
+STAGES = {
+    '_plan_detectors': 'gate',
+    '_detect_pose_violations': 'pose',
+    '_detect_face_violations': 'face',
+    '_detect_object_violations': 'object',
+}
+
+
+def rss_mb():
+    """Resident set size proses ini (Linux), dalam MB"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def load_clip(path, max_frames=None):
+    """Decode seluruh klip ke memori (decode tidak ikut diukur) beserta label jika ada"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f"Tidak dapat membuka video {path}")
+    frames = []
+    while max_frames is None or len(frames) < max_frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+
+    # Label: <nama klip>.labels.json berisi {"violations": ["pesan pelanggaran", ...]}
+    labels = None
+    label_path = os.path.splitext(path)[0] + '.labels.json'
+    if os.path.exists(label_path):
+        with open(label_path) as f:
+            labels = set(json.load(f).get('violations', []))
+    return {'name': os.path.basename(path), 'frames': frames, 'labels': labels}
+
+
+def synthetic_clip(count, width=640, height=480, seed=0):
+    """Klip sintetis: latar statis dengan noise sensor dan satu blok yang bergerak"""
+    rng = np.random.default_rng(seed)
+    background = rng.integers(60, 120, (height, width, 3), dtype=np.uint8)
+    frames = []
+    for i in range(count):
+        frame = background.copy()
+        noise = rng.integers(-3, 4, (height, width, 1), dtype=np.int16)
+        frame = np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+        x = (i * 7) % (width - 80)
+        cv2.rectangle(frame, (x, height // 3), (x + 80, height // 3 + 120), (200, 180, 160), -1)
+        frames.append(frame)
+    return {'name': f'synthetic-{count}', 'frames': frames, 'labels': None}
+
+
+def instrument(proctor, timings):
+    """Bungkus tahap-tahap ProctorSystem dengan pengukur waktu (ms)"""
+    for method, stage in STAGES.items():
+        original = getattr(proctor, method)
+
+        def timed(*args, _original=original, _stage=stage, **kwargs):
+            start = time.perf_counter()
+            try:
+                return _original(*args, **kwargs)
+            finally:
+                timings[_stage].append((time.perf_counter() - start) * 1000)
+        setattr(proctor, method, timed)
+
+
+def run_session(session_id, clip, lease, cascade, results):
+    timings = {stage: [] for stage in list(STAGES.values()) + ['frame']}
+    events = []
+    proctor = ProctorSystem(session_id, 0, callback_function=events.append, models=lease)
+    # Semua pelanggaran dihitung; ujian tidak diakhiri di tengah benchmark
+    proctor.max_pelanggaran = float('inf')
+    if not cascade:
+        proctor.scene_gate = None
+    instrument(proctor, timings)
+
+    for frame in clip['frames']:
+        start = time.perf_counter()
+        proctor._process_frame(frame)
+        timings['frame'].append((time.perf_counter() - start) * 1000)
+
+    proctor.close()
+    results[session_id] = {'timings': timings, 'events': events}
+
+
+def run_level(clip, sessions, cascade):
+    """Jalankan klip di `sessions` sesi paralel (thread), return ringkasan"""
+    # Setiap thread mendapat graph MediaPipe sendiri dari registry; YOLO dipakai bersama
+    leases = [model_registry.acquire() for _ in range(sessions)]
+    results = {}
+    rss_before = rss_mb()
+    cpu_before = time.process_time()
+    wall_before = time.perf_counter()
+
+    threads = [threading.Thread(target=run_session, args=(i, clip, leases[i], cascade, results))
+               for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    wall = time.perf_counter() - wall_before
+    cpu = time.process_time() - cpu_before
+    rss_after = rss_mb()
+    for lease in leases:
+        lease.release()
+
+    frames = sum(len(r['timings']['frame']) for r in results.values())
+    summary = {
+        'sessions': sessions,
+        'frames': frames,
+        'fps': frames / wall if wall else 0.0,
+        'fps_per_core': frames / cpu if cpu else 0.0,
+        'memory_per_session_mb': max(0.0, rss_after - rss_before) / sessions,
+        'latency_ms': {},
+    }
+    for stage in list(STAGES.values()) + ['frame']:
+        values = [v for r in results.values() for v in r['timings'][stage]]
+        summary['latency_ms'][stage] = {
+            'runs': len(values),
+            'p50': percentile(values, 50),
+            'p95': percentile(values, 95),
+            'p99': percentile(values, 99),
+        }
+
+    if clip['labels'] is not None:
+        tp = fp = fn = 0
+        for r in results.values():
+            detected = {e['message'] for e in r['events'] if 'message' in e}
+            tp += len(detected & clip['labels'])
+            fp += len(detected - clip['labels'])
+            fn += len(clip['labels'] - detected)
+        summary['accuracy'] = {
+            'precision': tp / (tp + fp) if tp + fp else 1.0,
+            'recall': tp / (tp + fn) if tp + fn else 1.0,
+            'true_positive': tp, 'false_positive': fp, 'false_negative': fn,
+        }
+    return summary
+
+
+def print_summary(clip, summary):
+    print(f"\n🎞️  {clip['name']} — {summary['sessions']} sesi, {summary['frames']} frame")
+    print(f"   {summary['fps']:.1f} frame/detik, {summary['fps_per_core']:.1f} frame/detik per core, "
+          f"{summary['memory_per_session_mb']:.1f} MB per sesi")
+    print(f"   {'tahap':<8} {'runs':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for stage, stats in summary['latency_ms'].items():
+        print(f"   {stage:<8} {stats['runs']:>6} {stats['p50']:>9.2f} {stats['p95']:>9.2f} {stats['p99']:>9.2f}")
+    if 'accuracy' in summary:
+        acc = summary['accuracy']
+        print(f"   akurasi: precision {acc['precision']:.2f}, recall {acc['recall']:.2f} "
+              f"(TP {acc['true_positive']}, FP {acc['false_positive']}, FN {acc['false_negative']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark ProctorSystem headless (CPU) dengan video rekaman atau frame sintetis')
+    parser.add_argument('videos', nargs='*', help='file video; label opsional di <nama>.labels.json')
+    parser.add_argument('--synthetic', type=int, default=0, help='tambahkan klip sintetis N frame')
+    parser.add_argument('--max-frames', type=int, help='batasi jumlah frame per klip')
+    parser.add_argument('--sessions', type=int, default=1, help='uji 1..N sesi paralel')
+    parser.add_argument('--no-cascade', action='store_true', help='jalankan semua detektor setiap frame')
+    parser.add_argument('--json', help='simpan hasil ke file JSON')
+    parser.add_argument('--max-p95-ms', type=float, help='gagal jika p95 per frame (1 sesi) melebihi nilai ini')
+    parser.add_argument('--min-fps-per-core', type=float, help='gagal jika throughput per core di bawah nilai ini')
+    args = parser.parse_args()
+
+    clips = [load_clip(path, args.max_frames) for path in args.videos]
+    if args.synthetic or not clips:
+        clips.append(synthetic_clip(args.synthetic or 100))
+
+    print("🔥 Memuat model...")
+    model_registry.warm_up()
+    print(f"   detektor: {', '.join(DETECTORS)}; cascade {'mati' if args.no_cascade else 'aktif'}")
+
+    report = []
+    failed = []
+    for clip in clips:
+        for sessions in range(1, args.sessions + 1):
+            summary = run_level(clip, sessions, cascade=not args.no_cascade)
+            summary['clip'] = clip['name']
+            report.append(summary)
+            print_summary(clip, summary)
+
+            if sessions == 1 and args.max_p95_ms and summary['latency_ms']['frame']['p95'] > args.max_p95_ms:
+                failed.append(f"{clip['name']}: p95 {summary['latency_ms']['frame']['p95']:.1f} ms")
+            if args.min_fps_per_core and summary['fps_per_core'] < args.min_fps_per_core:
+                failed.append(f"{clip['name']} ({sessions} sesi): {summary['fps_per_core']:.1f} frame/detik/core")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if failed:
+        print("\n❌ Regresi performa:")
+        for line in failed:
+            print(f"   - {line}")
+        sys.exit(1)
+    print("\n✅ Benchmark selesai")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,32 +1,37 @@
+import os
+
 import pymysql
+from dotenv import load_dotenv
+
+load_dotenv()
 
-# Database configuration
+# Database configuration (dari environment / .env, sama dengan yang dipakai app.py)
 DB_CONFIG = {
-    'host': 'localhost',
-    'user': 'root',
-    'password': '',  # Sesuaikan dengan password MySQL Anda
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'port': int(os.environ.get('DB_PORT', 3306)),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),  # Sesuaikan dengan password MySQL Anda
     'charset': 'utf8mb4'
 }
+DB_NAME = os.environ.get('DB_NAME', 'ujian_proctor')
 
 def create_database():
     """Create database for ujian proctor system"""
     try:
-        # Connect to MySQL server
-        connection = pymysql.connect(**DB_CONFIG)
-        
-        with connection.cursor() as cursor:
-            # Create database
-            cursor.execute("CREATE DATABASE IF NOT EXISTS ujian_proctor CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
-            print("✅ Database 'ujian_proctor' berhasil dibuat!")
-            
-            # Show databases
-            cursor.execute("SHOW DATABASES")
-            databases = cursor.fetchall()
-            print("\n📋 Daftar database:")
-            for db in databases:
-                print(f"   - {db[0]}")
+        # Connect to MySQL server (koneksi ditutup meski terjadi error)
+        with pymysql.connect(**DB_CONFIG) as connection:
+            with connection.cursor() as cursor:
+                # Create database
+                cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{DB_NAME}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+                print(f"✅ Database '{DB_NAME}' berhasil dibuat!")
+                
+                # Show databases
+                cursor.execute("SHOW DATABASES")
+                databases = cursor.fetchall()
+                print("\n📋 Daftar database:")
+                for db in databases:
+                    print(f"   - {db[0]}")
         
-        connection.close()
         return True
         
     except Exception as e:
@@ -43,6 +48,7 @@ if __name__ == "__main__":
         print("1. Pastikan MySQL server berjalan")
         print("2. Install dependencies: pip install -r requirements.txt")
         print("3. Jalankan aplikasi: python app.py")
+        print("4. Untuk database lama, terapkan migration: python migrate.py upgrade")
     else:
         print("\n❌ Setup database gagal!")
         print("\n🔧 Troubleshooting:")
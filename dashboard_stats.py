@@ -0,0 +1,214 @@
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+
+from flask import has_app_context
+from sqlalchemy import case, event, func
+
+# Pengaturan statistik dashboard
+STATS_CONFIG = {
+    'reconcile_interval': 300,  # detik, hitung ulang penuh dari database secara berkala
+}
+
+
+class DashboardStats:
+    """Counter dashboard admin dan agregat per ujian yang dijaga secara inkremental
+
+    Perubahan lewat ORM dicatat dari event session (after_flush) dan baru diterapkan
+    setelah commit. Insert massal yang melewati ORM (log pelanggaran dari
+    ViolationWriter) dilaporkan lewat record_violations. Job rekonsiliasi berkala
+    menghitung ulang semuanya dari database untuk menutup selisih, mis. perubahan
+    dari proses lain atau bulk update.
+    """
+
+    def __init__(self, app, db, BankSoal, Ujian, User, HasilUjian, LogPelanggaran):
+        self.app = app
+        self.db = db
+        self.BankSoal = BankSoal
+        self.Ujian = Ujian
+        self.User = User
+        self.HasilUjian = HasilUjian
+        self.LogPelanggaran = LogPelanggaran
+
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._thread = None
+        self.last_reconciled = None
+        self._reset()
+
+        event.listen(db.session, 'after_flush', self._on_flush)
+        event.listen(db.session, 'after_commit', self._on_commit)
+        event.listen(db.session, 'after_rollback', self._on_rollback)
+
+    def _reset(self):
+        self.counters = {'total_soal': 0, 'total_ujian': 0, 'total_siswa': 0, 'total_hasil': 0}
+        self.ujian_names = {}
+        self.per_ujian = {}
+
+    def _ujian_entry(self, ujian_id):
+        entry = self.per_ujian.get(ujian_id)
+        if entry is None:
+            entry = self.per_ujian[ujian_id] = {
+                'peserta': 0,
+                'jumlah_nilai': 0.0,
+                'diskualifikasi': 0,
+                'pelanggaran': Counter(),
+            }
+        return entry
+
+    def snapshot(self):
+        """Counter dashboard (O(1), tanpa query kecuali saat pertama kali dimuat)"""
+        self._ensure_loaded()
+        with self._lock:
+            return dict(self.counters)
+
+    def ujian_summary(self):
+        """Agregat per ujian: peserta, rata-rata nilai, tingkat diskualifikasi, pelanggaran per jenis
+
+        Semua ujian ikut terdaftar, termasuk yang belum punya hasil atau
+        pelanggaran (mis. baru dimulai), agar bisa dibuka di monitoring wall.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            summary = []
+            empty = {'peserta': 0, 'jumlah_nilai': 0.0, 'diskualifikasi': 0, 'pelanggaran': Counter()}
+            for ujian_id in sorted(set(self.ujian_names) | set(self.per_ujian)):
+                entry = self.per_ujian.get(ujian_id, empty)
+                peserta = entry['peserta']
+                summary.append({
+                    'ujian_id': ujian_id,
+                    'nama_ujian': self.ujian_names.get(ujian_id, f'Ujian #{ujian_id}'),
+                    'peserta': peserta,
+                    'rata_nilai': entry['jumlah_nilai'] / peserta if peserta else 0.0,
+                    'tingkat_diskualifikasi': entry['diskualifikasi'] / peserta if peserta else 0.0,
+                    'pelanggaran': dict(entry['pelanggaran'].most_common()),
+                })
+            return summary
+
+    def record_violations(self, rows):
+        """Catat log pelanggaran yang di-insert tanpa ORM (dipanggil setelah commit)"""
+        if not self._loaded:
+            return
+        with self._lock:
+            for row in rows:
+                self._ujian_entry(row['ujian_id'])['pelanggaran'][row['jenis_pelanggaran']] += 1
+
+    def reconcile(self):
+        """Hitung ulang semua counter dan agregat dari database
+
+        Di dalam request query-nya ikut dihitung ke budget view; statistik
+        dipanaskan saat layanan background start agar dashboard cukup 1 query.
+        """
+        with nullcontext() if has_app_context() else self.app.app_context():
+            session = self.db.session
+            counters = {
+                'total_soal': session.query(func.count(self.BankSoal.id)).scalar(),
+                'total_ujian': session.query(func.count(self.Ujian.id)).scalar(),
+                'total_siswa': session.query(func.count(self.User.id))
+                .filter(self.User.role == 'siswa').scalar(),
+                'total_hasil': session.query(func.count(self.HasilUjian.id)).scalar(),
+            }
+            ujian_names = dict(session.query(self.Ujian.id, self.Ujian.nama_ujian).all())
+            hasil_rows = session.query(
+                self.HasilUjian.ujian_id,
+                func.count(self.HasilUjian.id),
+                func.coalesce(func.sum(self.HasilUjian.nilai), 0),
+                func.sum(case((self.HasilUjian.status_ujian == 'diskualifikasi', 1), else_=0))
+            ).group_by(self.HasilUjian.ujian_id).all()
+            pelanggaran_rows = session.query(
+                self.LogPelanggaran.ujian_id,
+                self.LogPelanggaran.jenis_pelanggaran,
+                func.count(self.LogPelanggaran.id)
+            ).group_by(self.LogPelanggaran.ujian_id, self.LogPelanggaran.jenis_pelanggaran).all()
+
+        with self._lock:
+            self._reset()
+            self.counters = counters
+            self.ujian_names = ujian_names
+            for ujian_id, peserta, jumlah_nilai, diskualifikasi in hasil_rows:
+                entry = self._ujian_entry(ujian_id)
+                entry['peserta'] = peserta
+                entry['jumlah_nilai'] = float(jumlah_nilai or 0)
+                entry['diskualifikasi'] = int(diskualifikasi or 0)
+            for ujian_id, jenis, jumlah in pelanggaran_rows:
+                self._ujian_entry(ujian_id)['pelanggaran'][jenis] = jumlah
+            self._loaded = True
+            self.last_reconciled = time.time()
+
+    def start(self, interval=None):
+        """Rekonsiliasi awal lalu jalankan job rekonsiliasi berkala (sekali saja)"""
+        interval = interval or STATS_CONFIG['reconcile_interval']
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._reconcile_loop, args=(interval,))
+            self._thread.daemon = True
+        self.reconcile()
+        self._thread.start()
+
+    def _reconcile_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.reconcile()
+            except Exception as e:
+                print(f"Error reconciling dashboard stats: {e}")
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.reconcile()
+
+    def _on_flush(self, session, flush_context):
+        # Nilai diambil saat flush; objek bisa sudah expired ketika commit selesai
+        pending = session.info.setdefault('dashboard_stats', [])
+        for delta, objects in ((1, session.new), (-1, session.deleted)):
+            for obj in objects:
+                change = self._describe(obj)
+                if change is not None:
+                    pending.append((delta,) + change)
+
+    def _describe(self, obj):
+        if isinstance(obj, self.BankSoal):
+            return 'soal', None
+        if isinstance(obj, self.Ujian):
+            return 'ujian', (obj.id, obj.nama_ujian)
+        if isinstance(obj, self.User):
+            return ('siswa', None) if obj.role == 'siswa' else None
+        if isinstance(obj, self.HasilUjian):
+            return 'hasil', (obj.ujian_id, obj.nilai or 0, obj.status_ujian == 'diskualifikasi')
+        if isinstance(obj, self.LogPelanggaran):
+            return 'pelanggaran', (obj.ujian_id, obj.jenis_pelanggaran)
+        return None
+
+    def _on_rollback(self, session):
+        session.info.pop('dashboard_stats', None)
+
+    def _on_commit(self, session):
+        pending = session.info.pop('dashboard_stats', None)
+        if not pending or not self._loaded:
+            return
+
+        with self._lock:
+            for delta, kind, data in pending:
+                if kind == 'soal':
+                    self.counters['total_soal'] += delta
+                elif kind == 'ujian':
+                    self.counters['total_ujian'] += delta
+                    if delta > 0:
+                        self.ujian_names[data[0]] = data[1]
+                    else:
+                        self.ujian_names.pop(data[0], None)
+                elif kind == 'siswa':
+                    self.counters['total_siswa'] += delta
+                elif kind == 'hasil':
+                    ujian_id, nilai, diskualifikasi = data
+                    self.counters['total_hasil'] += delta
+                    entry = self._ujian_entry(ujian_id)
+                    entry['peserta'] += delta
+                    entry['jumlah_nilai'] += delta * nilai
+                    if diskualifikasi:
+                        entry['diskualifikasi'] += delta
+                elif kind == 'pelanggaran':
+                    ujian_id, jenis = data
+                    self._ujian_entry(ujian_id)['pelanggaran'][jenis] += delta
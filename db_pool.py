@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+load_dotenv()
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def database_url():
+    """DATABASE_URL jika ada, selain itu dirangkai dari DB_* (sama dengan create_database.py)"""
+    url = os.environ.get('DATABASE_URL')
+    if url:
+        return url
+    user = os.environ.get('DB_USER', 'root')
+    password = os.environ.get('DB_PASSWORD', '')
+    host = os.environ.get('DB_HOST', 'localhost')
+    port = os.environ.get('DB_PORT', '3306')
+    name = os.environ.get('DB_NAME', 'ujian_proctor')
+    return f"mysql+pymysql://{user}:{password}@{host}:{port}/{name}"
+
+
+# Pengaturan pool koneksi. Total koneksi ke MySQL = jumlah proses Flask x
+# (pool_size + max_overflow); pastikan di bawah max_connections server.
+DB_POOL_CONFIG = {
+    'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),        # koneksi tetap per proses
+    'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),  # koneksi tambahan saat lonjakan
+    'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),  # detik menunggu koneksi bebas
+    'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 280)),  # di bawah wait_timeout MySQL
+    'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),        # buang koneksi mati sebelum dipakai
+}
+
+# Batas atas bucket histogram waktu tunggu checkout (milidetik)
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """Histogram waktu tunggu checkout dan counter saturasi pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+            self.checkouts = 0
+            self.overflow_checkouts = 0  # checkout yang memakai koneksi overflow
+            self.saturated_checkouts = 0  # checkout saat pool + overflow penuh (harus menunggu)
+            self.timeouts = 0
+            self.peak_checked_out = 0
+            self.total_wait_ms = 0.0
+
+    def record(self, wait_ms, checked_out, overflow, saturated):
+        with self._lock:
+            index = len(WAIT_BUCKETS_MS)
+            for i, bound in enumerate(WAIT_BUCKETS_MS):
+                if wait_ms <= bound:
+                    index = i
+                    break
+            self.buckets[index] += 1
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            if overflow > 0:
+                self.overflow_checkouts += 1
+            if saturated:
+                self.saturated_checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self):
+        with self._lock:
+            # le_ms None = di atas bucket terakhir
+            bounds = list(WAIT_BUCKETS_MS) + [None]
+            return {
+                'checkouts': self.checkouts,
+                'overflow_checkouts': self.overflow_checkouts,
+                'saturated_checkouts': self.saturated_checkouts,
+                'timeouts': self.timeouts,
+                'peak_checked_out': self.peak_checked_out,
+                'avg_wait_ms': self.total_wait_ms / self.checkouts if self.checkouts else 0.0,
+                'wait_histogram': [{'le_ms': bound, 'count': count}
+                                   for bound, count in zip(bounds, self.buckets)],
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool yang mencatat waktu tunggu checkout ke pool_metrics
+
+    Metrics disimpan di atribut kelas agar tetap utuh saat pool dibuat ulang
+    (engine.dispose() / recreate()).
+    """
+
+    metrics = pool_metrics
+
+    def _do_get(self):
+        saturated = self._max_overflow >= 0 and self.checkedout() >= self.size() + self._max_overflow
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+        wait_ms = (time.perf_counter() - start) * 1000
+        self.metrics.record(wait_ms, self.checkedout(), self.overflow(), saturated)
+        return conn
+
+
+def engine_options():
+    """Nilai SQLALCHEMY_ENGINE_OPTIONS untuk Flask-SQLAlchemy"""
+    return dict(DB_POOL_CONFIG, poolclass=InstrumentedQueuePool)
+
+
+def pool_stats(engine):
+    """Status pool saat ini ditambah metrics kumulatif, untuk /api/admin/metrics"""
+    pool = engine.pool
+    stats = pool_metrics.snapshot()
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'pool_size': pool.size(),
+            'max_overflow': DB_POOL_CONFIG['max_overflow'],
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': pool.overflow(),
+        })
+    return stats
@@ -0,0 +1,178 @@
+import ast
+import os
+import threading
+
+import cv2
+import numpy as np
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+# Pengaturan backend detektor objek. Hanya kelas yang dianggap pelanggaran yang
+# dipakai, sehingga post-processing (filter skor + NMS) jauh lebih ringan.
+DETECTOR_CONFIG = {
+    'backend': os.environ.get('DETECTOR_BACKEND', 'ultralytics'),  # ultralytics, onnxruntime
+    'weights': 'yolov8n.pt',
+    'classes': ('cell phone', 'book', 'laptop'),
+    'int8': os.environ.get('DETECTOR_INT8', 'false').lower() in ('1', 'true', 'yes'),
+    'threads': int(os.environ.get('DETECTOR_THREADS', '0')),  # 0 = default onnxruntime
+    'iou': 0.45,
+}
+
+
+def target_class_ids(names, classes=None):
+    """Index kelas model untuk label dalam classes (default DETECTOR_CONFIG)"""
+    classes = set(classes or DETECTOR_CONFIG['classes'])
+    return [int(idx) for idx, name in names.items() if name in classes]
+
+
+def onnx_path(weights, imgsz, int8=False):
+    """Lokasi file ONNX hasil export untuk bobot dan ukuran input tertentu"""
+    base = os.path.splitext(weights)[0]
+    return f"{base}-{imgsz}{'.int8' if int8 else ''}.onnx"
+
+
+class _FrameCalibrationReader:
+    """Data kalibrasi quantization statis dari frame yang sudah di-letterbox"""
+
+    def __init__(self, input_name, images):
+        self.input_name = input_name
+        self._images = iter(images)
+
+    def get_next(self):
+        image = next(self._images, None)
+        if image is None:
+            return None
+        return {self.input_name: _to_tensor(image)}
+
+
+def _to_tensor(image):
+    """BGR uint8 HxWx3 -> RGB float32 1x3xHxW (0-1)"""
+    rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    return np.ascontiguousarray(rgb.transpose(2, 0, 1)[np.newaxis], dtype=np.float32) / 255.0
+
+
+def export_onnx(weights=None, imgsz=None, int8=False, calibration_images=None):
+    """Export bobot YOLO ke ONNX (sekali), opsional quantization int8; return path file
+
+    Dengan calibration_images (frame letterbox) dipakai quantization statis,
+    tanpa itu quantization dinamis (bobot saja).
+    """
+    from preprocess import PREPROCESS_CONFIG
+
+    weights = weights or DETECTOR_CONFIG['weights']
+    imgsz = imgsz or PREPROCESS_CONFIG['input_sizes']['object']
+    fp32_path = onnx_path(weights, imgsz)
+    if not os.path.exists(fp32_path):
+        from ultralytics import YOLO
+        exported = YOLO(weights).export(format='onnx', imgsz=imgsz, dynamic=False, simplify=False)
+        os.replace(exported, fp32_path)
+    if not int8:
+        return fp32_path
+
+    int8_path = onnx_path(weights, imgsz, int8=True)
+    if not os.path.exists(int8_path):
+        from onnxruntime import quantization
+        if calibration_images is not None:
+            input_name = onnxruntime.InferenceSession(fp32_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+            quantization.quantize_static(fp32_path, int8_path, _FrameCalibrationReader(input_name, calibration_images),
+                                         weight_type=quantization.QuantType.QInt8)
+        else:
+            quantization.quantize_dynamic(fp32_path, int8_path, weight_type=quantization.QuantType.QUInt8)
+    return int8_path
+
+
+class UltralyticsDetector:
+    """Backend PyTorch (ultralytics) yang dibatasi ke kelas pelanggaran"""
+
+    name = 'ultralytics'
+
+    def __init__(self, weights=None, classes=None):
+        from ultralytics import YOLO
+        self.model = YOLO(weights or DETECTOR_CONFIG['weights'])
+        self.names = self.model.names
+        self.class_ids = target_class_ids(self.names, classes)
+        self._lock = threading.Lock()
+
+    def detect(self, images, conf=0.5, imgsz=None):
+        options = {'imgsz': imgsz} if imgsz else {}
+        with self._lock:
+            results = self.model.predict(source=list(images), conf=conf, classes=self.class_ids,
+                                         verbose=False, **options)
+        detections = []
+        for r in results:
+            boxes = []
+            for box in r.boxes:
+                x1, y1, x2, y2 = map(int, box.xyxy[0])
+                boxes.append((self.names[int(box.cls[0])], float(box.conf[0]), (x1, y1, x2, y2)))
+            detections.append(boxes)
+        return detections
+
+
+class OnnxDetector:
+    """Backend ONNX Runtime (CPU, optimasi graph penuh) untuk model YOLOv8 hasil export
+
+    Input: frame BGR yang sudah di-letterbox ke ukuran input model. Post-processing
+    hanya membaca skor kelas pelanggaran lalu NMS per kelas.
+    """
+
+    name = 'onnxruntime'
+
+    def __init__(self, path, classes=None, iou=None, threads=None):
+        if onnxruntime is None:
+            raise RuntimeError("Backend onnxruntime membutuhkan paket 'onnxruntime' (pip install onnxruntime)")
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = DETECTOR_CONFIG['threads'] if threads is None else threads
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.path = path
+        self.input_name = self.session.get_inputs()[0].name
+        self.imgsz = self.session.get_inputs()[0].shape[2]
+        # ultralytics menyimpan nama kelas di metadata model
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = {int(k): v for k, v in ast.literal_eval(metadata['names']).items()}
+        self.class_ids = np.array(target_class_ids(self.names, classes), dtype=np.int64)
+        self.iou = iou or DETECTOR_CONFIG['iou']
+
+    def detect(self, images, conf=0.5, imgsz=None):
+        detections = []
+        for image in images:
+            if image.shape[:2] != (self.imgsz, self.imgsz):
+                raise ValueError(f"Input ONNX harus letterbox {self.imgsz}x{self.imgsz}, dapat {image.shape[:2]}")
+            # Output YOLOv8: 1 x (4 + jumlah kelas) x kandidat
+            output = self.session.run(None, {self.input_name: _to_tensor(image)})[0][0]
+            scores = output[4 + self.class_ids]
+            best = scores.argmax(axis=0)
+            confidence = scores[best, np.arange(scores.shape[1])]
+            keep = confidence >= conf
+            if not keep.any():
+                detections.append([])
+                continue
+
+            cx, cy, w, h = output[:4, keep]
+            boxes = np.stack([cx - w / 2, cy - h / 2, w, h], axis=1)
+            confidence, labels = confidence[keep], self.class_ids[best[keep]]
+            indices = cv2.dnn.NMSBoxesBatched(boxes.tolist(), confidence.tolist(), labels.tolist(), conf, self.iou)
+            frame_detections = []
+            for i in np.array(indices).flatten():
+                x, y, bw, bh = boxes[i]
+                frame_detections.append((self.names[int(labels[i])], float(confidence[i]),
+                                         (int(x), int(y), int(x + bw), int(y + bh))))
+            detections.append(frame_detections)
+        return detections
+
+
+def load_detector(backend=None, weights=None, int8=None):
+    """Buat detektor sesuai DETECTOR_CONFIG (export ONNX otomatis jika belum ada)"""
+    backend = backend or DETECTOR_CONFIG['backend']
+    weights = weights or DETECTOR_CONFIG['weights']
+    if backend == 'ultralytics':
+        return UltralyticsDetector(weights)
+    if backend == 'onnxruntime':
+        int8 = DETECTOR_CONFIG['int8'] if int8 is None else int8
+        return OnnxDetector(export_onnx(weights, int8=int8))
+    raise ValueError(f"Backend detektor tidak dikenal: {backend}")
@@ -0,0 +1,105 @@
+import json
+import threading
+from collections import deque
+
+# Pengaturan channel push
+HUB_CONFIG = {
+    'heartbeat_seconds': 15,  # komentar SSE berkala agar proxy tidak menutup koneksi idle
+    'max_queue': 100,         # event tertahan per koneksi sebelum event tertua dibuang
+    'retry_ms': 3000,         # jeda reconnect EventSource di browser
+}
+
+
+class Subscription:
+    """Satu koneksi browser yang berlangganan channel"""
+
+    def __init__(self, key, max_queue):
+        self.key = key
+        self._events = deque(maxlen=max_queue)
+        self._ready = threading.Event()
+
+    def push(self, event):
+        self._events.append(event)
+        self._ready.set()
+
+    def next_batch(self, timeout):
+        """Tunggu event baru (maksimal timeout detik), return list event"""
+        self._ready.wait(timeout)
+        self._ready.clear()
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        return events
+
+
+class EventHub:
+    """Fan-out event proctor per (user_id, ujian_id) ke koneksi Server-Sent Events
+
+    Koneksi idle hanya menunggu threading.Event tanpa polling, sehingga biaya per
+    koneksi kecil; dengan worker gevent/eventlet (threading di-monkeypatch)
+    ribuan koneksi bisa dilayani tanpa ribuan thread OS.
+    """
+
+    def __init__(self, heartbeat_seconds=None, max_queue=None):
+        self.heartbeat_seconds = heartbeat_seconds or HUB_CONFIG['heartbeat_seconds']
+        self.max_queue = max_queue or HUB_CONFIG['max_queue']
+        self._lock = threading.Lock()
+        self._channels = {}
+        self._stats = {'published': 0, 'delivered': 0}
+
+    def subscribe(self, key):
+        subscription = Subscription(key, self.max_queue)
+        with self._lock:
+            self._channels.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.key)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.key]
+
+    def publish(self, key, event):
+        """Kirim event ke semua koneksi channel; return jumlah penerima"""
+        with self._lock:
+            subscribers = list(self._channels.get(key, ()))
+            self._stats['published'] += 1
+            self._stats['delivered'] += len(subscribers)
+        for subscription in subscribers:
+            subscription.push(event)
+        return len(subscribers)
+
+    def publisher(self, key):
+        """Callback siap pakai untuk ProctorSystem(callback_function=...)"""
+        return lambda event: self.publish(key, event)
+
+    def stream(self, key, initial_events=()):
+        """Generator SSE untuk satu koneksi (dipakai sebagai body Response)"""
+        subscription = self.subscribe(key)
+        try:
+            yield f"retry: {HUB_CONFIG['retry_ms']}\n\n"
+            for event in initial_events:
+                yield self.format_event(event)
+
+            while True:
+                events = subscription.next_batch(self.heartbeat_seconds)
+                if not events:
+                    yield ": ping\n\n"
+                    continue
+                for event in events:
+                    yield self.format_event(event)
+        finally:
+            self.unsubscribe(subscription)
+
+    def format_event(self, event):
+        name = event.get('action', 'violation')
+        return f"event: {name}\ndata: {json.dumps(event)}\n\n"
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['channels'] = len(self._channels)
+            stats['connections'] = sum(len(subs) for subs in self._channels.values())
+        return stats
@@ -0,0 +1,204 @@
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Pengaturan penyimpanan sesi ujian
+STORE_CONFIG = {
+    'backend': os.environ.get('EXAM_SESSION_BACKEND', 'memory'),  # memory, redis
+    'redis_url': os.environ.get('EXAM_SESSION_REDIS_URL', 'redis://localhost:6379/0'),
+    'grace_seconds': 300,  # sesi tetap disimpan sebentar setelah durasi ujian habis
+}
+
+
+def session_ttl(ujian):
+    """TTL sesi ujian dalam detik, dari Ujian.durasi_menit"""
+    return ujian.durasi_menit * 60 + STORE_CONFIG['grace_seconds']
+
+
+class ExamSessionStore(ABC):
+    """Penyimpanan sesi ujian aktif di server (daftar soal, waktu mulai, jawaban)
+
+    Sesi dikunci dengan (user_id, ujian_id). Jawaban disimpan terpisah dari data
+    sesi sehingga checkpoint jawaban cukup menulis soal yang berubah. Setiap jawaban
+    menyimpan nomor urut (seq) autosave yang terakhir mengubahnya: delta yang datang
+    terlambat atau dikirim ulang tidak menimpa jawaban yang lebih baru.
+    """
+
+    @abstractmethod
+    def create(self, user_id, ujian_id, soal_ids, start_time, ttl):
+        """Mulai sesi baru (menimpa sesi lama dengan kunci yang sama)"""
+
+    @abstractmethod
+    def get(self, user_id, ujian_id):
+        """Return dict sesi (ujian_id, soal_ids, start_time, jawaban, seq) atau None"""
+
+    def is_active(self, user_id, ujian_id):
+        return self.get(user_id, ujian_id) is not None
+
+    @abstractmethod
+    def save_answers(self, user_id, ujian_id, answers, seq):
+        """Gabungkan delta {soal_id: jawaban} bernomor urut seq ke sesi
+
+        Return jumlah jawaban yang diterapkan, atau None jika sesi tidak ada.
+        """
+
+    @abstractmethod
+    def delete(self, user_id, ujian_id):
+        """Hapus sesi beserta jawabannya"""
+
+
+class MemoryExamSessionStore(ExamSessionStore):
+    """Backend dalam proses; hanya cocok jika aplikasi berjalan di satu proses"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._last_sweep = time.time()
+
+    def create(self, user_id, ujian_id, soal_ids, start_time, ttl):
+        now = time.time()
+        with self._lock:
+            self._sessions[(user_id, ujian_id)] = {
+                'ujian_id': ujian_id,
+                'soal_ids': list(soal_ids),
+                'start_time': start_time,
+                'jawaban': {},
+                'jawaban_seq': {},
+                'seq': 0,
+                'expires_at': now + ttl,
+            }
+            if now - self._last_sweep > 60:
+                self._sweep(now)
+
+    def get(self, user_id, ujian_id):
+        with self._lock:
+            data = self._live((user_id, ujian_id))
+            if data is None:
+                return None
+            return {
+                'ujian_id': data['ujian_id'],
+                'soal_ids': list(data['soal_ids']),
+                'start_time': data['start_time'],
+                'jawaban': dict(data['jawaban']),
+                'seq': data['seq'],
+            }
+
+    def save_answers(self, user_id, ujian_id, answers, seq):
+        with self._lock:
+            data = self._live((user_id, ujian_id))
+            if data is None:
+                return None
+
+            applied = 0
+            for soal_id, pilihan in answers.items():
+                if data['jawaban_seq'].get(soal_id, 0) < seq:
+                    data['jawaban'][soal_id] = pilihan
+                    data['jawaban_seq'][soal_id] = seq
+                    applied += 1
+            data['seq'] = max(data['seq'], seq)
+            return applied
+
+    def delete(self, user_id, ujian_id):
+        with self._lock:
+            self._sessions.pop((user_id, ujian_id), None)
+
+    def _live(self, key):
+        data = self._sessions.get(key)
+        if data is not None and data['expires_at'] <= time.time():
+            del self._sessions[key]
+            return None
+        return data
+
+    def _sweep(self, now):
+        expired = [key for key, data in self._sessions.items() if data['expires_at'] <= now]
+        for key in expired:
+            del self._sessions[key]
+        self._last_sweep = now
+
+
+# Merge delta secara atomik: nilai hash jawaban berformat "<seq>|<pilihan>",
+# field _seq menyimpan nomor urut tertinggi yang pernah diterima
+_SAVE_ANSWERS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return -1 end
+local seq = tonumber(ARGV[1])
+local applied = 0
+for i = 2, #ARGV, 2 do
+    local current = redis.call('HGET', KEYS[2], ARGV[i])
+    if (not current) or tonumber(string.match(current, '^(%d+)|')) < seq then
+        redis.call('HSET', KEYS[2], ARGV[i], seq .. '|' .. ARGV[i + 1])
+        applied = applied + 1
+    end
+end
+local last = tonumber(redis.call('HGET', KEYS[2], '_seq') or '0')
+if seq > last then redis.call('HSET', KEYS[2], '_seq', seq) end
+redis.call('EXPIRE', KEYS[2], redis.call('TTL', KEYS[1]))
+return applied
+"""
+
+
+class RedisExamSessionStore(ExamSessionStore):
+    """Backend Redis (atau server kompatibel Redis) yang dipakai bersama semua proses"""
+
+    def __init__(self, url=None, client=None):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("Backend redis membutuhkan paket 'redis' (pip install redis)")
+            client = redis.Redis.from_url(url or STORE_CONFIG['redis_url'], decode_responses=True)
+        self.client = client
+        self._save_answers = client.register_script(_SAVE_ANSWERS_SCRIPT)
+
+    def _keys(self, user_id, ujian_id):
+        base = f"ujian:{ujian_id}:user:{user_id}"
+        return base + ":meta", base + ":jawaban"
+
+    def create(self, user_id, ujian_id, soal_ids, start_time, ttl):
+        meta_key, jawaban_key = self._keys(user_id, ujian_id)
+        meta = json.dumps({'ujian_id': ujian_id, 'soal_ids': list(soal_ids), 'start_time': start_time})
+        pipe = self.client.pipeline()
+        pipe.set(meta_key, meta, ex=ttl)
+        pipe.delete(jawaban_key)
+        pipe.execute()
+
+    def get(self, user_id, ujian_id):
+        meta_key, jawaban_key = self._keys(user_id, ujian_id)
+        pipe = self.client.pipeline()
+        pipe.get(meta_key)
+        pipe.hgetall(jawaban_key)
+        meta, jawaban = pipe.execute()
+        if meta is None:
+            return None
+        data = json.loads(meta)
+        data['seq'] = int(jawaban.pop('_seq', 0))
+        data['jawaban'] = {soal_id: value.split('|', 1)[1] for soal_id, value in jawaban.items()}
+        return data
+
+    def is_active(self, user_id, ujian_id):
+        meta_key, _ = self._keys(user_id, ujian_id)
+        return bool(self.client.exists(meta_key))
+
+    def save_answers(self, user_id, ujian_id, answers, seq):
+        args = [seq]
+        for soal_id, pilihan in answers.items():
+            args.extend([soal_id, pilihan])
+        applied = self._save_answers(keys=list(self._keys(user_id, ujian_id)), args=args)
+        return None if applied < 0 else applied
+
+    def delete(self, user_id, ujian_id):
+        self.client.delete(*self._keys(user_id, ujian_id))
+
+
+def create_exam_session_store(backend=None):
+    """Buat store sesi ujian sesuai konfigurasi"""
+    backend = backend or STORE_CONFIG['backend']
+    if backend == 'memory':
+        return MemoryExamSessionStore()
+    if backend == 'redis':
+        return RedisExamSessionStore()
+    raise ValueError(f"Backend sesi ujian tidak dikenal: {backend}")
@@ -0,0 +1,142 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Tata letak header (int64) di awal buffer
+_SEQ = 0            # sequence frame terbaru yang sudah dipublikasikan (0 = kosong)
+_FRONT = 1          # slot yang berisi frame terbaru
+_SLOT_SEQ = 2       # [2, 3]: sequence isi slot 0/1, -1 saat sedang ditulis
+_SLOT_SHAPE = 4     # [4..7]: tinggi, lebar slot 0 lalu slot 1
+_CAPACITY = 8       # [8..10]: tinggi, lebar, channel maksimum
+_HEADER_LEN = 12
+_HEADER_BYTES = _HEADER_LEN * 8
+_WRITING = -1
+_READ_RETRIES = 5
+
+
+class LatestFrameBuffer:
+    """Buffer frame terbaru dengan dua slot (double buffer) dan nomor sequence
+
+    Satu penulis menyalin frame ke slot belakang lalu mempublikasikannya sebagai
+    slot depan; pembaca selalu mendapat frame terbaru tanpa lock. Jika slot yang
+    sedang disalin pembaca ditimpa penulis, pembaca mengulang (seqlock). Memori
+    slot dialokasikan sekali dan hanya diganti jika frame melebihi kapasitas.
+
+    Dengan shared=True buffer berada di multiprocessing.shared_memory sehingga
+    proses lain bisa attach(name) dan membaca frame tanpa pipe/serialisasi;
+    kapasitasnya tetap sebesar `shape`.
+    """
+
+    def __init__(self, shape=None, dtype=np.uint8, shared=False, name=None):
+        self.dtype = np.dtype(dtype)
+        self._shm = None
+        self._owner = True
+        self._header = np.zeros(_HEADER_LEN, dtype=np.int64)
+        self._slots = None
+        if shared:
+            if shape is None:
+                raise ValueError("Buffer shared memory membutuhkan shape (tinggi, lebar, channel)")
+            size = _HEADER_BYTES + 2 * int(np.prod(shape)) * self.dtype.itemsize
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self._map_shared(tuple(shape))
+            self._header[:] = 0
+            self._header[_CAPACITY:_CAPACITY + 3] = shape
+        elif shape is not None:
+            self._allocate(tuple(shape))
+
+    @classmethod
+    def attach(cls, name, dtype=np.uint8):
+        """Buka buffer shared memory milik proses lain"""
+        buffer = cls.__new__(cls)
+        buffer.dtype = np.dtype(dtype)
+        buffer._owner = False
+        buffer._shm = shared_memory.SharedMemory(name=name)
+        header = np.ndarray((_HEADER_LEN,), dtype=np.int64, buffer=buffer._shm.buf)
+        buffer._map_shared(tuple(int(v) for v in header[_CAPACITY:_CAPACITY + 3]))
+        return buffer
+
+    @property
+    def name(self):
+        """Nama shared memory untuk attach(), None jika buffer lokal"""
+        return self._shm.name if self._shm is not None else None
+
+    @property
+    def seq(self):
+        """Sequence frame terbaru (0 = belum ada frame)"""
+        return int(self._header[_SEQ])
+
+    @property
+    def capacity(self):
+        return tuple(self._slots[0].shape) if self._slots is not None else None
+
+    def _map_shared(self, shape):
+        buf = self._shm.buf
+        self._header = np.ndarray((_HEADER_LEN,), dtype=np.int64, buffer=buf)
+        slot_bytes = int(np.prod(shape)) * self.dtype.itemsize
+        self._slots = [
+            np.ndarray(shape, dtype=self.dtype, buffer=buf, offset=_HEADER_BYTES + i * slot_bytes)
+            for i in range(2)
+        ]
+
+    def _allocate(self, shape):
+        self._slots = [np.empty(shape, dtype=self.dtype) for _ in range(2)]
+        self._header[_CAPACITY:_CAPACITY + 3] = shape
+
+    def write(self, frame):
+        """Salin frame ke slot belakang lalu publikasikan; return sequence-nya"""
+        h, w = frame.shape[:2]
+        capacity = self.capacity
+        if capacity is None or h > capacity[0] or w > capacity[1] or frame.shape[2:] != capacity[2:]:
+            if self._shm is not None:
+                raise ValueError(f"Frame {frame.shape} melebihi kapasitas buffer {capacity}")
+            self._allocate(frame.shape)
+
+        seq = int(self._header[_SEQ]) + 1
+        slot = 1 - int(self._header[_FRONT])
+        self._header[_SLOT_SEQ + slot] = _WRITING
+        np.copyto(self._slots[slot][:h, :w], frame, casting='unsafe')
+        self._header[_SLOT_SHAPE + 2 * slot] = h
+        self._header[_SLOT_SHAPE + 2 * slot + 1] = w
+        self._header[_SLOT_SEQ + slot] = seq
+        self._header[_FRONT] = slot
+        self._header[_SEQ] = seq
+        return seq
+
+    def read(self, newer_than=None, copy=True):
+        """Return (seq, frame) terbaru
+
+        frame bernilai None jika buffer masih kosong atau sequence terbaru tidak
+        lebih baru dari newer_than. copy=False mengembalikan view langsung ke
+        slot (tanpa salinan) yang hanya valid sampai dua write berikutnya.
+        """
+        seq = 0
+        for _ in range(_READ_RETRIES):
+            seq = int(self._header[_SEQ])
+            if seq == 0 or (newer_than is not None and seq <= newer_than):
+                return seq, None
+            slot = int(self._header[_FRONT])
+            if int(self._header[_SLOT_SEQ + slot]) != seq:
+                continue  # publikasi sedang berlangsung
+            h = int(self._header[_SLOT_SHAPE + 2 * slot])
+            w = int(self._header[_SLOT_SHAPE + 2 * slot + 1])
+            view = self._slots[slot][:h, :w]
+            if not copy:
+                return seq, view
+            frame = view.copy()
+            if int(self._header[_SLOT_SEQ + slot]) == seq:
+                return seq, frame
+        return seq, None
+
+    def close(self):
+        """Lepas shared memory; pemilik juga menghapusnya"""
+        if self._shm is None:
+            return
+        self._slots = None
+        self._header = np.zeros(_HEADER_LEN, dtype=np.int64)
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+        self._shm = None
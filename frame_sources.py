@@ -0,0 +1,321 @@
+import glob
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+
+# Pengaturan sumber frame dan penjadwal analisis
+FRAME_SOURCE_CONFIG = {
+    'analysis_fps': 5.0,        # frame yang dianalisis per detik per sumber
+    'reconnect_delay': 2.0,     # detik sebelum membuka ulang kamera/stream yang putus
+    'max_reconnect_delay': 30.0,  # jeda dilipatgandakan setiap gagal, sampai batas ini
+    'image_extensions': ('.jpg', '.jpeg', '.png'),
+}
+
+
+class FrameSource(ABC):
+    """Sumber frame BGR untuk ProctorSystem
+
+    read() mengembalikan frame terbaru yang belum pernah dikembalikan, atau None
+    jika belum ada frame baru. Sumber live selalu melompat ke frame terbaru
+    sehingga tidak ada backlog yang diproses. exhausted bernilai True jika sumber
+    sudah habis (file selesai diputar atau sumber ditutup).
+    """
+
+    name = 'source'
+
+    def __init__(self):
+        self.exhausted = False
+        self.stats = {'frames': 0, 'skipped': 0}
+
+    @abstractmethod
+    def read(self):
+        """Frame BGR terbaru yang belum pernah dikembalikan, atau None"""
+
+    def close(self):
+        self.exhausted = True
+
+    def _deliver(self, frame, skipped=0):
+        self.stats['frames'] += 1
+        self.stats['skipped'] += skipped
+        return frame
+
+
+class CameraSource(FrameSource):
+    """Webcam (index) atau stream jaringan (rtsp://, http://)
+
+    Thread pembaca terus mengambil frame agar buffer driver/stream tidak menumpuk;
+    hanya frame terakhir yang disimpan. Kamera atau stream yang gagal dibaca
+    (dicabut, dipakai aplikasi lain, jaringan putus) dibuka ulang dengan backoff;
+    sumber ini hanya habis jika ditutup.
+    """
+
+    def __init__(self, device=0, reconnect_delay=None, max_reconnect_delay=None):
+        super().__init__()
+        self.device = device
+        self.name = f'camera:{device}'
+        self.reconnect_delay = reconnect_delay or FRAME_SOURCE_CONFIG['reconnect_delay']
+        self.max_reconnect_delay = max_reconnect_delay or FRAME_SOURCE_CONFIG['max_reconnect_delay']
+        self.stats['reconnects'] = 0
+        self._closed = threading.Event()
+        self._lock = threading.Lock()
+        self._frame = None
+        self._seq = 0
+        self._read_seq = 0
+        self._cap = self._open()
+        if not self._cap.isOpened():
+            raise IOError(f"Tidak dapat mengakses kamera {device}")
+        self._thread = threading.Thread(target=self._grab_loop)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _open(self):
+        return cv2.VideoCapture(self.device)
+
+    def _grab_loop(self):
+        delay = self.reconnect_delay
+        while not self.exhausted:
+            ok, frame = self._cap.read()
+            if not ok:
+                self._cap.release()
+                if self._closed.wait(delay):
+                    break
+                delay = min(self.max_reconnect_delay, delay * 2)
+                self._cap = self._open()
+                self.stats['reconnects'] += 1
+                continue
+            delay = self.reconnect_delay
+            with self._lock:
+                self._frame = frame
+                self._seq += 1
+        self._cap.release()
+
+    def close(self):
+        super().close()
+        self._closed.set()
+
+    def read(self):
+        with self._lock:
+            if self._seq == self._read_seq:
+                return None
+            skipped = self._seq - self._read_seq - 1
+            self._read_seq = self._seq
+            frame = self._frame
+        return self._deliver(frame, skipped)
+
+
+class VideoFileSource(FrameSource):
+    """Putar ulang file video
+
+    realtime=True mengikuti waktu dinding (frame yang terlewat dilompati, seperti
+    kamera); realtime=False mengembalikan setiap frame berurutan, cocok untuk test.
+    """
+
+    def __init__(self, path, realtime=True, loop=False):
+        super().__init__()
+        self.path = path
+        self.name = f'file:{os.path.basename(path)}'
+        self.realtime = realtime
+        self.loop = loop
+        self._cap = cv2.VideoCapture(path)
+        if not self._cap.isOpened():
+            raise IOError(f"Tidak dapat membuka video {path}")
+        self.fps = self._cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self._next_index = 0
+        self._started_at = None
+
+    def read(self):
+        if self.exhausted:
+            return None
+        skipped = 0
+        if self.realtime:
+            now = time.monotonic()
+            if self._started_at is None:
+                self._started_at = now
+            target = int((now - self._started_at) * self.fps)
+            if target < self._next_index:
+                return None
+            # Lewati frame yang sudah lewat waktunya tanpa decode penuh
+            while self._next_index < target:
+                if not self._cap.grab():
+                    return self._end_of_file()
+                self._next_index += 1
+                skipped += 1
+
+        ok, frame = self._cap.read()
+        if not ok:
+            return self._end_of_file()
+        self._next_index += 1
+        return self._deliver(frame, skipped)
+
+    def _end_of_file(self):
+        if self.loop:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self._next_index = 0
+            self._started_at = None
+        else:
+            self.close()
+        return None
+
+    def close(self):
+        super().close()
+        self._cap.release()
+
+
+class ImageDirectorySource(FrameSource):
+    """Folder berisi JPEG/PNG, diputar urut nama file
+
+    fps diisi untuk mengikuti waktu dinding seperti video; None = berurutan.
+    """
+
+    def __init__(self, path, fps=None, loop=False):
+        super().__init__()
+        self.path = path
+        self.name = f'dir:{os.path.basename(os.path.normpath(path))}'
+        self.fps = fps
+        self.loop = loop
+        self._files = sorted(
+            f for f in glob.glob(os.path.join(path, '*'))
+            if f.lower().endswith(FRAME_SOURCE_CONFIG['image_extensions'])
+        )
+        if not self._files:
+            raise IOError(f"Tidak ada gambar di {path}")
+        self._next_index = 0
+        self._started_at = None
+
+    def read(self):
+        if self.exhausted:
+            return None
+        skipped = 0
+        index = self._next_index
+        if self.fps:
+            now = time.monotonic()
+            if self._started_at is None:
+                self._started_at = now
+            target = int((now - self._started_at) * self.fps)
+            if target < self._next_index:
+                return None
+            skipped = target - self._next_index
+            index = target
+
+        if index >= len(self._files):
+            if not self.loop:
+                self.close()
+                return None
+            self._next_index = 0
+            self._started_at = None
+            return None
+
+        self._next_index = index + 1
+        frame = cv2.imread(self._files[index], cv2.IMREAD_COLOR)
+        if frame is None:
+            return None
+        return self._deliver(frame, skipped)
+
+
+class UploadQueueSource(FrameSource):
+    """Frame yang didorong dari luar (mis. upload browser) sebagai bytes JPEG atau array
+
+    Hanya unggahan terakhir yang disimpan dan baru di-decode saat dibaca, jadi
+    unggahan yang tersusul tidak pernah di-decode.
+    """
+
+    name = 'upload'
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._latest = None
+        self._pending_skipped = 0
+
+    def push(self, data):
+        with self._lock:
+            if self._latest is not None:
+                self._pending_skipped += 1
+            self._latest = data
+
+    def read(self):
+        with self._lock:
+            data, self._latest = self._latest, None
+            skipped, self._pending_skipped = self._pending_skipped, 0
+        if data is None:
+            return None
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            data = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if data is None:
+                return None
+        return self._deliver(data, skipped)
+
+
+def open_source(spec, realtime=True, loop=False):
+    """Buat FrameSource dari spesifikasi: index webcam, URL stream, folder, atau file video
+
+    loop hanya berlaku untuk file dan folder (diputar ulang terus).
+    """
+    if isinstance(spec, FrameSource):
+        return spec
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(int(spec))
+    if '://' in spec:
+        return CameraSource(spec)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, fps=FRAME_SOURCE_CONFIG['analysis_fps'] if realtime else None, loop=loop)
+    return VideoFileSource(spec, realtime=realtime, loop=loop)
+
+
+class FrameScheduler:
+    """Jalankan handler(frame) pada laju tetap untuk satu sumber
+
+    Jadwal dihitung dari waktu mulai tiap tick, bukan tidur tetap setelah
+    pemrosesan; jika pemrosesan lebih lama dari satu periode, tick berikutnya
+    langsung mengambil frame terbaru (tidak mengejar backlog).
+    """
+
+    def __init__(self, source, handler, fps=None):
+        self.source = source
+        self.handler = handler
+        self.fps = fps or FRAME_SOURCE_CONFIG['analysis_fps']
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {'ticks': 0, 'processed': 0, 'idle': 0, 'overruns': 0}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def run(self):
+        period = 1.0 / self.fps
+        next_tick = time.monotonic()
+        while not self._stop.is_set() and not self.source.exhausted:
+            self.stats['ticks'] += 1
+            frame = self.source.read()
+            if frame is None:
+                self.stats['idle'] += 1
+            else:
+                try:
+                    self.handler(frame)
+                    self.stats['processed'] += 1
+                except Exception as e:
+                    print(f"Error memproses frame dari {self.source.name}: {e}")
+
+            next_tick += period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                self.stats['overruns'] += 1
+                next_tick = time.monotonic()
@@ -0,0 +1,76 @@
+import argparse
+import sys
+
+from migrate import get_engine
+from soal_io import IMPORT_CONFIG, export_soal, import_soal
+
+
+def print_progress(report):
+    print(f"   {report.read} baris dibaca, {report.inserted} disimpan, "
+          f"{report.duplicates} duplikat, {report.invalid} tidak valid "
+          f"({report.rows_per_sec:.0f} baris/detik)")
+
+
+def run_import(engine, args):
+    print(f"📥 Import bank soal dari {args.file}...")
+    error_log = open(args.errors, 'w', encoding='utf-8') if args.errors else None
+    try:
+        report = import_soal(engine, args.file, fmt=args.format, chunk_size=args.chunk_size,
+                             resume=not args.no_resume, error_log=error_log, progress=print_progress)
+    except Exception as e:
+        print(f"\n❌ Import terhenti: {e}")
+        print("   Jalankan ulang perintah yang sama untuk melanjutkan dari checkpoint terakhir.")
+        return False
+    finally:
+        if error_log:
+            error_log.close()
+
+    if report.skipped:
+        print(f"   ⏩ {report.skipped} baris dilewati (sudah diimport sebelumnya)")
+    print(f"\n✅ Import selesai dalam {report.elapsed:.1f} detik ({report.rows_per_sec:.0f} baris/detik)")
+    print(f"   Disimpan: {report.inserted}, duplikat: {report.duplicates}, tidak valid: {report.invalid}")
+    if report.invalid and args.errors:
+        print(f"   Detail baris tidak valid: {args.errors}")
+    return True
+
+
+def run_export(engine, args):
+    # Pesan status ke stderr jika data ditulis ke stdout
+    log = sys.stderr if args.file == '-' else sys.stdout
+    print(f"📤 Export bank soal ke {args.file}...", file=log)
+    out = sys.stdout if args.file == '-' else open(args.file, 'w', newline='', encoding='utf-8')
+    try:
+        fmt = args.format or ('csv' if args.file == '-' else args.file.rsplit('.', 1)[-1])
+        count = export_soal(engine, out, fmt, kategori=args.kategori)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"✅ {count} soal diexport", file=log)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import/export bank soal (CSV atau JSONL)')
+    parser.add_argument('--database-url', help='default: SQLALCHEMY_DATABASE_URI aplikasi')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help='import soal dari file')
+    import_parser.add_argument('file')
+    import_parser.add_argument('--format', choices=['csv', 'jsonl'], help='default: dari ekstensi file')
+    import_parser.add_argument('--chunk-size', type=int, default=IMPORT_CONFIG['chunk_size'])
+    import_parser.add_argument('--no-resume', action='store_true', help='abaikan checkpoint, mulai dari awal')
+    import_parser.add_argument('--errors', help='tulis baris tidak valid ke file JSONL ini')
+
+    export_parser = subparsers.add_parser('export', help="export soal ke file ('-' = stdout)")
+    export_parser.add_argument('file')
+    export_parser.add_argument('--format', choices=['csv', 'jsonl'], help='default: dari ekstensi file')
+    export_parser.add_argument('--kategori')
+
+    args = parser.parse_args()
+    engine = get_engine(args.database_url)
+    ok = run_import(engine, args) if args.command == 'import' else run_export(engine, args)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import glob
+import importlib.util
+import os
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, create_engine
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+schema_migrations = Table(
+    'schema_migrations', MetaData(),
+    Column('version', String(20), primary_key=True),
+    Column('description', String(255)),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+
+def load_migrations():
+    """Semua migration di folder migrations/, urut berdasarkan VERSION"""
+    migrations = []
+    for path in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, '[0-9]*.py'))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        spec = importlib.util.spec_from_file_location(f'migrations.m{name}', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        migrations.append(module)
+    return sorted(migrations, key=lambda m: m.VERSION)
+
+
+def applied_versions(engine):
+    schema_migrations.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        return {row.version for row in conn.execute(schema_migrations.select())}
+
+
+def upgrade(engine, target=None):
+    """Jalankan migration yang belum diterapkan sampai target (default: terbaru)"""
+    applied = applied_versions(engine)
+    done = []
+    for migration in load_migrations():
+        if target and migration.VERSION > target:
+            break
+        if migration.VERSION in applied:
+            continue
+        # DDL MySQL auto-commit; migration ditulis idempotent agar aman diulang
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=migration.VERSION,
+                description=migration.DESCRIPTION,
+                applied_at=datetime.utcnow()
+            ))
+        done.append(migration.VERSION)
+    return done
+
+
+def downgrade(engine, target):
+    """Batalkan migration yang lebih baru dari target ('0000' = semua)"""
+    applied = applied_versions(engine)
+    done = []
+    for migration in reversed(load_migrations()):
+        if migration.VERSION <= target or migration.VERSION not in applied:
+            continue
+        with engine.begin() as conn:
+            migration.downgrade(conn)
+            conn.execute(schema_migrations.delete().where(schema_migrations.c.version == migration.VERSION))
+        done.append(migration.VERSION)
+    return done
+
+
+def get_engine(database_url=None):
+    if database_url:
+        return create_engine(database_url)
+    from app import app, db
+    with app.app_context():
+        return db.engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Migration skema database ujian_proctor')
+    parser.add_argument('command', choices=['upgrade', 'downgrade', 'status'])
+    parser.add_argument('target', nargs='?', help="versi tujuan, mis. 0001 (downgrade ke '0000' = semua)")
+    parser.add_argument('--database-url', help='default: SQLALCHEMY_DATABASE_URI aplikasi')
+    args = parser.parse_args()
+
+    engine = get_engine(args.database_url)
+
+    if args.command == 'status':
+        applied = applied_versions(engine)
+        for migration in load_migrations():
+            mark = '✅' if migration.VERSION in applied else '⏳'
+            print(f"{mark} {migration.VERSION} {migration.DESCRIPTION}")
+    elif args.command == 'upgrade':
+        done = upgrade(engine, args.target)
+        print(f"✅ Migration diterapkan: {', '.join(done)}" if done else "✅ Skema sudah terbaru")
+    else:
+        if not args.target:
+            parser.error('downgrade membutuhkan versi tujuan')
+        done = downgrade(engine, args.target)
+        print(f"✅ Migration dibatalkan: {', '.join(done)}" if done else "✅ Tidak ada yang dibatalkan")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""Index untuk predikat query yang sering dipakai dan unique (user_id, ujian_id) hasil ujian"""
+from sqlalchemy import text
+
+from migrations import create_index, drop_index
+
+VERSION = '0001'
+DESCRIPTION = 'hot path indexes'
+
+# (tabel, nama index, kolom, unique) -- harus sama dengan __table_args__ di app.py
+INDEXES = [
+    # sampling soal per kategori (QuestionIndex) dan listing bank soal per kategori
+    ('bank_soal', 'ix_bank_soal_kategori_id', ['kategori', 'id', 'tingkat_kesulitan'], False),
+    # cek "sudah mengerjakan" di mulai_ujian dan pencegahan submit ganda
+    ('hasil_ujian', 'uq_hasil_ujian_user_ujian', ['user_id', 'ujian_id'], True),
+    # rescore, filter listing hasil per ujian
+    ('hasil_ujian', 'ix_hasil_ujian_ujian_id', ['ujian_id', 'id'], False),
+    # listing peserta dan total siswa
+    ('user', 'ix_user_role_id', ['role', 'id'], False),
+    # ujian aktif di dashboard siswa
+    ('ujian', 'ix_ujian_status_id', ['status', 'id'], False),
+    # listing log pelanggaran (keyset pagination), dengan dan tanpa filter
+    ('log_pelanggaran', 'ix_log_pelanggaran_timestamp_id', ['timestamp', 'id'], False),
+    ('log_pelanggaran', 'ix_log_pelanggaran_ujian_timestamp', ['ujian_id', 'timestamp', 'id'], False),
+    ('log_pelanggaran', 'ix_log_pelanggaran_user_timestamp', ['user_id', 'timestamp', 'id'], False),
+]
+
+
+def upgrade(conn):
+    duplicates = conn.execute(text(
+        "SELECT COUNT(*) FROM (SELECT user_id, ujian_id FROM hasil_ujian "
+        "GROUP BY user_id, ujian_id HAVING COUNT(*) > 1) d"
+    )).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} pasangan (user_id, ujian_id) punya lebih dari satu hasil ujian; "
+            "bersihkan duplikat sebelum menambahkan unique index"
+        )
+
+    for table, name, columns, unique in INDEXES:
+        create_index(conn, table, name, columns, unique=unique)
+
+
+def downgrade(conn):
+    for table, name, _, _ in reversed(INDEXES):
+        drop_index(conn, table, name)
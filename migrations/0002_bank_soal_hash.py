@@ -0,0 +1,49 @@
+"""Kolom bank_soal.soal_hash (unique) untuk deduplikasi import bank soal"""
+from sqlalchemy import MetaData, String, Table, inspect, select, text
+
+from migrations import create_index, drop_index
+from soal_io import soal_hash
+
+VERSION = '0002'
+DESCRIPTION = 'bank soal hash'
+
+BACKFILL_CHUNK = 1000
+
+
+def upgrade(conn):
+    columns = {column['name'] for column in inspect(conn).get_columns('bank_soal')}
+    if 'soal_hash' not in columns:
+        type_sql = String(64).compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE bank_soal ADD COLUMN soal_hash {type_sql}"))
+
+    # Isi hash soal lama per chunk; duplikat yang sudah ada dibiarkan NULL
+    # (unique index mengizinkan banyak NULL) agar migration tidak gagal
+    bank_soal = Table('bank_soal', MetaData(), autoload_with=conn)
+    seen = {row[0] for row in conn.execute(
+        select(bank_soal.c.soal_hash).where(bank_soal.c.soal_hash.isnot(None))
+    )}
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(bank_soal.c.id, bank_soal.c.pertanyaan, bank_soal.c.pilihan_a, bank_soal.c.pilihan_b,
+                   bank_soal.c.pilihan_c, bank_soal.c.pilihan_d)
+            .where(bank_soal.c.id > last_id, bank_soal.c.soal_hash.is_(None))
+            .order_by(bank_soal.c.id).limit(BACKFILL_CHUNK)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            value = soal_hash(row.pertanyaan, row.pilihan_a, row.pilihan_b, row.pilihan_c, row.pilihan_d)
+            if value not in seen:
+                seen.add(value)
+                conn.execute(bank_soal.update().where(bank_soal.c.id == row.id).values(soal_hash=value))
+        last_id = rows[-1].id
+
+    create_index(conn, 'bank_soal', 'uq_bank_soal_soal_hash', ['soal_hash'], unique=True)
+
+
+def downgrade(conn):
+    drop_index(conn, 'bank_soal', 'uq_bank_soal_soal_hash')
+    columns = {column['name'] for column in inspect(conn).get_columns('bank_soal')}
+    if 'soal_hash' in columns:
+        conn.execute(text("ALTER TABLE bank_soal DROP COLUMN soal_hash"))
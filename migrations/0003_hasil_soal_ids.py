@@ -0,0 +1,18 @@
+"""Kolom hasil_ujian.soal_ids: daftar soal yang diberikan ke peserta, dipakai saat menilai ulang"""
+from sqlalchemy import inspect, text
+
+VERSION = '0003'
+DESCRIPTION = 'hasil ujian soal ids'
+
+
+def upgrade(conn):
+    # Hasil lama dibiarkan NULL; rescore memakai jawaban tersimpan sebagai cadangan
+    columns = {column['name'] for column in inspect(conn).get_columns('hasil_ujian')}
+    if 'soal_ids' not in columns:
+        conn.execute(text("ALTER TABLE hasil_ujian ADD COLUMN soal_ids TEXT"))
+
+
+def downgrade(conn):
+    columns = {column['name'] for column in inspect(conn).get_columns('hasil_ujian')}
+    if 'soal_ids' in columns:
+        conn.execute(text("ALTER TABLE hasil_ujian DROP COLUMN soal_ids"))
@@ -0,0 +1,23 @@
+from sqlalchemy import Index, MetaData, Table, inspect
+
+
+def index_exists(conn, table, name):
+    return any(index['name'] == name for index in inspect(conn).get_indexes(table))
+
+
+def create_index(conn, table, name, columns, unique=False):
+    """Buat index jika belum ada (db.create_all sudah membuatnya di database baru)"""
+    if index_exists(conn, table, name):
+        return False
+    table_obj = Table(table, MetaData(), autoload_with=conn)
+    Index(name, *(table_obj.c[column] for column in columns), unique=unique).create(conn)
+    return True
+
+
+def drop_index(conn, table, name):
+    """Hapus index jika ada"""
+    if not index_exists(conn, table, name):
+        return False
+    table_obj = Table(table, MetaData(), autoload_with=conn)
+    Index(name, _table=table_obj).drop(conn)
+    return True
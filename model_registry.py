@@ -0,0 +1,119 @@
+import threading
+
+# Pengaturan model deteksi
+MODEL_CONFIG = {
+    'yolo_weights': 'yolov8n.pt',
+    'pose': {'min_detection_confidence': 0.5, 'min_tracking_confidence': 0.5},
+    'face': {'min_detection_confidence': 0.5},
+    'keep_loaded': True,  # tetap simpan YOLO di memori walau tidak ada sesi aktif
+}
+
+
+class ModelLease:
+    """Pinjaman detektor dari registry untuk satu sesi (atau satu worker)"""
+
+    def __init__(self, registry, static_image_mode=False):
+        self.registry = registry
+        self.static_image_mode = static_image_mode
+        self.released = False
+
+    @property
+    def model(self):
+        return self.registry.get_yolo()
+
+    @property
+    def pose(self):
+        return self.registry.get_pose(self.static_image_mode)
+
+    @property
+    def face(self):
+        return self.registry.get_face()
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.registry.release(self)
+
+
+class ModelRegistry:
+    """Registry model untuk seluruh proses: dimuat sekali (lazy) lalu dipinjam banyak sesi
+
+    Detektor objek (backend dari DETECTOR_CONFIG) dipakai bersama; backend
+    ultralytics memakai lock, onnxruntime aman dipanggil paralel. Graph MediaPipe tidak thread-safe
+    sehingga setiap thread mendapat instance Pose/FaceDetection sendiri.
+    """
+
+    def __init__(self, config=None):
+        self.config = dict(MODEL_CONFIG)
+        if config:
+            self.config.update(config)
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._yolo = None
+        self._refcount = 0
+
+    def acquire(self, static_image_mode=False):
+        """Pinjam detektor; kembalikan dengan lease.release()"""
+        with self._lock:
+            self._refcount += 1
+        return ModelLease(self, static_image_mode)
+
+    def release(self, lease):
+        with self._lock:
+            self._refcount = max(0, self._refcount - 1)
+            if self._refcount == 0 and not self.config['keep_loaded']:
+                self._yolo = None
+
+    @property
+    def refcount(self):
+        return self._refcount
+
+    def get_yolo(self):
+        if self._yolo is None:
+            with self._lock:
+                if self._yolo is None:
+                    from detector_backends import load_detector
+                    self._yolo = load_detector(weights=self.config['yolo_weights'])
+        return self._yolo
+
+    def get_pose(self, static_image_mode=False):
+        graphs = self._thread_graphs()
+        key = ('pose', static_image_mode)
+        if key not in graphs:
+            import mediapipe as mp
+            options = dict(self.config['pose'])
+            if static_image_mode:
+                options.pop('min_tracking_confidence', None)
+            graphs[key] = mp.solutions.pose.Pose(static_image_mode=static_image_mode, **options)
+        return graphs[key]
+
+    def get_face(self):
+        graphs = self._thread_graphs()
+        if 'face' not in graphs:
+            import mediapipe as mp
+            graphs['face'] = mp.solutions.face_detection.FaceDetection(**self.config['face'])
+        return graphs['face']
+
+    def warm_up(self, static_image_mode=False):
+        """Muat model dan jalankan satu inferensi kosong agar sesi pertama tidak lambat"""
+        import numpy as np
+        from batch_inference import predict_objects
+        from preprocess import PREPROCESS_CONFIG
+
+        # Ukuran sama dengan input hasil preprocessing
+        sizes = PREPROCESS_CONFIG['input_sizes']
+        letterboxed = np.zeros((sizes['object'], sizes['object'], 3), dtype=np.uint8)
+        predict_objects(self.get_yolo(), [letterboxed], imgsz=sizes['object'])
+        self.get_pose(static_image_mode).process(np.zeros((sizes['pose'] * 3 // 4, sizes['pose'], 3), dtype=np.uint8))
+        self.get_face().process(np.zeros((sizes['face'] * 3 // 4, sizes['face'], 3), dtype=np.uint8))
+
+    def _thread_graphs(self):
+        graphs = getattr(self._local, 'graphs', None)
+        if graphs is None:
+            graphs = self._local.graphs = {}
+        return graphs
+
+
+# Registry bersama untuk proses ini
+model_registry = ModelRegistry()
@@ -0,0 +1,225 @@
+import json
+import threading
+import time
+
+import cv2
+
+from detector_backends import DETECTOR_CONFIG
+
+# Pengaturan monitoring wall admin
+MONITOR_CONFIG = {
+    'thumb_width': 240,
+    'jpeg_quality': 60,
+    # Interval thumbnail per siswa menyesuaikan jumlah viewer x jumlah tile,
+    # dibatasi tile_budget thumbnail/detik per ujian untuk semua viewer
+    'min_interval': 1.0,
+    'max_interval': 10.0,
+    'tile_budget': 40,
+    'stale_after': 30.0,        # tile tanpa thumbnail baru selama N detik dianggap tidak aktif
+    'heartbeat_seconds': 15,
+}
+
+LEVEL_COLORS = {'berat': (0, 0, 255), 'ringan': (0, 165, 255)}
+BOUNDARY = 'tile'
+
+
+def render_thumbnail(frame, detections=(), findings=(), width=None, quality=None):
+    """Encode thumbnail JPEG dengan overlay dari hasil deteksi terakhir
+
+    detections: (label, conf, box) dalam koordinat frame, findings: (message, level, _).
+    Tidak menjalankan inferensi apa pun.
+    """
+    width = width or MONITOR_CONFIG['thumb_width']
+    h, w = frame.shape[:2]
+    scale = min(1.0, width / w)
+    thumb = cv2.resize(frame, (max(1, round(w * scale)), max(1, round(h * scale))),
+                       interpolation=cv2.INTER_AREA)
+
+    for label, conf, (x1, y1, x2, y2) in detections:
+        color = LEVEL_COLORS['berat'] if label in DETECTOR_CONFIG['classes'] else (0, 200, 0)
+        cv2.rectangle(thumb, (int(x1 * scale), int(y1 * scale)), (int(x2 * scale), int(y2 * scale)), color, 1)
+        cv2.putText(thumb, f"{label} {conf:.2f}", (int(x1 * scale), max(10, int(y1 * scale) - 3)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.35, color, 1)
+
+    levels = [level for _, level, _ in findings]
+    for i, (message, level, _) in enumerate(findings):
+        cv2.putText(thumb, message, (4, thumb.shape[0] - 6 - 12 * i),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.35, LEVEL_COLORS.get(level, (255, 255, 255)), 1)
+    if levels:
+        color = LEVEL_COLORS['berat'] if 'berat' in levels else LEVEL_COLORS['ringan']
+        cv2.rectangle(thumb, (0, 0), (thumb.shape[1] - 1, thumb.shape[0] - 1), color, 3)
+
+    ok, encoded = cv2.imencode('.jpg', thumb, [cv2.IMWRITE_JPEG_QUALITY, quality or MONITOR_CONFIG['jpeg_quality']])
+    return encoded.tobytes() if ok else None
+
+
+def overall_level(findings):
+    levels = {level for _, level, _ in findings}
+    if 'berat' in levels:
+        return 'berat'
+    return 'ringan' if levels else 'ok'
+
+
+class _Tile:
+    __slots__ = ('seq', 'jpeg', 'level', 'updated_at')
+
+    def __init__(self, seq, jpeg, level, updated_at):
+        self.seq = seq
+        self.jpeg = jpeg
+        self.level = level
+        self.updated_at = updated_at
+
+
+class MonitoringWall:
+    """Cache thumbnail sesi aktif per ujian untuk semua admin yang memantau
+
+    Thumbnail di-encode sekali (di worker proctor) lalu bytes yang sama dikirim
+    ke setiap viewer. Thumbnail hanya diminta selama ada viewer, dengan interval
+    yang membesar jika viewer atau tile bertambah.
+    """
+
+    def __init__(self, config=None):
+        self.config = dict(MONITOR_CONFIG)
+        if config:
+            self.config.update(config)
+        self._cond = threading.Condition()
+        self._tiles = {}          # ujian_id -> {user_id: _Tile}
+        self._viewers = {}        # ujian_id -> jumlah koneksi
+        self._requested_at = {}   # (user_id, ujian_id) -> waktu thumbnail terakhir diminta
+        self._seq = 0
+        self._stats = {'thumbnails': 0, 'parts_sent': 0, 'bytes_sent': 0}
+
+    def viewers(self, ujian_id):
+        return self._viewers.get(ujian_id, 0)
+
+    def interval(self, ujian_id):
+        """Jarak minimal (detik) antar thumbnail satu siswa untuk ujian ini"""
+        viewers = self.viewers(ujian_id)
+        tiles = max(1, len(self._tiles.get(ujian_id, ())))
+        interval = self.config['min_interval'] * viewers * tiles / self.config['tile_budget']
+        return min(self.config['max_interval'], max(self.config['min_interval'], interval))
+
+    def wants_thumbnail(self, user_id, ujian_id, now=None):
+        """Apakah frame siswa ini perlu dibuatkan thumbnail (ada viewer dan sudah waktunya)"""
+        if not self.viewers(ujian_id):
+            return False
+        now = time.monotonic() if now is None else now
+        key = (user_id, ujian_id)
+        with self._cond:
+            if now - self._requested_at.get(key, float('-inf')) < self.interval(ujian_id):
+                return False
+            self._requested_at[key] = now
+        return True
+
+    def update(self, user_id, ujian_id, jpeg, level='ok'):
+        with self._cond:
+            self._seq += 1
+            self._tiles.setdefault(ujian_id, {})[user_id] = _Tile(self._seq, jpeg, level, time.monotonic())
+            self._stats['thumbnails'] += 1
+            self._cond.notify_all()
+
+    def remove(self, user_id, ujian_id):
+        with self._cond:
+            self._requested_at.pop((user_id, ujian_id), None)
+            tiles = self._tiles.get(ujian_id)
+            if tiles and tiles.pop(user_id, None) is not None:
+                if not tiles:
+                    del self._tiles[ujian_id]
+                self._cond.notify_all()
+
+    def active_users(self, ujian_id):
+        cutoff = time.monotonic() - self.config['stale_after']
+        return sorted(user_id for user_id, tile in self._tiles.get(ujian_id, {}).items()
+                      if tile.updated_at >= cutoff)
+
+    def _watch(self, ujian_id):
+        with self._cond:
+            self._viewers[ujian_id] = self._viewers.get(ujian_id, 0) + 1
+
+    def _unwatch(self, ujian_id):
+        with self._cond:
+            self._viewers[ujian_id] -= 1
+            if not self._viewers[ujian_id]:
+                del self._viewers[ujian_id]
+
+    def _changed_tiles(self, ujian_id, sent):
+        """Tunggu tile yang lebih baru dari yang sudah dikirim ke viewer ini"""
+        with self._cond:
+            def changed():
+                tiles = self._tiles.get(ujian_id, {})
+                return [(user_id, tile) for user_id, tile in tiles.items() if tile.seq > sent.get(user_id, 0)]
+            fresh = changed()
+            if not fresh:
+                self._cond.wait(self.config['heartbeat_seconds'])
+                fresh = changed()
+            return fresh
+
+    def _session_tile(self, user_id, ujian_id, sent_seq):
+        """Tunggu thumbnail satu siswa yang lebih baru dari sent_seq, maksimal heartbeat_seconds
+
+        Return tile terbaru (bisa sama dengan yang sudah dikirim), atau None jika
+        siswa tidak punya tile (belum ada atau sudah dihapus).
+        """
+        def ready():
+            tile = self._tiles.get(ujian_id, {}).get(user_id)
+            return tile.seq > sent_seq if tile is not None else bool(sent_seq)
+
+        with self._cond:
+            self._cond.wait_for(ready, self.config['heartbeat_seconds'])
+            return self._tiles.get(ujian_id, {}).get(user_id)
+
+    def _part(self, content_type, body, headers=None):
+        lines = [f'--{BOUNDARY}', f'Content-Type: {content_type}', f'Content-Length: {len(body)}']
+        lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+        self._stats['parts_sent'] += 1
+        self._stats['bytes_sent'] += len(body)
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode() + body + b'\r\n'
+
+    def stream(self, ujian_id):
+        """Generator multipart/mixed: satu part JPEG per tile yang berubah
+
+        Setiap part membawa header X-User-Id dan X-Level; part JSON {"active": [...]}
+        dikirim saat daftar sesi aktif berubah agar tile yang selesai dihapus.
+        """
+        self._watch(ujian_id)
+        sent = {}
+        active = None
+        try:
+            while True:
+                fresh = self._changed_tiles(ujian_id, sent)
+                for user_id, tile in fresh:
+                    sent[user_id] = tile.seq
+                    yield self._part('image/jpeg', tile.jpeg, {'X-User-Id': user_id, 'X-Level': tile.level})
+
+                current = self.active_users(ujian_id)
+                if current != active or not fresh:
+                    active = current
+                    yield self._part('application/json', json.dumps({'active': current}).encode())
+        finally:
+            self._unwatch(ujian_id)
+
+    def stream_session(self, user_id, ujian_id):
+        """Generator MJPEG (multipart/x-mixed-replace) untuk satu siswa, bisa dipakai langsung di <img>
+
+        JPEG terakhir dikirim ulang setiap heartbeat_seconds agar koneksi yang
+        putus terdeteksi; generator selesai saat tile siswa dihapus (ujian selesai)
+        atau tidak muncul dalam satu heartbeat.
+        """
+        self._watch(ujian_id)
+        sent_seq = 0
+        try:
+            while True:
+                tile = self._session_tile(user_id, ujian_id, sent_seq)
+                if tile is None:
+                    return
+                sent_seq = tile.seq
+                yield self._part('image/jpeg', tile.jpeg)
+        finally:
+            self._unwatch(ujian_id)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats['viewers'] = sum(self._viewers.values())
+            stats['tiles'] = sum(len(tiles) for tiles in self._tiles.values())
+        return stats
@@ -0,0 +1,95 @@
+import base64
+import csv
+import io
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+# Pengaturan halaman listing admin
+PAGE_CONFIG = {
+    'per_page': 50,
+    'max_per_page': 200,
+    'export_chunk': 1000,  # baris per batch saat streaming export
+}
+
+
+class Page:
+    """Satu halaman hasil keyset pagination"""
+
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(values):
+    """Ubah nilai kunci baris terakhir menjadi token yang aman untuk URL"""
+    payload = [{'$dt': v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(token):
+    """Kebalikan encode_cursor; return None jika token tidak valid"""
+    if not token:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+        return [datetime.fromisoformat(v['$dt']) if isinstance(v, dict) else v for v in payload]
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def _after_condition(columns, values, descending):
+    # (c1, c2, ...) > (v1, v2, ...) dijabarkan agar index komposit tetap dipakai
+    column, value = columns[0], values[0]
+    beyond = column < value if descending else column > value
+    if len(columns) == 1:
+        return beyond
+    return or_(beyond, and_(column == value, _after_condition(columns[1:], values[1:], descending)))
+
+
+def keyset_paginate(query, columns, after=None, per_page=None, descending=False):
+    """Ambil satu halaman tanpa OFFSET
+
+    columns: kolom urutan, kolom terakhir harus unik (biasanya id).
+    after: token cursor dari Page.next_cursor halaman sebelumnya.
+    per_page: dibatasi 1..max_per_page; 0 atau selain int (mis. None) memakai default.
+    """
+    if not isinstance(per_page, int) or isinstance(per_page, bool) or not per_page:
+        per_page = PAGE_CONFIG['per_page']
+    per_page = max(1, min(per_page, PAGE_CONFIG['max_per_page']))
+
+    values = decode_cursor(after)
+    if values is not None and len(values) == len(columns):
+        query = query.filter(_after_condition(columns, values, descending))
+
+    order = [c.desc() for c in columns] if descending else [c.asc() for c in columns]
+    rows = query.order_by(*order).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return Page(rows, next_cursor)
+
+
+def stream_csv(header, rows):
+    """Generator CSV untuk Response streaming; rows boleh berupa iterator besar"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(header)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % PAGE_CONFIG['export_chunk'] == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
@@ -0,0 +1,109 @@
+import cv2
+import numpy as np
+
+# Pengaturan preprocessing frame sebelum inferensi
+PREPROCESS_CONFIG = {
+    # Ukuran input per detektor (sisi terpanjang). YOLO memakai letterbox persegi;
+    # MediaPipe memakai koordinat ternormalisasi sehingga cukup diperkecil.
+    'input_sizes': {'object': 320, 'face': 256, 'pose': 256},
+    'letterbox_color': 114,
+    # Resolusi kamera yang diminta ke browser; cukup untuk input detektor dan screenshot
+    'capture': {'max_width': 640, 'max_height': 480, 'jpeg_quality': 0.7, 'interval_ms': 1000},
+}
+
+
+def capture_config():
+    """Konfigurasi capture untuk browser (dipakai /api/proctor/capture-config)"""
+    return dict(PREPROCESS_CONFIG['capture'])
+
+
+def _fit(shape, size):
+    """Ukuran (w, h) dengan sisi terpanjang = size, tanpa memperbesar"""
+    h, w = shape[:2]
+    scale = min(1.0, size / max(h, w))
+    return max(1, round(w * scale)), max(1, round(h * scale)), scale
+
+
+class FramePreprocessor:
+    """Siapkan input setiap detektor dari satu frame BGR hasil decode
+
+    Buffer hasil resize/konversi dialokasikan sekali lalu dipakai ulang selama
+    ukuran frame tidak berubah. Konversi BGR->RGB dilakukan sekali untuk semua
+    detektor MediaPipe. Karena buffer dipakai ulang, hasil hanya valid sampai
+    pemanggilan berikutnya untuk slot yang sama.
+    """
+
+    def __init__(self, input_sizes=None):
+        self.input_sizes = dict(PREPROCESS_CONFIG['input_sizes'])
+        if input_sizes:
+            self.input_sizes.update(input_sizes)
+        self._buffers = {}
+        self._letterbox_geometry = {}
+
+    def _buffer(self, tag, shape):
+        buffer = self._buffers.get(tag)
+        if buffer is None or buffer.shape != shape:
+            buffer = self._buffers[tag] = np.empty(shape, dtype=np.uint8)
+        return buffer
+
+    def rgb_inputs(self, frame, names):
+        """{nama detektor: array RGB} untuk detektor MediaPipe dalam names"""
+        sizes = {name: self.input_sizes[name] for name in names}
+        if not sizes:
+            return {}
+
+        # Perkecil sekali ke ukuran terbesar yang dibutuhkan, konversi warna sekali
+        w, h, scale = _fit(frame.shape, max(sizes.values()))
+        base = frame
+        if scale < 1.0:
+            base = cv2.resize(frame, (w, h), dst=self._buffer('bgr', (h, w, 3)), interpolation=cv2.INTER_AREA)
+        rgb = cv2.cvtColor(base, cv2.COLOR_BGR2RGB, dst=self._buffer('rgb', (h, w, 3)))
+
+        inputs = {}
+        for name, size in sizes.items():
+            nw, nh, _ = _fit(rgb.shape, size)
+            if (nw, nh) == (w, h):
+                inputs[name] = rgb
+            else:
+                inputs[name] = cv2.resize(rgb, (nw, nh), dst=self._buffer(f'rgb_{name}', (nh, nw, 3)),
+                                          interpolation=cv2.INTER_AREA)
+        return inputs
+
+    def letterbox(self, frame, size=None, slot=0):
+        """Letterbox persegi untuk YOLO; return (image, meta) untuk unletterbox
+
+        slot membedakan buffer saat beberapa frame harus hidup bersamaan (batch).
+        """
+        size = size or self.input_sizes['object']
+        h, w = frame.shape[:2]
+        scale = min(size / h, size / w)
+        nw, nh = max(1, round(w * scale)), max(1, round(h * scale))
+        left, top = (size - nw) // 2, (size - nh) // 2
+
+        canvas = self._buffer(('letterbox', slot), (size, size, 3))
+        geometry = (nw, nh, left, top)
+        if self._letterbox_geometry.get(slot) != geometry:
+            # Area padding hanya diisi ulang jika geometri berubah
+            canvas.fill(PREPROCESS_CONFIG['letterbox_color'])
+            self._letterbox_geometry[slot] = geometry
+
+        resized = cv2.resize(frame, (nw, nh), dst=self._buffer(('letterbox_resized', slot), (nh, nw, 3)),
+                             interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+        canvas[top:top + nh, left:left + nw] = resized
+        return canvas, (scale, left, top)
+
+
+def unletterbox(detections, meta, frame_shape):
+    """Kembalikan kotak deteksi dari koordinat letterbox ke koordinat frame asli"""
+    scale, left, top = meta
+    h, w = frame_shape[:2]
+    mapped = []
+    for label, conf, (x1, y1, x2, y2) in detections:
+        box = (
+            int(min(max((x1 - left) / scale, 0), w)),
+            int(min(max((y1 - top) / scale, 0), h)),
+            int(min(max((x2 - left) / scale, 0), w)),
+            int(min(max((y2 - top) / scale, 0), h)),
+        )
+        mapped.append((label, conf, box))
+    return mapped
@@ -0,0 +1,376 @@
+import argparse
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+from frame_buffer import LatestFrameBuffer
+from frame_sources import FRAME_SOURCE_CONFIG, FrameScheduler, open_source
+from preprocess import PREPROCESS_CONFIG
+
+# Pengaturan host multi-proses untuk sesi monitoring (kamera/stream/file)
+HOST_CONFIG = {
+    'workers': os.cpu_count() or 1,
+    'analysis_fps': FRAME_SOURCE_CONFIG['analysis_fps'],
+    # Kapasitas buffer shared memory per sesi; frame lebih besar diperkecil dulu
+    'frame_shape': (PREPROCESS_CONFIG['capture']['max_height'], PREPROCESS_CONFIG['capture']['max_width'], 3),
+    'stats_interval': 2.0,
+    'health_interval': 1.0,     # detik antar pemeriksaan worker yang mati
+}
+
+
+def _host_worker_main(worker_id, generation, control_queue, channel, fps, stats_interval):
+    """Loop worker: analisis frame terbaru setiap sesi miliknya pada laju tetap
+
+    Frame dibaca dari shared memory (tanpa pickling); yang dikirim balik lewat
+    channel hanya event pelanggaran, statistik ringkas, dan konfirmasi 'removed'
+    setelah worker melepas buffer sesi (baru setelah itu host menghapusnya).
+    """
+    from model_registry import model_registry
+    from preprocess import FramePreprocessor
+    from proctor_system import ProctorSystem
+    from screenshot_writer import screenshot_writer
+
+    # Banyak sesi bergantian memakai graph MediaPipe yang sama di proses ini
+    models = model_registry.acquire(static_image_mode=True)
+    model_registry.warm_up(static_image_mode=True)
+    preprocessor = FramePreprocessor()
+
+    sessions = {}  # key -> [proctor, buffer, seq terakhir yang dianalisis]
+    stats = {'frames': 0, 'idle': 0, 'errors': 0, 'overruns': 0, 'busy_seconds': 0.0}
+    channel.put(('ready', worker_id, generation))
+
+    def close_session(key):
+        session = sessions.pop(key, None)
+        if session is not None:
+            session[0].close()
+            session[1].close()
+
+    period = 1.0 / fps
+    next_tick = time.monotonic()
+    reported_at = next_tick
+    running = True
+    while running:
+        started = time.monotonic()
+        for key, session in list(sessions.items()):
+            proctor, buffer, last_seq = session
+            seq, frame = buffer.read(newer_than=last_seq)
+            if frame is None:
+                stats['idle'] += 1
+                continue
+            session[2] = seq
+
+            events = []
+            proctor.callback_function = events.append
+            try:
+                proctor._process_frame(frame)
+                stats['frames'] += 1
+            except Exception as e:
+                print(f"Error host worker {worker_id}: {e}")
+                stats['errors'] += 1
+            if events:
+                channel.put(('events', key, events))
+                if any(e.get('action') == 'end_exam' for e in events):
+                    close_session(key)
+        stats['busy_seconds'] += time.monotonic() - started
+
+        now = time.monotonic()
+        if now - reported_at >= stats_interval:
+            channel.put(('stats', worker_id, dict(stats, sessions=len(sessions), reported_at=time.time())))
+            reported_at = now
+
+        # Sisa periode dipakai menunggu perintah dari host
+        next_tick += period
+        if next_tick <= time.monotonic():
+            stats['overruns'] += 1
+            next_tick = time.monotonic()
+        while True:
+            try:
+                command = control_queue.get(timeout=max(0.0, next_tick - time.monotonic()))
+            except queue.Empty:
+                break
+            if command is None:
+                running = False
+                break
+            kind, key, name = command
+            if kind == 'add':
+                close_session(key)
+                try:
+                    buffer = LatestFrameBuffer.attach(name)
+                except (FileNotFoundError, ValueError) as e:
+                    print(f"Error host worker {worker_id}: buffer sesi {key} tidak bisa dibuka: {e}")
+                    stats['errors'] += 1
+                    continue
+                proctor = ProctorSystem(key[0], key[1], models=models, preprocessor=preprocessor,
+                                        frame_buffer=buffer)
+                sessions[key] = [proctor, buffer, 0]
+            elif kind == 'remove':
+                # Sesi yang sudah ditambah ulang memakai buffer lain, jangan ikut ditutup
+                session = sessions.get(key)
+                if session is not None and session[1].name == name:
+                    close_session(key)
+                channel.put(('removed', worker_id, name))
+
+    for key in list(sessions):
+        close_session(key)
+    models.release()
+    screenshot_writer.stop()
+
+
+class ProctorHost:
+    """Jalankan banyak sesi ProctorSystem di N proses worker (di luar GIL proses Flask)
+
+    Sesi dibagi tetap ke worker berdasarkan hash (state pelanggaran terjaga).
+    Setiap sesi punya LatestFrameBuffer di shared memory: host menulis frame
+    terbaru (dari FrameSource atau push()), worker membacanya langsung.
+    on_events(key, events) dipanggil dengan format yang sama seperti ProctorPool.
+
+    Dipakai untuk sesi kamera/stream yang dibaca di server (dan CLI di bawah).
+    Frame dari browser tetap lewat ProctorPool: yang dikirim ke worker di sana
+    adalah JPEG terkompresi, bukan frame mentah.
+    """
+
+    def __init__(self, on_events=None, workers=None, fps=None, frame_shape=None):
+        self.on_events = on_events
+        self.workers = workers or HOST_CONFIG['workers']
+        self.fps = fps or HOST_CONFIG['analysis_fps']
+        self.frame_shape = tuple(frame_shape or HOST_CONFIG['frame_shape'])
+
+        self._ctx = multiprocessing.get_context('spawn')
+        self._lock = threading.Lock()
+        self._started = False
+        self._processes = []
+        self._control_queues = []
+        self._generations = []  # per worker: nomor spawn proses yang sedang berjalan
+        self._ready = []        # per worker: proses saat ini sudah memuat model
+        self._channel = None
+        self._collector = None
+        self._sessions = {}  # key -> {'buffer', 'scheduler', 'worker'}
+        self._closing = {}   # nama buffer -> (buffer, worker), menunggu konfirmasi 'removed'
+        self._worker_stats = {}
+        self._stats = {'pushed': 0, 'resized': 0, 'events': 0, 'restarted': 0}
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._channel = self._ctx.Queue()
+            for worker_id in range(self.workers):
+                self._processes.append(None)
+                self._control_queues.append(None)
+                self._generations.append(0)
+                self._ready.append(False)
+                self._spawn_worker(worker_id)
+
+            self._collector = threading.Thread(target=self._collect_loop)
+            self._collector.daemon = True
+            self._collector.start()
+            self._started = True
+
+    def stop(self):
+        with self._lock:
+            if not self._started:
+                return
+            keys = list(self._sessions)
+        for key in keys:
+            self.remove_session(*key)
+        with self._lock:
+            self._started = False
+        for control_queue in self._control_queues:
+            control_queue.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._channel.put(None)
+        self._collector.join(timeout=5)
+        # Worker sudah berhenti: buffer yang belum dikonfirmasi aman dihapus
+        with self._lock:
+            closing, self._closing = self._closing, {}
+        for buffer, _ in closing.values():
+            buffer.close()
+
+    def add_session(self, user_id, ujian_id, source=None, loop=False):
+        """Daftarkan sesi; source (index kamera, URL, file, folder, FrameSource) dibaca di host
+
+        Tanpa source, frame dikirim lewat push().
+        """
+        self.start()
+        key = (user_id, ujian_id)
+        self.remove_session(user_id, ujian_id)
+
+        buffer = LatestFrameBuffer(self.frame_shape, shared=True)
+        worker = hash(key) % self.workers
+        session = {'buffer': buffer, 'scheduler': None, 'worker': worker}
+        with self._lock:
+            self._sessions[key] = session
+            self._control_queues[worker].put(('add', key, buffer.name))
+
+        if source is not None:
+            # Ingest di host hanya membaca dan menyalin frame; analisis di worker
+            source = open_source(source, loop=loop)
+            session['scheduler'] = FrameScheduler(
+                source, lambda frame: self.push(user_id, ujian_id, frame), fps=self.fps
+            ).start()
+
+    def push(self, user_id, ujian_id, frame):
+        """Tulis frame BGR terbaru sesi ke shared memory; return sequence atau None"""
+        h, w = frame.shape[:2]
+        max_h, max_w = self.frame_shape[:2]
+        resized = h > max_h or w > max_w
+        if resized:
+            scale = min(max_h / h, max_w / w)
+            frame = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+        # Ditulis di bawah lock: sesi yang sudah dihapus tidak pernah ditulisi lagi
+        with self._lock:
+            session = self._sessions.get((user_id, ujian_id))
+            if session is None:
+                return None
+            self._stats['pushed'] += 1
+            self._stats['resized'] += int(resized)
+            return session['buffer'].write(frame)
+
+    def remove_session(self, user_id, ujian_id):
+        key = (user_id, ujian_id)
+        with self._lock:
+            session = self._sessions.pop(key, None)
+        if session is None:
+            return
+        if session['scheduler'] is not None:
+            session['scheduler'].stop()
+            session['scheduler'].source.close()
+        with self._lock:
+            # Shared memory baru dihapus setelah worker mengonfirmasi sudah melepasnya
+            buffer = session['buffer']
+            self._closing[buffer.name] = (buffer, session['worker'])
+            self._control_queues[session['worker']].put(('remove', key, buffer.name))
+
+    def sessions(self):
+        with self._lock:
+            return list(self._sessions)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['workers'] = self.workers
+            stats['sessions'] = len(self._sessions)
+            stats['closing'] = len(self._closing)
+            stats['ready_workers'] = sum(self._ready)
+            stats['alive_workers'] = sum(1 for p in self._processes if p and p.is_alive())
+            stats['per_worker'] = {wid: dict(s) for wid, s in sorted(self._worker_stats.items())}
+        return stats
+
+    def _spawn_worker(self, worker_id):
+        self._generations[worker_id] += 1
+        control_queue = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_host_worker_main,
+            args=(worker_id, self._generations[worker_id], control_queue, self._channel,
+                  self.fps, HOST_CONFIG['stats_interval'])
+        )
+        process.daemon = True
+        process.start()
+        self._processes[worker_id] = process
+        self._control_queues[worker_id] = control_queue
+        self._ready[worker_id] = False
+
+    def _check_workers(self):
+        """Jalankan ulang worker yang mati dan daftarkan ulang sesinya"""
+        with self._lock:
+            if not self._started:
+                return
+            for worker_id, process in enumerate(self._processes):
+                if process.is_alive():
+                    continue
+                print(f"Worker host {worker_id} mati, menjalankan ulang")
+                self._stats['restarted'] += 1
+                self._spawn_worker(worker_id)
+                # Proses lama tidak akan mengonfirmasi lagi
+                for name, (buffer, worker) in list(self._closing.items()):
+                    if worker == worker_id:
+                        del self._closing[name]
+                        buffer.close()
+                for key, session in self._sessions.items():
+                    if session['worker'] == worker_id:
+                        self._control_queues[worker_id].put(('add', key, session['buffer'].name))
+
+    def _collect_loop(self):
+        interval = HOST_CONFIG['health_interval']
+        last_check = time.monotonic()
+        while True:
+            # Pemeriksaan worker dijadwalkan dengan timer, juga saat channel sibuk
+            if time.monotonic() - last_check >= interval:
+                self._check_workers()
+                last_check = time.monotonic()
+            try:
+                message = self._channel.get(timeout=interval)
+            except queue.Empty:
+                continue
+            if message is None:
+                break
+            kind, key, payload = message
+            if kind == 'ready':
+                with self._lock:
+                    if payload == self._generations[key]:
+                        self._ready[key] = True
+            elif kind == 'removed':
+                with self._lock:
+                    entry = self._closing.pop(payload, None)
+                if entry is not None:
+                    entry[0].close()
+            elif kind == 'stats':
+                with self._lock:
+                    self._worker_stats[key] = payload
+            elif kind == 'events':
+                with self._lock:
+                    self._stats['events'] += len(payload)
+                if any(e.get('action') == 'end_exam' for e in payload):
+                    self.remove_session(*key)
+                if self.on_events:
+                    try:
+                        self.on_events(key, payload)
+                    except Exception as e:
+                        print(f"Error handling proctor events: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Jalankan banyak sesi proctor dari satu sumber untuk mengukur throughput host')
+    parser.add_argument('source', help='index kamera, URL stream, file video, atau folder gambar')
+    parser.add_argument('--sessions', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=HOST_CONFIG['workers'])
+    parser.add_argument('--fps', type=float, default=HOST_CONFIG['analysis_fps'])
+    parser.add_argument('--duration', type=float, default=20.0, help='detik pengukuran setelah semua worker siap')
+    args = parser.parse_args()
+
+    events = []
+    host = ProctorHost(on_events=lambda key, batch: events.extend(batch), workers=args.workers, fps=args.fps)
+    print(f"🚀 {args.sessions} sesi di {args.workers} worker, target {args.fps:g} frame/detik per sesi")
+    for i in range(args.sessions):
+        host.add_session(i, 0, args.source, loop=True)
+    while host.stats()['ready_workers'] < args.workers:
+        time.sleep(0.5)
+
+    # Laju dihitung dari dua laporan statistik worker (frame dan waktu dari worker sendiri)
+    time.sleep(HOST_CONFIG['stats_interval'] * 1.5)
+    before = host.stats()['per_worker']
+    time.sleep(args.duration)
+    stats = host.stats()
+    host.stop()
+
+    throughput = 0.0
+    for wid, after in stats['per_worker'].items():
+        if wid in before and after['reported_at'] > before[wid]['reported_at']:
+            throughput += (after['frames'] - before[wid]['frames']) / (after['reported_at'] - before[wid]['reported_at'])
+    print(f"📈 {throughput:.1f} frame/detik dianalisis ({throughput / args.workers:.1f} per worker), "
+          f"target {args.sessions * args.fps:g}")
+    for wid, worker_stats in stats['per_worker'].items():
+        print(f"   worker {wid}: {worker_stats['sessions']} sesi, {worker_stats['frames']} frame, "
+              f"{worker_stats['overruns']} overrun")
+    print(f"⚠️  {len(events)} event pelanggaran")
+
+
+if __name__ == '__main__':
+    main()
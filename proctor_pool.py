@@ -0,0 +1,375 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+# Pengaturan worker pool proctor
+POOL_CONFIG = {
+    'workers': max(1, (os.cpu_count() or 2) - 1),
+    'inflight_per_worker': 8,  # frame yang boleh menunggu di dalam satu worker (>= batch YOLO)
+    'max_pending': 256,        # total frame yang boleh antre di pool (per siswa hanya frame terbaru)
+    'max_frame_age': 3.0,      # detik, frame yang lebih tua dibuang oleh worker
+    # Sesi tanpa frame selama N detik (tab ditutup, koneksi putus) ditutup oleh worker
+    'session_idle_timeout': 120.0,
+    'health_interval': 1.0,    # detik antar pemeriksaan worker yang mati
+}
+
+
+def _collect_jobs(job_queue, max_batch_size, max_wait, idle_wait=None):
+    """Ambil satu job, lalu tunggu maksimal max_wait untuk job lain agar bisa di-batch
+
+    Return list kosong jika tidak ada job dalam idle_wait detik.
+    """
+    try:
+        jobs = [job_queue.get(timeout=idle_wait)]
+    except queue.Empty:
+        return []
+    deadline = time.monotonic() + max_wait
+    while jobs[-1] is not None and len(jobs) < max_batch_size:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            jobs.append(job_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return jobs
+
+
+def _worker_main(worker_id, generation, job_queue, result_queue, max_frame_age, idle_timeout):
+    """Loop utama worker: muat model sekali, lalu proses frame dari banyak sesi
+
+    generation dikirim balik di setiap pesan agar pool bisa mengabaikan pesan
+    dari proses worker sebelumnya yang sudah diganti.
+    """
+    import cv2
+    import numpy as np
+    from batch_inference import BATCH_CONFIG, YoloBatcher
+    from model_registry import model_registry
+    from preprocess import FramePreprocessor, unletterbox
+    from proctor_system import ProctorSystem
+    from screenshot_writer import screenshot_writer
+
+    # Satu worker melayani banyak siswa secara bergantian, jadi Pose dijalankan
+    # dalam static_image_mode agar tracking satu siswa tidak bocor ke siswa lain.
+    # Semua sesi di worker ini memakai satu lease yang sama.
+    models = model_registry.acquire(static_image_mode=True)
+    model_registry.warm_up(static_image_mode=True)
+    batcher = YoloBatcher(models.model)
+    # Buffer preprocessing dipakai bersama semua sesi di worker ini: frame
+    # diproses berurutan, kecuali input YOLO yang memakai slot per posisi batch
+    preprocessor = FramePreprocessor()
+
+    sessions = {}
+    last_seen = {}  # key -> waktu frame terakhir sesi
+
+    def close_session(key):
+        last_seen.pop(key, None)
+        proctor = sessions.pop(key, None)
+        if proctor is not None:
+            proctor.close()
+
+    result_queue.put(('ready', worker_id, generation, None, None))
+
+    while True:
+        jobs = _collect_jobs(job_queue, BATCH_CONFIG['max_batch_size'], BATCH_CONFIG['max_wait'],
+                             idle_wait=idle_timeout / 2)
+        stop = bool(jobs) and jobs[-1] is None
+        if stop:
+            jobs.pop()
+
+        now = time.time()
+        for key in [key for key, seen in last_seen.items() if now - seen > idle_timeout]:
+            close_session(key)
+
+        # Decode semua frame dulu, lalu YOLO dijalankan sekali untuk seluruh batch
+        batch = []
+        for kind, key, *payload in jobs:
+            if kind == 'end':
+                close_session(key)
+                continue
+
+            data, submitted_at, want_thumbnail = payload
+            last_seen[key] = now
+            status, frame = 'processed', None
+            try:
+                if time.time() - submitted_at > max_frame_age:
+                    status = 'stale'
+                else:
+                    frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+                    if frame is None:
+                        status = 'invalid'
+            except Exception as e:
+                print(f"Error decoding frame di worker {worker_id}: {e}")
+                status = 'error'
+            batch.append([key, frame, status, [], None, None, want_thumbnail])
+
+        # Cascade per sesi dulu, hanya frame yang butuh YOLO yang masuk batch
+        for item in batch:
+            key, frame, status = item[:3]
+            if status != 'processed':
+                continue
+            try:
+                proctor = sessions.get(key)
+                if proctor is None:
+                    proctor = ProctorSystem(key[0], key[1], models=models, preprocessor=preprocessor)
+                    sessions[key] = proctor
+                item[4] = proctor._plan_detectors(frame)
+                item[5] = proctor
+            except Exception as e:
+                print(f"Error worker proctor {worker_id}: {e}")
+                item[2] = 'error'
+
+        frames = [item[1] for item in batch if item[4] and 'object' in item[4]]
+        letterboxed = [preprocessor.letterbox(frame, slot=slot) for slot, frame in enumerate(frames)]
+        try:
+            results = batcher.predict_many([image for image, _ in letterboxed])
+            detections = iter([unletterbox(boxes, meta, frame.shape)
+                               for boxes, (_, meta), frame in zip(results, letterboxed, frames)])
+        except Exception as e:
+            print(f"Error batch YOLO di worker {worker_id}: {e}")
+            detections = iter([[] for _ in frames])
+
+        for item in batch:
+            key, frame, status, events, plan, proctor, want_thumbnail = item
+            thumbnail = None
+            if status == 'processed':
+                try:
+                    proctor.callback_function = events.append
+                    object_detections = next(detections) if 'object' in plan else None
+                    proctor._process_frame(frame, object_detections=object_detections, plan=plan)
+                    if want_thumbnail:
+                        # Di-encode sekali di sini, dibagikan app ke semua viewer
+                        thumbnail = proctor.thumbnail(frame)
+
+                    if any(e.get('action') == 'end_exam' for e in events):
+                        close_session(key)
+                except Exception as e:
+                    print(f"Error worker proctor {worker_id}: {e}")
+                    item[2] = 'error'
+
+            result_queue.put(('done', worker_id, generation, key, {'status': item[2], 'events': events,
+                                                                   'thumbnail': thumbnail}))
+
+        if stop:
+            break
+
+    for key in list(sessions):
+        close_session(key)
+    # Screenshot yang masih antre ditulis sebelum worker keluar
+    screenshot_writer.stop()
+
+
+class ProctorPool:
+    """Pool proses worker bersama untuk menganalisis frame yang diunggah browser"""
+
+    def __init__(self, on_events=None, workers=None, inflight_per_worker=None,
+                 max_pending=None, max_frame_age=None, on_thumbnail=None, session_idle_timeout=None):
+        self.on_events = on_events
+        self.on_thumbnail = on_thumbnail
+        self.workers = workers or POOL_CONFIG['workers']
+        self.inflight_per_worker = inflight_per_worker or POOL_CONFIG['inflight_per_worker']
+        self.max_pending = max_pending or POOL_CONFIG['max_pending']
+        self.max_frame_age = max_frame_age or POOL_CONFIG['max_frame_age']
+        self.session_idle_timeout = session_idle_timeout or POOL_CONFIG['session_idle_timeout']
+
+        self._ctx = multiprocessing.get_context('spawn')
+        self._lock = threading.Lock()
+        self._started = False
+        self._processes = []
+        self._job_queues = []
+        self._result_queue = None
+        self._collector = None
+
+        # Per worker: siswa -> frame terbaru yang belum dikirim ke worker
+        self._mailboxes = []
+        self._inflight = []
+        self._generations = []  # per worker: nomor spawn proses yang sedang berjalan
+        self._ready = []        # per worker: proses saat ini sudah memuat model
+        self._pending_count = 0
+        self._stats = {
+            'submitted': 0,
+            'replaced': 0,
+            'dropped': 0,
+            'processed': 0,
+            'stale': 0,
+            'invalid': 0,
+            'error': 0,
+            'restarted': 0,
+            'lost': 0,
+        }
+
+    def start(self):
+        """Jalankan proses worker (dipanggil otomatis saat frame pertama masuk)"""
+        with self._lock:
+            if self._started:
+                return
+
+            self._result_queue = self._ctx.Queue()
+            for idx in range(self.workers):
+                self._processes.append(None)
+                self._job_queues.append(None)
+                self._mailboxes.append(OrderedDict())
+                self._inflight.append(0)
+                self._generations.append(0)
+                self._ready.append(False)
+                self._spawn_worker(idx)
+
+            self._collector = threading.Thread(target=self._collect_loop)
+            self._collector.daemon = True
+            self._collector.start()
+            self._started = True
+
+    def stop(self):
+        """Hentikan semua worker"""
+        with self._lock:
+            if not self._started:
+                return
+            self._started = False
+            for job_queue in self._job_queues:
+                job_queue.put(None)
+
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._result_queue.put(None)
+        self._collector.join(timeout=5)
+
+    def submit(self, user_id, ujian_id, data, thumbnail=False):
+        """Antrekan frame JPEG seorang siswa; return 'queued', 'replaced' atau 'dropped'
+
+        thumbnail=True meminta worker mengembalikan thumbnail frame ini ke on_thumbnail.
+        """
+        self.start()
+        key = (user_id, ujian_id)
+        idx = self._worker_for(key)
+
+        with self._lock:
+            mailbox = self._mailboxes[idx]
+
+            if key in mailbox:
+                # Frame lama siswa ini belum sempat diproses: ganti dengan yang terbaru
+                thumbnail = thumbnail or mailbox[key][2]
+                mailbox[key] = (data, time.time(), thumbnail)
+                self._stats['replaced'] += 1
+                status = 'replaced'
+            elif self._pending_count >= self.max_pending:
+                self._stats['dropped'] += 1
+                return 'dropped'
+            else:
+                mailbox[key] = (data, time.time(), thumbnail)
+                self._pending_count += 1
+                status = 'queued'
+
+            self._stats['submitted'] += 1
+            self._dispatch(idx)
+
+        return status
+
+    def end_session(self, user_id, ujian_id):
+        """Buang frame tertunda dan state sesi siswa di worker"""
+        if not self._started:
+            return
+        key = (user_id, ujian_id)
+        idx = self._worker_for(key)
+        with self._lock:
+            if self._mailboxes[idx].pop(key, None) is not None:
+                self._pending_count -= 1
+            self._job_queues[idx].put(('end', key))
+
+    def stats(self):
+        """Statistik antrean dan load shedding"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['workers'] = self.workers
+            stats['pending'] = self._pending_count
+            stats['inflight'] = sum(self._inflight)
+            stats['alive_workers'] = sum(1 for p in self._processes if p and p.is_alive())
+            stats['ready_workers'] = sum(self._ready)
+        return stats
+
+    def _worker_for(self, key):
+        # Sesi selalu dikirim ke worker yang sama agar state pelanggarannya terjaga
+        return hash(key) % self.workers
+
+    def _spawn_worker(self, idx):
+        self._generations[idx] += 1
+        job_queue = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(idx, self._generations[idx], job_queue, self._result_queue,
+                  self.max_frame_age, self.session_idle_timeout)
+        )
+        process.daemon = True
+        process.start()
+        self._processes[idx] = process
+        self._job_queues[idx] = job_queue
+        self._inflight[idx] = 0
+        self._ready[idx] = False
+
+    def _check_workers(self):
+        """Jalankan ulang worker yang mati; frame in-flight di worker itu dianggap hilang"""
+        with self._lock:
+            if not self._started:
+                return
+            for idx, process in enumerate(self._processes):
+                if process.is_alive():
+                    continue
+                print(f"Worker proctor {idx} mati, menjalankan ulang")
+                self._stats['restarted'] += 1
+                self._stats['lost'] += self._inflight[idx]
+                self._spawn_worker(idx)
+                self._dispatch(idx)
+
+    def _dispatch(self, idx):
+        mailbox = self._mailboxes[idx]
+        while mailbox and self._inflight[idx] < self.inflight_per_worker:
+            key, (data, submitted_at, thumbnail) = mailbox.popitem(last=False)
+            self._pending_count -= 1
+            self._inflight[idx] += 1
+            self._job_queues[idx].put(('frame', key, data, submitted_at, thumbnail))
+
+    def _collect_loop(self):
+        """Terima hasil dari worker dan teruskan ke callback aplikasi"""
+        interval = POOL_CONFIG['health_interval']
+        last_check = time.monotonic()
+        while True:
+            # Dijadwalkan dengan timer: di bawah beban antrean hasil tidak pernah kosong
+            if time.monotonic() - last_check >= interval:
+                self._check_workers()
+                last_check = time.monotonic()
+            try:
+                message = self._result_queue.get(timeout=interval)
+            except queue.Empty:
+                continue
+            if message is None:
+                break
+
+            kind, idx, generation, key, result = message
+            with self._lock:
+                if generation != self._generations[idx]:
+                    # Pesan dari proses worker lama yang sudah diganti
+                    continue
+                if kind == 'ready':
+                    self._ready[idx] = True
+                    continue
+
+            with self._lock:
+                self._inflight[idx] = max(0, self._inflight[idx] - 1)
+                self._stats[result['status']] += 1
+                self._dispatch(idx)
+
+            if result['events'] and self.on_events:
+                try:
+                    self.on_events(key, result['events'])
+                except Exception as e:
+                    print(f"Error handling proctor events: {e}")
+
+            if result.get('thumbnail') and result['thumbnail'][0] and self.on_thumbnail:
+                try:
+                    self.on_thumbnail(key, *result['thumbnail'])
+                except Exception as e:
+                    print(f"Error handling proctor thumbnail: {e}")
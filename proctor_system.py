@@ -1,50 +1,71 @@
-import cv2
 import mediapipe as mp
-import time
-import os
-import json
-from ultralytics import YOLO
 from datetime import datetime
 import threading
-import queue
+from batch_inference import predict_objects
+from detector_backends import DETECTOR_CONFIG
+from frame_buffer import LatestFrameBuffer
+from frame_sources import FrameScheduler, open_source
+from preprocess import FramePreprocessor, unletterbox
+from model_registry import model_registry
+from monitoring_wall import overall_level, render_thumbnail
+from scene_gate import CASCADE_CONFIG, DETECTORS, SceneChangeGate
+from screenshot_writer import screenshot_writer
+from violation_debouncer import ViolationDebouncer
 
 class ProctorSystem:
-    def __init__(self, user_id, ujian_id, callback_function=None):
+    def __init__(self, user_id, ujian_id, callback_function=None, models=None,
+                 batcher=None, scene_gate=None, screenshots=None, debouncer=None,
+                 preprocessor=None, frame_buffer=None):
         self.user_id = user_id
         self.ujian_id = ujian_id
         self.callback_function = callback_function
         
-        # Setup MediaPipe
+        # Detektor (YOLO, Pose, FaceDetection) dipinjam dari registry model bersama,
+        # atau dari lease milik pemanggil (mis. worker pool)
         self.mp_pose = mp.solutions.pose
         self.mp_face = mp.solutions.face_detection
-        self.pose = self.mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
-        self.face = self.mp_face.FaceDetection(min_detection_confidence=0.5)
+        self.models = models
+        self._owns_models = models is None
         
-        # Load YOLO model
-        self.model = YOLO("yolov8n.pt")
+        # Opsional: YoloBatcher yang dipakai bersama banyak sesi
+        self.batcher = batcher
+        
+        # Resize/letterbox per detektor dengan buffer yang dipakai ulang
+        self.preprocessor = preprocessor or FramePreprocessor()
+        
+        # Cascade: detektor yang dilewati memakai hasil terakhirnya
+        if scene_gate is None and CASCADE_CONFIG['enabled']:
+            scene_gate = SceneChangeGate()
+        self.scene_gate = scene_gate
+        self.last_findings = {name: [] for name in DETECTORS}
+        # Kotak YOLO terakhir (koordinat frame) untuk overlay monitoring wall
+        self.last_detections = []
         
         # Proctor settings
         self.pelanggaran_count = 0
         self.max_pelanggaran = 3
-        self.last_warning_time = 0
-        self.cooldown = 3  # seconds
+        # Debounce per jenis pelanggaran (hysteresis N-of-M + token bucket)
+        self.debouncer = debouncer or ViolationDebouncer()
         
-        # Screenshot directory
-        self.screenshot_dir = "static/screenshots"
-        os.makedirs(self.screenshot_dir, exist_ok=True)
+        # Screenshot disimpan di background oleh ScreenshotWriter
+        self.screenshots = screenshots or screenshot_writer
         
-        # Camera
-        self.cap = None
+        # Sumber frame (webcam, stream, file, folder, upload) dan penjadwal analisis
+        self.source = None
+        self.scheduler = None
         self.is_running = False
-        self.frame_queue = queue.Queue(maxsize=2)
+        # Frame terbaru untuk preview (boleh shared memory untuk proses streaming)
+        self.frame_buffer = frame_buffer or LatestFrameBuffer()
         
-    def start_monitoring(self):
-        """Mulai monitoring proctor"""
+    def start_monitoring(self, source=0, fps=None):
+        """Mulai monitoring proctor
+
+        source: index webcam, URL stream (rtsp://...), file video, folder gambar,
+        atau FrameSource. fps: laju analisis (default FRAME_SOURCE_CONFIG).
+        """
         try:
-            self.cap = cv2.VideoCapture(0)
-            if not self.cap.isOpened():
-                raise Exception("Tidak dapat mengakses kamera")
-            
+            self.source = open_source(source)
+            self.scheduler = FrameScheduler(self.source, self._on_frame, fps=fps)
             self.is_running = True
             
             # Start monitoring thread
@@ -60,50 +81,124 @@ class ProctorSystem:
     def stop_monitoring(self):
         """Hentikan monitoring proctor"""
         self.is_running = False
-        if self.cap:
-            self.cap.release()
-        cv2.destroyAllWindows()
+        if self.scheduler:
+            self.scheduler.stop()
+        if self.source:
+            self.source.close()
+        self.close()
+    
+    def close(self):
+        """Kembalikan detektor pinjaman ke registry"""
+        if self._owns_models and self.models is not None:
+            self.models.release()
+            self.models = None
+        self.screenshots.forget((self.user_id, self.ujian_id))
+    
+    def _get_models(self):
+        if self.models is None:
+            self.models = model_registry.acquire()
+        return self.models
+    
+    @property
+    def pose(self):
+        return self._get_models().pose
+    
+    @property
+    def face(self):
+        return self._get_models().face
+    
+    @property
+    def model(self):
+        return self._get_models().model
     
     def _monitor_loop(self):
-        """Loop utama monitoring"""
-        while self.is_running and self.cap.isOpened():
-            ret, frame = self.cap.read()
-            if not ret:
-                continue
-            
-            # Update frame queue
-            if not self.frame_queue.full():
-                self.frame_queue.put(frame)
-            
-            # Process frame
-            self._process_frame(frame)
-            
-            time.sleep(0.1)  # Reduce CPU usage
+        """Loop utama monitoring: laju tetap, selalu frame terbaru dari sumber"""
+        self.scheduler.run()
+        self.is_running = False
     
-    def get_current_frame(self):
-        """Dapatkan frame terbaru untuk ditampilkan di web"""
-        try:
-            if not self.frame_queue.empty():
-                return self.frame_queue.get_nowait()
-            return None
-        except:
-            return None
+    def _on_frame(self, frame):
+        # Update frame terbaru untuk preview
+        self.frame_buffer.write(frame)
+        
+        # Process frame
+        self._process_frame(frame)
     
-    def _process_frame(self, frame):
-        """Proses frame untuk deteksi pelanggaran"""
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    def get_current_frame(self, newer_than=None):
+        """Dapatkan frame terbaru untuk ditampilkan di web
+
+        newer_than: sequence frame yang sudah dimiliki pemanggil; None dikembalikan
+        jika belum ada frame yang lebih baru. Sequence terbaru ada di frame_seq.
+        """
+        return self.frame_buffer.read(newer_than=newer_than)[1]
+    
+    @property
+    def frame_seq(self):
+        return self.frame_buffer.seq
+    
+    def thumbnail(self, frame=None):
+        """Thumbnail JPEG dengan overlay hasil deteksi terakhir (tanpa inferensi ulang)
+
+        Tanpa frame, dipakai frame terbaru dari frame_buffer. Return (jpeg, level).
+        """
+        if frame is None:
+            frame = self.frame_buffer.read(copy=False)[1]
+            if frame is None:
+                return None, 'ok'
+        findings = [finding for name in DETECTORS for finding in self.last_findings[name]]
+        return render_thumbnail(frame, self.last_detections, findings), overall_level(findings)
+    
+    def _plan_detectors(self, frame):
+        """Tentukan detektor yang perlu dijalankan ulang untuk frame ini"""
+        if self.scene_gate is None:
+            return set(DETECTORS)
+        return self.scene_gate.plan(frame)
+    
+    def _process_frame(self, frame, object_detections=None, plan=None):
+        """Proses frame untuk deteksi pelanggaran
         
-        # Pose detection
-        self._detect_pose_violations(rgb, frame)
+        object_detections bisa diisi hasil YOLO yang sudah dihitung secara batch
+        (dalam koordinat frame asli), plan bisa diisi hasil _plan_detectors yang
+        sudah dihitung pemanggil.
+        """
+        if plan is None:
+            plan = self._plan_detectors(frame)
         
-        # Face detection
-        self._detect_face_violations(rgb, frame)
+        mediapipe_plan = [name for name in ('pose', 'face') if name in plan]
+        if mediapipe_plan:
+            # Satu resize dan satu konversi BGR->RGB untuk Pose dan FaceDetection
+            rgb = self.preprocessor.rgb_inputs(frame, mediapipe_plan)
+            
+            # Pose detection
+            if 'pose' in plan:
+                self.last_findings['pose'] = self._detect_pose_violations(rgb['pose'], frame)
+            
+            # Face detection
+            if 'face' in plan:
+                self.last_findings['face'] = self._detect_face_violations(rgb['face'], frame)
         
         # Object detection
-        self._detect_object_violations(frame)
+        if 'object' in plan:
+            if object_detections is None:
+                self.last_findings['object'] = self._detect_object_violations(frame)
+            else:
+                self.last_findings['object'] = self._object_findings(object_detections)
+        
+        findings = [finding for name in DETECTORS for finding in self.last_findings[name]]
+        object_messages = {message for message, _, _ in self.last_findings['object']}
+        frame_screenshot = None
+        for message, level, screenshot_path in self.debouncer.observe(findings):
+            if self.pelanggaran_count >= self.max_pelanggaran:
+                break  # ujian sudah diakhiri
+            if screenshot_path is None and message in object_messages:
+                # Screenshot hanya untuk pelanggaran benda yang lolos debouncer, satu per frame
+                if frame_screenshot is None:
+                    frame_screenshot = self._save_screenshot(frame)
+                screenshot_path = frame_screenshot
+            self._trigger_violation(message, level, screenshot_path)
     
     def _detect_pose_violations(self, rgb, frame):
         """Deteksi pelanggaran pose"""
+        findings = []
         pose_results = self.pose.process(rgb)
         if pose_results.pose_landmarks:
             landmarks = pose_results.pose_landmarks.landmark
@@ -119,7 +214,7 @@ class ProctorSystem:
             if (left_shoulder.visibility < 0.5 or right_shoulder.visibility < 0.5 or
                 l_x <= 0 or l_x >= w or l_y <= 0 or l_y >= h or
                 r_x <= 0 or r_x >= w or r_y <= 0 or r_y >= h):
-                self._trigger_violation("Bahu tidak terlihat dengan jelas", "ringan")
+                findings.append(("Bahu tidak terlihat dengan jelas", "ringan", None))
             
             # Check head position (cheating indication)
             nose = landmarks[self.mp_pose.PoseLandmark.NOSE.value]
@@ -127,38 +222,41 @@ class ProctorSystem:
             
             margin = int(w * 0.25)
             if nose_x < margin:
-                self._trigger_violation("Kepala terlalu sering menengok ke kiri", "ringan")
+                findings.append(("Kepala terlalu sering menengok ke kiri", "ringan", None))
             elif nose_x > w - margin:
-                self._trigger_violation("Kepala terlalu sering menengok ke kanan", "ringan")
+                findings.append(("Kepala terlalu sering menengok ke kanan", "ringan", None))
+        return findings
     
     def _detect_face_violations(self, rgb, frame):
         """Deteksi pelanggaran wajah"""
         face_results = self.face.process(rgb)
         if face_results.detections:
             if len(face_results.detections) > 1:
-                self._trigger_violation("Terdeteksi wajah orang lain", "berat")
-        else:
-            self._trigger_violation("Wajah tidak terdeteksi", "ringan")
+                return [("Terdeteksi wajah orang lain", "berat", None)]
+            return []
+        return [("Wajah tidak terdeteksi", "ringan", None)]
     
     def _detect_object_violations(self, frame):
         """Deteksi objek terlarang"""
-        results = self.model.predict(source=frame, conf=0.5, verbose=False)
-        for r in results:
-            for box in r.boxes:
-                cls = int(box.cls[0])
-                label = self.model.names[cls]
-                
-                if label in ["cell phone", "book", "laptop"]:
-                    screenshot_path = self._save_screenshot(frame, f"objek_{label}")
-                    self._trigger_violation(f"Terdeteksi benda terlarang: {label}", "berat", screenshot_path)
+        letterboxed, meta = self.preprocessor.letterbox(frame)
+        if self.batcher:
+            detections = self.batcher.predict(letterboxed)
+        else:
+            detections = predict_objects(self.model, [letterboxed],
+                                         imgsz=self.preprocessor.input_sizes['object'])[0]
+        return self._object_findings(unletterbox(detections, meta, frame.shape))
+    
+    def _object_findings(self, detections):
+        """Ubah hasil deteksi YOLO menjadi daftar pelanggaran"""
+        self.last_detections = detections
+        findings = []
+        for label, _, _ in detections:
+            if label in DETECTOR_CONFIG['classes']:
+                findings.append((f"Terdeteksi benda terlarang: {label}", "berat", None))
+        return findings
     
     def _trigger_violation(self, message, level, screenshot_path=None):
-        """Trigger pelanggaran"""
-        current_time = time.time()
-        if current_time - self.last_warning_time < self.cooldown:
-            return
-        
-        self.last_warning_time = current_time
+        """Trigger pelanggaran (sudah lolos debouncer)"""
         self.pelanggaran_count += 1
         
         # Save violation log
@@ -180,13 +278,9 @@ class ProctorSystem:
         if self.pelanggaran_count >= self.max_pelanggaran:
             self._end_exam_due_to_violations()
     
-    def _save_screenshot(self, frame, prefix="violation"):
-        """Simpan screenshot pelanggaran"""
-        timestamp = int(time.time())
-        filename = f"{prefix}_{self.user_id}_{timestamp}.jpg"
-        filepath = os.path.join(self.screenshot_dir, filename)
-        cv2.imwrite(filepath, frame)
-        return filepath
+    def _save_screenshot(self, frame):
+        """Antrekan screenshot pelanggaran; return path file atau None jika antrean penuh"""
+        return self.screenshots.save(frame, key=(self.user_id, self.ujian_id))
     
     def _end_exam_due_to_violations(self):
         """Akhiri ujian karena terlalu banyak pelanggaran"""
@@ -204,4 +298,5 @@ class ProctorSystem:
     
     def reset_violations(self):
         """Reset counter pelanggaran"""
-        self.pelanggaran_count = 0
\ No newline at end of file
+        self.pelanggaran_count = 0
+        self.debouncer.reset()
\ No newline at end of file
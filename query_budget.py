@@ -0,0 +1,61 @@
+from functools import wraps
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryBudgetExceeded(Exception):
+    """View menjalankan lebih banyak query daripada budget-nya"""
+
+
+class QueryCounter:
+    """Hitung query SQL per request dan tegakkan budget per view
+
+    Dalam mode TESTING (atau QUERY_BUDGET_STRICT=True) view yang melebihi budget
+    melempar QueryBudgetExceeded sehingga regresi N+1 langsung gagal di test;
+    di luar itu hanya dicetak peringatan. Jumlah query juga dikirim lewat header
+    X-Query-Count saat debug.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        event.listen(Engine, 'before_cursor_execute', self._on_execute)
+        app.before_request(self.reset)
+        app.after_request(self._add_header)
+
+    def reset(self):
+        g.query_count = 0
+
+    @property
+    def count(self):
+        return g.get('query_count', 0)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if has_app_context():
+            g.query_count = g.get('query_count', 0) + 1
+
+    def _add_header(self, response):
+        if current_app.debug or current_app.testing:
+            response.headers['X-Query-Count'] = str(self.count)
+        return response
+
+
+def query_budget(max_queries):
+    """Decorator view: batasi jumlah query (termasuk query load_user Flask-Login)"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response = view(*args, **kwargs)
+            used = g.get('query_count', 0)
+            if used > max_queries:
+                message = f"{view.__name__} menjalankan {used} query (budget {max_queries})"
+                if current_app.testing or current_app.config.get('QUERY_BUDGET_STRICT'):
+                    raise QueryBudgetExceeded(message)
+                print(f"[QUERY BUDGET] {message}")
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,97 @@
+import random
+import threading
+import time
+
+from sqlalchemy import event, inspect
+
+# Pengaturan indeks soal
+INDEX_CONFIG = {
+    # Perubahan dari proses lain (mis. import CLI) tidak memicu event di proses ini,
+    # jadi indeks tetap dimuat ulang setelah umur ini
+    'ttl': 300,
+}
+
+
+class QuestionIndex:
+    """Indeks ID soal per kategori, dikelompokkan per tingkat kesulitan
+
+    Memulai ujian cukup mengambil sampel ID dari indeks lalu memuat soal terpilih
+    dengan satu query IN, bukan memuat seluruh bank soal kategori tersebut.
+    """
+
+    def __init__(self, db, BankSoal, ttl=None):
+        self.db = db
+        self.BankSoal = BankSoal
+        self.ttl = ttl or INDEX_CONFIG['ttl']
+
+        self._lock = threading.Lock()
+        self._index = {}  # kategori -> (loaded_at, {tingkat: [id, ...]})
+
+        for name in ('after_insert', 'after_update', 'after_delete'):
+            event.listen(BankSoal, name, self._on_bank_soal_changed)
+
+    def ids_by_level(self, kategori):
+        """{tingkat_kesulitan: [id, ...]} untuk satu kategori"""
+        with self._lock:
+            entry = self._index.get(kategori)
+        if entry and time.time() - entry[0] < self.ttl:
+            return entry[1]
+
+        rows = self.db.session.query(self.BankSoal.id, self.BankSoal.tingkat_kesulitan) \
+            .filter(self.BankSoal.kategori == kategori).all()
+        by_level = {}
+        for soal_id, tingkat in rows:
+            by_level.setdefault(tingkat or 'sedang', []).append(soal_id)
+
+        with self._lock:
+            self._index[kategori] = (time.time(), by_level)
+        return by_level
+
+    def count(self, kategori, tingkat=None):
+        by_level = self.ids_by_level(kategori)
+        if tingkat:
+            return len(by_level.get(tingkat, []))
+        return sum(len(ids) for ids in by_level.values())
+
+    def sample_ids(self, kategori, jumlah, strata=None):
+        """Ambil ID soal secara acak; return None jika soal tidak mencukupi
+
+        strata: {tingkat_kesulitan: jumlah} untuk sampling bertingkat,
+        mis. {'mudah': 5, 'sedang': 10, 'sulit': 5}.
+        """
+        by_level = self.ids_by_level(kategori)
+
+        if strata:
+            selected = []
+            for tingkat, n in strata.items():
+                ids = by_level.get(tingkat, [])
+                if len(ids) < n:
+                    return None
+                selected.extend(random.sample(ids, n))
+            random.shuffle(selected)
+            return selected
+
+        all_ids = [soal_id for ids in by_level.values() for soal_id in ids]
+        if len(all_ids) < jumlah:
+            return None
+        return random.sample(all_ids, jumlah)
+
+    def fetch(self, soal_ids):
+        """Muat soal terpilih dengan satu query, urutan mengikuti soal_ids"""
+        rows = self.BankSoal.query.filter(self.BankSoal.id.in_(soal_ids)).all()
+        by_id = {soal.id: soal for soal in rows}
+        return [by_id[soal_id] for soal_id in soal_ids if soal_id in by_id]
+
+    def invalidate(self, kategori=None):
+        """Buang indeks satu kategori, atau semuanya"""
+        with self._lock:
+            if kategori is None:
+                self._index.clear()
+            else:
+                self._index.pop(kategori, None)
+
+    def _on_bank_soal_changed(self, mapper, connection, target):
+        self.invalidate(target.kategori)
+        # Jika kategori soal diubah, indeks kategori lama juga harus dibuang
+        for kategori in inspect(target).attrs.kategori.history.deleted:
+            self.invalidate(kategori)
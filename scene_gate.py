@@ -0,0 +1,73 @@
+import time
+
+import cv2
+import numpy as np
+
+# Pengaturan cascade deteksi: detektor mahal hanya dijalankan ulang jika
+# gambar berubah cukup banyak sejak detektor itu terakhir berjalan
+CASCADE_CONFIG = {
+    'enabled': True,
+    'thumb_size': (64, 48),      # ukuran thumbnail grayscale untuk perbandingan
+    'grid': (8, 6),              # perubahan diukur per blok agar benda kecil (HP) tetap terdeteksi
+    'thresholds': {              # rata-rata selisih piksel (0-255) pada blok yang paling berubah
+        'object': 6.0,           # YOLO paling sensitif supaya benda yang muncul tidak terlewat
+        'face': 10.0,
+        'pose': 12.0,
+    },
+    'full_refresh_seconds': 5.0,  # semua detektor tetap dijalankan minimal sekali per N detik
+}
+
+DETECTORS = ('pose', 'face', 'object')
+
+
+class SceneChangeGate:
+    """Tahap awal cascade: tentukan detektor mana yang perlu dijalankan untuk frame ini"""
+
+    def __init__(self, thresholds=None, full_refresh_seconds=None, thumb_size=None, grid=None):
+        self.thresholds = dict(CASCADE_CONFIG['thresholds'])
+        if thresholds:
+            self.thresholds.update(thresholds)
+        self.full_refresh_seconds = full_refresh_seconds or CASCADE_CONFIG['full_refresh_seconds']
+        self.thumb_size = thumb_size or CASCADE_CONFIG['thumb_size']
+        self.grid = grid or CASCADE_CONFIG['grid']
+
+        # Thumbnail referensi dan waktu terakhir tiap detektor dijalankan
+        self._reference = {}
+        self._last_run = {}
+        self.stats = {name: {'run': 0, 'skipped': 0} for name in self.thresholds}
+
+    def plan(self, frame, now=None):
+        """Return set nama detektor yang harus dijalankan ulang"""
+        now = time.time() if now is None else now
+        thumb = self._thumbnail(frame)
+
+        run = set()
+        for name, threshold in self.thresholds.items():
+            reference = self._reference.get(name)
+            if (reference is None or
+                    now - self._last_run[name] >= self.full_refresh_seconds or
+                    self._change_score(thumb, reference) >= threshold):
+                run.add(name)
+                self._reference[name] = thumb
+                self._last_run[name] = now
+                self.stats[name]['run'] += 1
+            else:
+                self.stats[name]['skipped'] += 1
+        return run
+
+    def reset(self):
+        """Paksa semua detektor berjalan pada frame berikutnya"""
+        self._reference.clear()
+        self._last_run.clear()
+
+    def _thumbnail(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        thumb = cv2.resize(gray, self.thumb_size, interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(thumb, (3, 3), 0)
+
+    def _change_score(self, thumb, reference):
+        diff = cv2.absdiff(thumb, reference).astype(np.float32)
+        w, h = self.thumb_size
+        cols, rows = self.grid
+        blocks = diff[:h - h % rows, :w - w % cols].reshape(rows, h // rows, cols, w // cols)
+        return float(blocks.mean(axis=(1, 3)).max())
@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+
+from sqlalchemy import event
+
+from question_index import INDEX_CONFIG
+
+
+class ScoringEngine:
+    """Penilaian ujian tanpa query per soal
+
+    Kunci jawaban satu kategori diambil dengan satu query lalu di-cache per ujian.
+    Cache dikosongkan otomatis setiap kali BankSoal berubah di proses ini, dan
+    dimuat ulang setelah ttl detik untuk perubahan dari proses lain.
+    """
+
+    def __init__(self, db, BankSoal, HasilUjian, ttl=None):
+        self.db = db
+        self.BankSoal = BankSoal
+        self.HasilUjian = HasilUjian
+        self.ttl = ttl or INDEX_CONFIG['ttl']
+
+        self._lock = threading.Lock()
+        self._cache = {}  # ujian_id -> (loaded_at, {soal_id: jawaban_benar})
+
+        for name in ('after_insert', 'after_update', 'after_delete'):
+            event.listen(BankSoal, name, self._on_bank_soal_changed)
+
+    def answer_key(self, ujian, soal_ids=None):
+        """Kunci jawaban {soal_id: jawaban_benar} untuk satu ujian"""
+        with self._lock:
+            entry = self._cache.get(ujian.id)
+
+        if entry and time.time() - entry[0] < self.ttl:
+            kunci = entry[1]
+        else:
+            rows = self.db.session.query(self.BankSoal.id, self.BankSoal.jawaban_benar) \
+                .filter(self.BankSoal.kategori == ujian.kategori).all()
+            kunci = {soal_id: jawaban for soal_id, jawaban in rows}
+            with self._lock:
+                self._cache[ujian.id] = (time.time(), kunci)
+
+        # Soal di luar kategori ujian (mis. kategori soal diubah) diambil dengan satu query IN
+        missing = [soal_id for soal_id in (soal_ids or []) if soal_id not in kunci]
+        if missing:
+            rows = self.db.session.query(self.BankSoal.id, self.BankSoal.jawaban_benar) \
+                .filter(self.BankSoal.id.in_(missing)).all()
+            kunci = dict(kunci)
+            kunci.update({soal_id: jawaban for soal_id, jawaban in rows})
+        return kunci
+
+    def score(self, ujian, soal_ids, jawaban):
+        """Hitung nilai (0-100) dari soal yang diberikan dan jawaban siswa"""
+        if not soal_ids:
+            return 0
+        kunci = self.answer_key(ujian, soal_ids)
+        correct_answers = self._count_correct(kunci, soal_ids, jawaban)
+        return (correct_answers / len(soal_ids)) * 100
+
+    def rescore_ujian(self, ujian):
+        """Hitung ulang nilai semua HasilUjian satu ujian (mis. setelah kunci dikoreksi)
+
+        Soal yang dinilai dan pembaginya adalah soal_ids yang tersimpan di hasil,
+        sama seperti saat submit. Hasil lama tanpa soal_ids memakai soal yang
+        dijawab (maksimal ujian.jumlah_soal) dengan pembagi ujian.jumlah_soal.
+        """
+        self.invalidate(ujian.id)
+        kunci = self.answer_key(ujian)
+
+        rows = self.db.session.query(self.HasilUjian.id, self.HasilUjian.jawaban, self.HasilUjian.soal_ids) \
+            .filter(self.HasilUjian.ujian_id == ujian.id).all()
+
+        updates = []
+        for hasil_id, jawaban_json, soal_ids_json in rows:
+            jawaban = json.loads(jawaban_json or '{}')
+            if soal_ids_json:
+                soal_ids = json.loads(soal_ids_json)
+                total = len(soal_ids)
+            else:
+                soal_ids = [int(soal_id) for soal_id in jawaban][:ujian.jumlah_soal]
+                total = ujian.jumlah_soal
+            kunci_hasil = kunci
+            if any(soal_id not in kunci for soal_id in soal_ids):
+                kunci_hasil = self.answer_key(ujian, soal_ids)
+            correct_answers = self._count_correct(kunci_hasil, soal_ids, jawaban)
+            nilai = min(100.0, (correct_answers / total) * 100) if total else 0
+            updates.append({'id': hasil_id, 'nilai': nilai})
+
+        if updates:
+            self.db.session.bulk_update_mappings(self.HasilUjian, updates)
+            self.db.session.commit()
+        return len(updates)
+
+    def invalidate(self, ujian_id=None):
+        """Kosongkan cache kunci satu ujian, atau semuanya"""
+        with self._lock:
+            if ujian_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(ujian_id, None)
+
+    def _count_correct(self, kunci, soal_ids, jawaban):
+        return sum(1 for soal_id in soal_ids
+                   if soal_id in kunci and jawaban.get(str(soal_id)) == kunci[soal_id])
+
+    def _on_bank_soal_changed(self, mapper, connection, target):
+        self.invalidate()
@@ -0,0 +1,156 @@
+import atexit
+import hashlib
+import os
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# Pengaturan screenshot pelanggaran
+SCREENSHOT_CONFIG = {
+    'directory': 'static/screenshots',
+    'jpeg_quality': int(os.environ.get('SCREENSHOT_JPEG_QUALITY', 80)),
+    'max_width': int(os.environ.get('SCREENSHOT_MAX_WIDTH', 640)),  # diperkecil jika lebih lebar
+    'max_queue': 64,        # screenshot menunggu encode; lebih dari ini dibuang
+    'dedup_distance': 6,    # jarak Hamming dHash (dari 64 bit) yang dianggap gambar sama
+    'dedup_window': 30.0,   # detik, screenshot mirip dalam rentang ini memakai file sebelumnya
+}
+
+
+def dhash(frame, size=8):
+    """Difference hash 64-bit; gambar yang hampir sama punya hash yang berdekatan"""
+    small = cv2.resize(frame, (size + 1, size), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+class ScreenshotWriter:
+    """Penyimpan screenshot pelanggaran di background
+
+    save() hanya menghitung alamat file lalu mengantrekan frame, sehingga encode
+    JPEG dan I/O disk tidak menghambat deteksi. Nama file adalah hash isi frame
+    (static/screenshots/ab/abcd....jpg) jadi screenshot beruntun tidak saling
+    menimpa, dan screenshot yang hampir sama dengan screenshot terakhir sesi yang
+    sama memakai ulang file sebelumnya.
+    """
+
+    def __init__(self, directory=None, jpeg_quality=None, max_width=None, max_queue=None,
+                 dedup_distance=None, dedup_window=None):
+        self.directory = directory or SCREENSHOT_CONFIG['directory']
+        self.jpeg_quality = jpeg_quality or SCREENSHOT_CONFIG['jpeg_quality']
+        self.max_width = max_width or SCREENSHOT_CONFIG['max_width']
+        self.dedup_distance = dedup_distance if dedup_distance is not None else SCREENSHOT_CONFIG['dedup_distance']
+        self.dedup_window = dedup_window or SCREENSHOT_CONFIG['dedup_window']
+
+        self._queue = queue.Queue(maxsize=max_queue or SCREENSHOT_CONFIG['max_queue'])
+        self._lock = threading.Lock()
+        self._thread = None
+        self._last = {}  # key sesi -> (dhash, path, waktu)
+        self._stats = {'queued': 0, 'written': 0, 'deduped': 0, 'dropped': 0, 'failed': 0, 'bytes': 0}
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run)
+            self._thread.daemon = True
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def stop(self, timeout=5.0):
+        """Tulis sisa antrean lalu hentikan thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+
+    def save(self, frame, key=None):
+        """Antrekan screenshot; return path file (sudah final) atau None jika antrean penuh"""
+        if self._thread is None:
+            self.start()
+
+        now = time.time()
+        fingerprint = dhash(frame)
+        with self._lock:
+            last = self._last.get(key)
+            if (last is not None and now - last[2] < self.dedup_window
+                    and bin(fingerprint ^ last[0]).count('1') <= self.dedup_distance):
+                self._stats['deduped'] += 1
+                return last[1]
+
+        digest = hashlib.blake2b(frame.tobytes(), digest_size=16).hexdigest()
+        path = os.path.join(self.directory, digest[:2], digest + '.jpg')
+        try:
+            # Salin: pemanggil bisa memakai ulang buffer frame
+            self._queue.put_nowait((frame.copy(), path))
+        except queue.Full:
+            with self._lock:
+                self._stats['dropped'] += 1
+            return None
+
+        with self._lock:
+            self._stats['queued'] += 1
+            self._last[key] = (fingerprint, path, now)
+            if len(self._last) > 10000:
+                self._expire(now)
+        return path
+
+    def forget(self, key):
+        """Lupakan screenshot terakhir sesi (dipanggil saat sesi selesai)"""
+        with self._lock:
+            self._last.pop(key, None)
+
+    def _expire(self, now):
+        expired = [k for k, (_, _, t) in self._last.items() if now - t >= self.dedup_window]
+        for k in expired:
+            del self._last[k]
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            frame, path = item
+            try:
+                self._write(frame, path)
+            except Exception as e:
+                with self._lock:
+                    self._stats['failed'] += 1
+                print(f"Error menyimpan screenshot {path}: {e}")
+
+    def _write(self, frame, path):
+        if os.path.exists(path):
+            return
+        h, w = frame.shape[:2]
+        if w > self.max_width:
+            frame = cv2.resize(frame, (self.max_width, int(h * self.max_width / w)),
+                               interpolation=cv2.INTER_AREA)
+        ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            raise ValueError("encode JPEG gagal")
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(encoded.tobytes())
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._stats['written'] += 1
+            self._stats['bytes'] += len(encoded)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['pending'] = self._queue.qsize()
+        return stats
+
+
+# Satu writer per proses (server web atau worker proctor)
+screenshot_writer = ScreenshotWriter()
@@ -0,0 +1,265 @@
+import csv
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+from sqlalchemy import MetaData, Table, select
+from sqlalchemy.exc import IntegrityError
+
+# Pengaturan import/export bank soal
+IMPORT_CONFIG = {
+    'chunk_size': 1000,  # baris per bulk insert (dan per checkpoint)
+    'export_chunk': 1000,
+}
+
+SOAL_FIELDS = ['pertanyaan', 'pilihan_a', 'pilihan_b', 'pilihan_c', 'pilihan_d',
+               'jawaban_benar', 'kategori', 'tingkat_kesulitan']
+MAX_LENGTH = {'pilihan_a': 255, 'pilihan_b': 255, 'pilihan_c': 255, 'pilihan_d': 255,
+              'kategori': 50, 'tingkat_kesulitan': 20}
+TINGKAT_KESULITAN = ('mudah', 'sedang', 'sulit')
+
+
+class SoalValidationError(ValueError):
+    """Baris input tidak valid sebagai soal"""
+
+
+def soal_hash(pertanyaan, pilihan_a, pilihan_b, pilihan_c, pilihan_d):
+    """Hash isi soal untuk deduplikasi; spasi dan huruf besar/kecil diabaikan"""
+    parts = [' '.join(str(value or '').split()).casefold()
+             for value in (pertanyaan, pilihan_a, pilihan_b, pilihan_c, pilihan_d)]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def validate_row(row):
+    """Normalisasi satu baris input; raise SoalValidationError jika tidak valid"""
+    soal = {}
+    for field in SOAL_FIELDS:
+        value = row.get(field)
+        soal[field] = str(value).strip() if value is not None else ''
+
+    for field in SOAL_FIELDS[:7]:
+        if not soal[field]:
+            raise SoalValidationError(f"kolom {field} kosong")
+    for field, limit in MAX_LENGTH.items():
+        if len(soal[field]) > limit:
+            raise SoalValidationError(f"kolom {field} lebih dari {limit} karakter")
+
+    soal['jawaban_benar'] = soal['jawaban_benar'].upper()
+    if soal['jawaban_benar'] not in ('A', 'B', 'C', 'D'):
+        raise SoalValidationError(f"jawaban_benar harus A-D, bukan {soal['jawaban_benar']!r}")
+    soal['tingkat_kesulitan'] = (soal['tingkat_kesulitan'] or 'sedang').lower()
+    if soal['tingkat_kesulitan'] not in TINGKAT_KESULITAN:
+        raise SoalValidationError(f"tingkat_kesulitan tidak dikenal: {soal['tingkat_kesulitan']!r}")
+
+    soal['soal_hash'] = soal_hash(*(soal[field] for field in SOAL_FIELDS[:5]))
+    return soal
+
+
+def detect_format(path, fmt=None):
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt not in ('csv', 'jsonl'):
+        raise ValueError(f"Format tidak didukung: {fmt} (csv atau jsonl)")
+    return fmt
+
+
+def read_rows(path, fmt=None):
+    """Generator (nomor_baris, dict) dari file CSV (dengan header) atau JSONL"""
+    fmt = detect_format(path, fmt)
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if fmt == 'csv':
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                yield line_no, row
+        else:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield line_no, SoalValidationError(f"JSON tidak valid: {e}")
+                    continue
+                yield line_no, row if isinstance(row, dict) else SoalValidationError("baris bukan objek JSON")
+
+
+class ImportReport:
+    def __init__(self):
+        self.read = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.skipped = 0  # sudah diproses sebelum resume
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            'read': self.read,
+            'inserted': self.inserted,
+            'duplicates': self.duplicates,
+            'invalid': self.invalid,
+            'skipped': self.skipped,
+            'elapsed': round(self.elapsed, 2),
+            'rows_per_sec': round(self.rows_per_sec, 1),
+        }
+
+
+class Checkpoint:
+    """Posisi terakhir yang sudah di-commit, disimpan di samping file input
+
+    Checkpoint hanya berlaku untuk file yang sama (ukuran dan mtime); import yang
+    gagal di tengah jalan dilanjutkan dari chunk terakhir yang berhasil.
+    """
+
+    def __init__(self, source_path, path=None):
+        self.source_path = source_path
+        self.path = path or source_path + '.checkpoint'
+        stat = os.stat(source_path)
+        self.fingerprint = {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if data.get('fingerprint') != self.fingerprint:
+            return 0
+        return data.get('rows_done', 0)
+
+    def save(self, rows_done):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'fingerprint': self.fingerprint, 'rows_done': rows_done}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _bank_soal_table(engine):
+    return Table('bank_soal', MetaData(), autoload_with=engine)
+
+
+def _insert_chunk(engine, table, chunk, report):
+    """Insert satu chunk, lewati soal yang hash-nya sudah ada di database"""
+    unique = {}
+    for soal in chunk:
+        if soal['soal_hash'] in unique:
+            report.duplicates += 1
+        else:
+            unique[soal['soal_hash']] = soal
+
+    for attempt in range(2):
+        with engine.connect() as conn:
+            existing = {row[0] for row in conn.execute(
+                select(table.c.soal_hash).where(table.c.soal_hash.in_(list(unique)))
+            )}
+            # Insert Core tidak menjalankan default Python model (BankSoal.created_at)
+            created_at = datetime.utcnow()
+            rows = [dict(soal, created_at=created_at) for h, soal in unique.items() if h not in existing]
+            try:
+                if rows:
+                    conn.execute(table.insert(), rows)
+                conn.commit()
+            except IntegrityError:
+                # Proses lain menyisipkan soal yang sama di antara SELECT dan INSERT
+                conn.rollback()
+                if attempt:
+                    raise
+                continue
+        report.duplicates += len(unique) - len(rows)
+        report.inserted += len(rows)
+        return
+
+
+def import_soal(engine, path, fmt=None, chunk_size=None, resume=True, error_log=None, progress=None):
+    """Import bank soal secara streaming dari CSV/JSONL
+
+    Memori dibatasi satu chunk; deduplikasi memakai kolom soal_hash (unique index)
+    sehingga import ulang file yang sama tidak menggandakan soal. error_log (file
+    terbuka) menerima baris yang tidak valid dalam format JSONL. progress(report)
+    dipanggil setiap chunk di-commit.
+    """
+    chunk_size = chunk_size or IMPORT_CONFIG['chunk_size']
+    table = _bank_soal_table(engine)
+    checkpoint = Checkpoint(path)
+    rows_done = checkpoint.load() if resume else 0
+
+    report = ImportReport()
+    start = time.perf_counter()
+    chunk = []
+    position = 0
+
+    def flush():
+        _insert_chunk(engine, table, chunk, report)
+        chunk.clear()
+        checkpoint.save(position)
+        report.elapsed = time.perf_counter() - start
+        if progress:
+            progress(report)
+
+    for line_no, row in read_rows(path, fmt):
+        position += 1
+        if position <= rows_done:
+            report.skipped += 1
+            continue
+        report.read += 1
+        try:
+            if isinstance(row, Exception):
+                raise row
+            chunk.append(validate_row(row))
+        except SoalValidationError as e:
+            report.invalid += 1
+            if error_log is not None:
+                error_log.write(json.dumps({'line': line_no, 'error': str(e), 'row': row
+                                            if isinstance(row, dict) else None}) + '\n')
+            continue
+        if len(chunk) >= chunk_size:
+            flush()
+
+    if chunk:
+        flush()
+    checkpoint.clear()
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def iter_soal(engine, kategori=None, chunk_size=None):
+    """Generator baris bank soal urut id, diambil per chunk dengan keyset (bukan OFFSET)"""
+    chunk_size = chunk_size or IMPORT_CONFIG['export_chunk']
+    table = _bank_soal_table(engine)
+    columns = [table.c.id] + [table.c[field] for field in SOAL_FIELDS]
+    last_id = 0
+    while True:
+        query = select(*columns).where(table.c.id > last_id)
+        if kategori:
+            query = query.where(table.c.kategori == kategori)
+        with engine.connect() as conn:
+            rows = conn.execute(query.order_by(table.c.id).limit(chunk_size)).all()
+        if not rows:
+            return
+        for row in rows:
+            yield dict(row._mapping)
+        last_id = rows[-1].id
+
+
+def export_soal(engine, out, fmt, kategori=None):
+    """Tulis bank soal ke file terbuka out (CSV/JSONL); return jumlah baris"""
+    fmt = detect_format('', fmt)
+    count = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(out, fieldnames=SOAL_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+    for soal in iter_soal(engine, kategori):
+        if fmt == 'csv':
+            writer.writerow(soal)
+        else:
+            out.write(json.dumps({field: soal[field] for field in SOAL_FIELDS}, ensure_ascii=False) + '\n')
+        count += 1
+    return count
@@ -10,6 +10,8 @@ class UjianProctor {
         this.currentSoal = 1;
         this.totalSoal = 0;
         this.jawaban = {};
+        this.pendingChanges = {};
+        this.saveSeq = 0;
         this.isExamActive = true;
         
         this.initializeExam();
@@ -55,6 +57,7 @@ class UjianProctor {
             if (e.target.type === 'radio' && e.target.name.startsWith('soal_')) {
                 const soalId = e.target.name.split('_')[1];
                 this.jawaban[soalId] = e.target.value;
+                this.pendingChanges[soalId] = e.target.value;
                 this.updateNavigationButton(soalId);
                 this.saveProgress();
             }
@@ -125,14 +128,43 @@ class UjianProctor {
         // Start video monitoring
         this.initializeCamera();
         
-        // Check proctor status periodically
-        this.proctorInterval = setInterval(() => {
-            this.checkProctorStatus();
-        }, 2000);
+        // Receive proctor events pushed by the server
+        if (window.EventSource) {
+            this.proctorStream = new EventSource(`/api/proctor/stream/${this.ujianId}`);
+            
+            this.proctorStream.addEventListener('violation', (e) => {
+                this.handleViolationFromBackend(JSON.parse(e.data));
+            });
+            
+            this.proctorStream.addEventListener('end_exam', () => {
+                this.endExam('Terlalu banyak pelanggaran');
+            });
+        } else {
+            // Fallback: check proctor status periodically
+            this.proctorInterval = setInterval(() => {
+                this.checkProctorStatus();
+            }, 2000);
+        }
     }
     
     initializeCamera() {
-        navigator.mediaDevices.getUserMedia({ video: true, audio: false })
+        // Resolusi capture ditentukan server agar sesuai ukuran input detektor
+        fetch('/api/proctor/capture-config')
+            .then(response => response.json())
+            .catch(() => ({}))
+            .then(config => {
+                this.captureConfig = Object.assign({
+                    max_width: 640, max_height: 480, jpeg_quality: 0.7, interval_ms: 1000
+                }, config);
+                
+                return navigator.mediaDevices.getUserMedia({
+                    video: {
+                        width: { ideal: this.captureConfig.max_width },
+                        height: { ideal: this.captureConfig.max_height }
+                    },
+                    audio: false
+                });
+            })
             .then((stream) => {
                 const video = document.getElementById('videoElement');
                 video.srcObject = stream;
@@ -151,12 +183,16 @@ class UjianProctor {
         const video = document.getElementById('videoElement');
         const canvas = document.createElement('canvas');
         const ctx = canvas.getContext('2d');
+        const config = this.captureConfig;
         
         setInterval(() => {
             if (video.videoWidth > 0 && this.isExamActive) {
-                canvas.width = video.videoWidth;
-                canvas.height = video.videoHeight;
-                ctx.drawImage(video, 0, 0);
+                // Perkecil ke batas resolusi dari server (kamera bisa mengabaikan permintaan ideal)
+                const scale = Math.min(1, config.max_width / video.videoWidth,
+                                       config.max_height / video.videoHeight);
+                canvas.width = Math.round(video.videoWidth * scale);
+                canvas.height = Math.round(video.videoHeight * scale);
+                ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
                 
                 canvas.toBlob((blob) => {
                     const formData = new FormData();
@@ -169,14 +205,20 @@ class UjianProctor {
                     })
                     .then(response => response.json())
                     .then(data => {
-                        if (data.violation) {
-                            this.handleViolationFromBackend(data);
+                        if (data.violations) {
+                            data.violations.forEach(violation => {
+                                this.handleViolationFromBackend(violation);
+                            });
+                        }
+                        
+                        if (data.should_end_exam) {
+                            this.endExam('Terlalu banyak pelanggaran');
                         }
                     })
                     .catch(err => console.error('Error sending frame:', err));
-                }, 'image/jpeg', 0.7);
+                }, 'image/jpeg', config.jpeg_quality);
             }
-        }, 1000); // Send frame every second
+        }, config.interval_ms);
     }
     
     checkProctorStatus() {
@@ -352,7 +394,13 @@ class UjianProctor {
             timeLeft: this.timeLeft
         }));
         
-        // Send to backend
+        // Send only changed answers to backend, numbered so the server can merge idempotently
+        const changes = this.pendingChanges;
+        if (Object.keys(changes).length === 0) return;
+        
+        this.pendingChanges = {};
+        this.saveSeq++;
+        
         fetch('/api/ujian/save-progress', {
             method: 'POST',
             headers: {
@@ -360,8 +408,21 @@ class UjianProctor {
             },
             body: JSON.stringify({
                 ujian_id: this.ujianId,
-                jawaban: this.jawaban
+                seq: this.saveSeq,
+                changes: changes
             })
+        })
+        .then(response => {
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        })
+        .catch(err => {
+            // Requeue failed changes unless the answer has changed again since
+            Object.entries(changes).forEach(([soalId, value]) => {
+                if (!(soalId in this.pendingChanges)) {
+                    this.pendingChanges[soalId] = value;
+                }
+            });
+            console.error('Error saving progress:', err);
         });
     }
     
@@ -385,11 +446,13 @@ class UjianProctor {
     }
     
     endExam(reason) {
+        if (!this.isExamActive) return;
         this.isExamActive = false;
         
         // Clear intervals
         if (this.timerInterval) clearInterval(this.timerInterval);
         if (this.proctorInterval) clearInterval(this.proctorInterval);
+        if (this.proctorStream) this.proctorStream.close();
         
         // Stop camera
         const video = document.getElementById('videoElement');
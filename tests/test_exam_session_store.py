@@ -0,0 +1,98 @@
+"""Merge jawaban bernomor urut (seq) di store sesi ujian, backend memory dan Redis (Lua)"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exam_session_store import MemoryExamSessionStore, RedisExamSessionStore  # noqa: E402
+
+TTL = 600
+
+
+def redis_client():
+    """Redis sungguhan dari EXAM_SESSION_TEST_REDIS_URL, atau fakeredis dengan dukungan Lua"""
+    url = os.environ.get('EXAM_SESSION_TEST_REDIS_URL')
+    if url:
+        redis = pytest.importorskip('redis')
+        client = redis.Redis.from_url(url, decode_responses=True)
+        client.flushdb()
+        return client
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def store(request):
+    if request.param == 'memory':
+        store = MemoryExamSessionStore()
+    else:
+        store = RedisExamSessionStore(client=redis_client())
+    store.create(1, 10, [101, 102, 103], '2026-01-01T08:00:00', TTL)
+    return store
+
+
+def test_missing_session(store):
+    assert store.save_answers(2, 10, {'101': 'A'}, 1) is None
+    assert store.get(2, 10) is None
+    assert not store.is_active(2, 10)
+
+
+def test_stale_seq_is_rejected(store):
+    assert store.save_answers(1, 10, {'101': 'A'}, 2) == 1
+    # Autosave lama yang datang terlambat tidak menimpa jawaban yang lebih baru
+    assert store.save_answers(1, 10, {'101': 'B'}, 1) == 0
+    session = store.get(1, 10)
+    assert session['jawaban'] == {'101': 'A'}
+    assert session['seq'] == 2
+
+
+def test_replayed_seq_is_idempotent(store):
+    assert store.save_answers(1, 10, {'101': 'A', '102': 'B'}, 1) == 2
+    assert store.save_answers(1, 10, {'101': 'A', '102': 'B'}, 1) == 0
+    assert store.get(1, 10)['jawaban'] == {'101': 'A', '102': 'B'}
+
+
+def test_merge_is_per_question(store):
+    store.save_answers(1, 10, {'101': 'A'}, 1)
+    store.save_answers(1, 10, {'102': 'C'}, 3)
+    # Delta seq 2 lebih baru untuk soal 101, tapi lebih lama untuk soal 102
+    assert store.save_answers(1, 10, {'101': 'B', '102': 'D'}, 2) == 1
+    session = store.get(1, 10)
+    assert session['jawaban'] == {'101': 'B', '102': 'C'}
+    assert session['seq'] == 3
+
+
+def test_create_resets_answers(store):
+    store.save_answers(1, 10, {'101': 'A'}, 5)
+    store.create(1, 10, [104], '2026-01-01T09:00:00', TTL)
+    session = store.get(1, 10)
+    assert session['soal_ids'] == [104]
+    assert session['jawaban'] == {} and session['seq'] == 0
+    assert store.save_answers(1, 10, {'104': 'A'}, 1) == 1
+
+
+def test_concurrent_saves_keep_highest_seq(store):
+    seqs = list(range(1, 41))
+    threads = [threading.Thread(target=store.save_answers, args=(1, 10, {'101': f'P{seq}'}, seq))
+               for seq in reversed(seqs)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    session = store.get(1, 10)
+    assert session['jawaban'] == {'101': 'P40'}
+    assert session['seq'] == 40
+
+
+def test_memory_session_expires():
+    store = MemoryExamSessionStore()
+    store.create(1, 10, [101], '2026-01-01T08:00:00', 0.05)
+    assert store.save_answers(1, 10, {'101': 'A'}, 1) == 1
+    time.sleep(0.1)
+    assert store.get(1, 10) is None
+    assert store.save_answers(1, 10, {'101': 'B'}, 2) is None
@@ -0,0 +1,146 @@
+"""LatestFrameBuffer: double buffer dengan seqlock, lokal dan shared memory"""
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_buffer import LatestFrameBuffer  # noqa: E402
+
+SHAPE = (120, 160, 3)
+
+
+def frame(value, shape=SHAPE):
+    return np.full(shape, value % 256, dtype=np.uint8)
+
+
+def assert_consistent(seq, image):
+    # Setiap frame diisi satu nilai (seq % 256): frame robek berisi campuran nilai
+    assert image.min() == image.max() == seq % 256
+
+
+def _write_frames(name, count):
+    buffer = LatestFrameBuffer.attach(name)
+    try:
+        for seq in range(1, count + 1):
+            buffer.write(frame(seq))
+    finally:
+        buffer.close()
+
+
+def test_empty_buffer():
+    buffer = LatestFrameBuffer(SHAPE)
+    assert buffer.read() == (0, None)
+    assert buffer.seq == 0
+
+
+def test_read_returns_latest_and_honours_newer_than():
+    buffer = LatestFrameBuffer(SHAPE)
+    assert buffer.write(frame(1)) == 1
+    assert buffer.write(frame(2)) == 2
+
+    seq, image = buffer.read()
+    assert seq == 2
+    assert_consistent(seq, image)
+    assert buffer.read(newer_than=2) == (2, None)
+
+    buffer.write(frame(3, shape=(60, 80, 3)))
+    seq, image = buffer.read(newer_than=2)
+    assert seq == 3 and image.shape == (60, 80, 3)
+
+
+def test_copy_false_returns_view_into_slot():
+    buffer = LatestFrameBuffer(SHAPE)
+    buffer.write(frame(1))
+    _, view = buffer.read(copy=False)
+    _, copied = buffer.read()
+    buffer.write(frame(2))
+    buffer.write(frame(3))
+    # View ikut berubah setelah dua write, salinan tidak
+    assert view[0, 0, 0] == 3
+    assert copied[0, 0, 0] == 1
+
+
+def test_local_buffer_grows_but_shared_buffer_rejects_larger_frames():
+    local = LatestFrameBuffer((10, 10, 3))
+    local.write(frame(1, shape=(20, 20, 3)))
+    assert local.capacity == (20, 20, 3)
+
+    shared = LatestFrameBuffer((10, 10, 3), shared=True)
+    try:
+        with pytest.raises(ValueError):
+            shared.write(frame(1, shape=(20, 20, 3)))
+    finally:
+        shared.close()
+
+
+def test_attach_reads_owner_frames_and_owner_unlinks():
+    owner = LatestFrameBuffer(SHAPE, shared=True)
+    reader = LatestFrameBuffer.attach(owner.name)
+    try:
+        owner.write(frame(7))
+        seq, image = reader.read()
+        assert seq == 1 and image[0, 0, 0] == 7
+        assert reader.capacity == SHAPE
+    finally:
+        reader.close()
+        name = owner.name
+        owner.close()
+    with pytest.raises(FileNotFoundError):
+        LatestFrameBuffer.attach(name)
+
+
+def test_reader_never_sees_torn_frame_from_thread():
+    buffer = LatestFrameBuffer(SHAPE)
+    stop = threading.Event()
+
+    def writer():
+        seq = 0
+        while not stop.is_set():
+            seq += 1
+            buffer.write(frame(seq))
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    reads = 0
+    try:
+        deadline = time.monotonic() + 0.5
+        while time.monotonic() < deadline:
+            seq, image = buffer.read()
+            if image is not None:
+                assert_consistent(seq, image)
+                reads += 1
+    finally:
+        stop.set()
+        thread.join()
+    assert reads > 0
+
+
+def test_reader_never_sees_torn_frame_across_processes():
+    buffer = LatestFrameBuffer(SHAPE, shared=True)
+    ctx = multiprocessing.get_context('spawn')
+    process = ctx.Process(target=_write_frames, args=(buffer.name, 20000))
+    process.start()
+    reads = 0
+    try:
+        last = 0
+        while process.is_alive() or buffer.seq != last:
+            seq, image = buffer.read(newer_than=last)
+            if image is None:
+                continue
+            assert seq > last
+            assert_consistent(seq, image)
+            last = seq
+            reads += 1
+        process.join()
+        assert process.exitcode == 0
+        assert buffer.seq == 20000
+    finally:
+        process.join(timeout=5)
+        buffer.close()
+    assert reads > 0
@@ -0,0 +1,124 @@
+"""Budget query view admin/siswa: regresi N+1 gagal di test (QueryBudgetExceeded)"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Database test harus dipasang sebelum app diimport (engine dibuat saat import)
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db')
+
+import app as proctor_app  # noqa: E402
+from query_budget import QueryBudgetExceeded, query_budget  # noqa: E402
+
+ROWS = 5
+
+
+@query_budget(2)
+def hasil_tanpa_profile():
+    # Sengaja N+1: relasi user dan ujian dimuat per baris
+    hasil_list = proctor_app.HasilUjian.query.all()
+    return ', '.join(f"{h.user.nama_lengkap}:{h.ujian.nama_ujian}" for h in hasil_list)
+
+
+proctor_app.app.add_url_rule('/test/hasil-n-plus-1', 'hasil_tanpa_profile', hasil_tanpa_profile)
+
+
+def seed(db):
+    m = proctor_app
+    admin = m.User(username='admin', email='admin@test', password_hash='x', nama_lengkap='Admin', role='admin')
+    siswa = [m.User(username=f'siswa{i}', email=f'siswa{i}@test', password_hash='x',
+                    nama_lengkap=f'Siswa {i}', role='siswa') for i in range(ROWS)]
+    ujian = [m.Ujian(nama_ujian=f'Ujian {i}', kategori=f'k{i}', jumlah_soal=2, durasi_menit=30)
+             for i in range(ROWS)]
+    soal = [m.BankSoal(pertanyaan=f'Soal {i}', pilihan_a='a', pilihan_b='b', pilihan_c='c', pilihan_d='d',
+                       jawaban_benar='A', kategori=f'k{i % ROWS}') for i in range(ROWS * 2)]
+    db.session.add_all([admin, *siswa, *ujian, *soal])
+    db.session.flush()
+
+    now = datetime.utcnow()
+    for i, user in enumerate(siswa):
+        for j, u in enumerate(ujian[:2]):
+            db.session.add(m.HasilUjian(user_id=user.id, ujian_id=u.id, jawaban='{}', nilai=50.0 + i,
+                                        waktu_mulai=now - timedelta(minutes=30), waktu_selesai=now))
+            db.session.add(m.LogPelanggaran(user_id=user.id, ujian_id=u.id, jenis_pelanggaran=f'Pelanggaran {j}',
+                                            tingkat_pelanggaran='ringan', timestamp=now - timedelta(seconds=i)))
+    db.session.commit()
+    return admin.id, siswa[0].id
+
+
+@pytest.fixture(scope='module')
+def users():
+    proctor_app.app.config.update(TESTING=True)
+    # Request test tidak boleh berjalan di app context fixture (g ikut terbawa antar request)
+    with proctor_app.app.app_context():
+        proctor_app.db.drop_all()
+        proctor_app.db.create_all()
+        ids = seed(proctor_app.db)
+        # Sama seperti start_background_services: statistik dashboard dipanaskan saat start
+        proctor_app.dashboard_stats.reconcile()
+    yield ids
+    with proctor_app.app.app_context():
+        proctor_app.db.drop_all()
+
+
+def login(user_id):
+    client = proctor_app.app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+    return client
+
+
+@pytest.mark.parametrize('path, budget', [
+    ('/admin/hasil', 3),
+    ('/admin/pelanggaran', 3),
+    ('/admin/peserta', 3),
+    ('/admin/bank-soal', 3),
+])
+def test_admin_views_within_budget(users, path, budget):
+    response = login(users[0]).get(path)
+    assert response.status_code == 200
+    assert int(response.headers['X-Query-Count']) <= budget
+
+
+@pytest.mark.parametrize('per_page, expected', [('-5', 1), ('abc', ROWS), ('2', 2)])
+def test_per_page_is_clamped(users, per_page, expected):
+    response = login(users[0]).get(f'/admin/peserta?per_page={per_page}')
+    assert response.status_code == 200
+    assert response.get_data(as_text=True).count('Siswa ') == expected
+
+
+def test_admin_dashboard_within_budget(users):
+    response = login(users[0]).get('/admin/dashboard')
+    assert response.status_code == 200
+    assert int(response.headers['X-Query-Count']) <= 1
+    body = response.get_data(as_text=True)
+    # Ujian tanpa hasil/pelanggaran tetap punya tautan ke monitoring wall
+    for i in range(ROWS):
+        assert f'Ujian {i}' in body
+    assert body.count('/admin/monitor/') == ROWS
+
+
+def test_admin_dashboard_cold_stats_count_against_budget(users):
+    # Rekonsiliasi saat request tidak boleh lolos dari hitungan budget
+    proctor_app.dashboard_stats._loaded = False
+    try:
+        with pytest.raises(QueryBudgetExceeded):
+            login(users[0]).get('/admin/dashboard')
+    finally:
+        with proctor_app.app.app_context():
+            proctor_app.dashboard_stats.reconcile()
+
+
+def test_siswa_dashboard_within_budget(users):
+    response = login(users[1]).get('/siswa/dashboard')
+    assert response.status_code == 200
+    assert int(response.headers['X-Query-Count']) <= 4
+
+
+def test_n_plus_1_view_exceeds_budget(users):
+    with pytest.raises(QueryBudgetExceeded):
+        login(users[0]).get('/test/hasil-n-plus-1')
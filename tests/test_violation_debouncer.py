@@ -0,0 +1,100 @@
+"""ViolationDebouncer: hysteresis N-of-M dan token bucket per jenis pelanggaran"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from violation_debouncer import ViolationDebouncer  # noqa: E402
+
+CONFIG = {
+    'levels': {
+        'berat': {'window': 3, 'required': 1, 'release': 0, 'rate': 1 / 5.0, 'burst': 2, 'repeat': 15.0},
+        'ringan': {'window': 5, 'required': 3, 'release': 1, 'rate': 1 / 20.0, 'burst': 1, 'repeat': 30.0},
+    },
+    'types': {},
+}
+
+WAJAH = ('Wajah tidak terdeteksi', 'ringan', None)
+HP = ('Terdeteksi benda terlarang: cell phone', 'berat', None)
+
+
+def run(debouncer, frames, start=0.0, step=1.0):
+    """Jalankan satu daftar temuan per frame; return pesan yang dilaporkan per frame"""
+    emitted = []
+    for i, findings in enumerate(frames):
+        emitted.append([message for message, _, _ in debouncer.observe(findings, now=start + i * step)])
+    return emitted
+
+
+def test_ringan_needs_n_of_m_frames():
+    debouncer = ViolationDebouncer(CONFIG)
+    emitted = run(debouncer, [[WAJAH], [], [WAJAH], [WAJAH], [WAJAH]])
+    assert emitted == [[], [], [], [WAJAH[0]], []]
+    assert debouncer.stats['emitted'] == 1
+    assert debouncer.stats['suppressed'] == 3
+
+
+def test_flickering_finding_is_suppressed():
+    debouncer = ViolationDebouncer(CONFIG)
+    emitted = run(debouncer, [[WAJAH], [], [], [WAJAH], [], []] * 3)
+    assert not any(emitted)
+
+
+def test_ongoing_violation_repeats_after_interval():
+    debouncer = ViolationDebouncer(CONFIG)
+    emitted = run(debouncer, [[WAJAH]] * 40)
+    # Aktif di frame ke-3, lalu diulang setelah repeat (30 detik)
+    assert [i for i, messages in enumerate(emitted) if messages] == [2, 32]
+
+
+def observe_at(debouncer, timeline):
+    """timeline: list (waktu, temuan); return waktu saat ada laporan"""
+    return [now for now, findings in timeline if debouncer.observe(findings, now=now)]
+
+
+def test_hysteresis_release_and_reactivation():
+    debouncer = ViolationDebouncer(CONFIG)
+    # Turun sebentar ke 3 dari 5 frame tidak melepas pelanggaran: tidak ada laporan baru
+    timeline = [(0, [WAJAH]), (1, [WAJAH]), (2, [WAJAH]), (3, []), (4, [WAJAH]), (5, [])]
+    assert observe_at(debouncer, timeline) == [2]
+
+    # Dilepas setelah hit di jendela <= release, lalu butuh 3 hit lagi
+    timeline = [(6, []), (7, []), (8, []), (100, [WAJAH]), (101, [WAJAH]), (102, [WAJAH])]
+    assert observe_at(debouncer, timeline) == [102]
+
+
+def test_berat_is_not_blocked_by_ongoing_ringan():
+    debouncer = ViolationDebouncer(CONFIG)
+    run(debouncer, [[WAJAH]] * 3)
+    findings = debouncer.observe([WAJAH, HP], now=3.0)
+    assert [message for message, _, _ in findings] == [HP[0]]
+
+    debouncer = ViolationDebouncer(CONFIG)
+    run(debouncer, [[WAJAH]] * 2)
+    findings = debouncer.observe([WAJAH, HP], now=2.0)
+    # Pelanggaran berat dilaporkan lebih dulu
+    assert [message for message, _, _ in findings] == [HP[0], WAJAH[0]]
+
+
+def test_token_bucket_limits_flapping_berat():
+    debouncer = ViolationDebouncer(CONFIG)
+    # Benda muncul-hilang setiap 0.4 detik: aktif lagi setiap kali, tapi token habis
+    frames = ([[HP]] + [[]] * 3) * 3 + [[HP]] * 10
+    emitted = run(debouncer, frames, step=0.1)
+    emit_frames = [i for i, messages in enumerate(emitted) if messages]
+    assert emit_frames[:2] == [0, 4]
+    assert debouncer.stats['rate_limited'] > 0
+    # Laporan tertunda dikirim setelah token terisi lagi (0.2 token/detik)
+    assert len(emit_frames) == 2
+    later = debouncer.observe([HP], now=10.0)
+    assert [message for message, _, _ in later] == [HP[0]]
+
+
+def test_screenshot_from_earlier_hit_is_kept_until_emit():
+    debouncer = ViolationDebouncer(CONFIG)
+    debouncer.observe([('Wajah tidak terdeteksi', 'ringan', 'shot-1.jpg')], now=0.0)
+    debouncer.observe([WAJAH], now=1.0)
+    findings = debouncer.observe([WAJAH], now=2.0)
+    assert findings == [('Wajah tidak terdeteksi', 'ringan', 'shot-1.jpg')]
+    findings = debouncer.observe([WAJAH], now=40.0)
+    assert findings == [('Wajah tidak terdeteksi', 'ringan', None)]
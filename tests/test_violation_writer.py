@@ -0,0 +1,135 @@
+"""ViolationWriter: pemulihan spool, dead-letter dan retry flush"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from violation_writer import WRITER_CONFIG, ViolationWriter  # noqa: E402
+
+
+class FakeDatabase:
+    """flush_fn palsu: baris tanpa jenis_pelanggaran ditolak seperti NOT NULL"""
+
+    def __init__(self, down=0):
+        self.rows = []
+        self.down = down  # jumlah panggilan berikutnya yang gagal sementara
+        self.calls = 0
+
+    def insert(self, rows):
+        self.calls += 1
+        if self.down:
+            self.down -= 1
+            raise ConnectionError('database mati')
+        if any(row.get('jenis_pelanggaran') is None for row in rows):
+            raise ValueError('jenis_pelanggaran NOT NULL')
+        self.rows.extend(rows)
+
+
+def row(jenis='Wajah tidak terdeteksi', user_id=1):
+    return {'user_id': user_id, 'ujian_id': 1, 'jenis_pelanggaran': jenis,
+            'tingkat_pelanggaran': 'ringan', 'screenshot_path': None, 'timestamp': '2026-01-01T00:00:00'}
+
+
+@pytest.fixture
+def make_writer(tmp_path):
+    writers = []
+
+    def make(db, **options):
+        options.setdefault('flush_interval', 60)
+        options.setdefault('retry_delay', 0.01)
+        writer = ViolationWriter(db.insert, spool_dir=str(tmp_path / 'spool'), **options)
+        writers.append(writer)
+        return writer
+
+    yield make
+    for writer in writers:
+        writer.stop()
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def test_flush_inserts_and_removes_segments(make_writer):
+    db = FakeDatabase()
+    writer = make_writer(db)
+    for i in range(3):
+        assert writer.enqueue(row(user_id=i))
+    writer.flush()
+
+    assert [r['user_id'] for r in db.rows] == [0, 1, 2]
+    stats = writer.stats()
+    assert stats['flushed'] == 3 and stats['buffered'] == 0 and stats['pending_segments'] == 0
+
+
+def test_recovers_spool_left_by_dead_process(tmp_path, make_writer):
+    spool = tmp_path / 'spool'
+    spool.mkdir()
+    orphan = spool / f'{dead_pid()}-1.jsonl'
+    # Baris terakhir terpotong: proses mati saat menulis
+    orphan.write_text(json.dumps(row(user_id=7)) + '\n' + json.dumps(row(user_id=8)) + '\n{"user_id": 9, "uj')
+    # Spool proses lain yang masih hidup tidak boleh disentuh
+    alive = spool / f'{os.getppid()}-1.jsonl'
+    alive.write_text(json.dumps(row(user_id=99)) + '\n')
+
+    db = FakeDatabase()
+    writer = make_writer(db)
+    writer.start()
+    assert writer.stats()['recovered'] == 2
+    writer.flush()
+
+    assert [r['user_id'] for r in db.rows] == [7, 8]
+    assert not orphan.exists()
+    assert alive.exists()
+
+
+def test_rejected_rows_go_to_dead_letter(tmp_path, make_writer):
+    db = FakeDatabase()
+    writer = make_writer(db)
+    writer.enqueue(row(user_id=1))
+    writer.enqueue(row(jenis=None, user_id=2))
+    writer.enqueue(row(user_id=3))
+    writer.flush()
+
+    assert [r['user_id'] for r in db.rows] == [1, 3]
+    stats = writer.stats()
+    assert stats['dead_lettered'] == 1 and stats['flushed'] == 2 and stats['buffered'] == 0
+
+    dead_letter = tmp_path / 'spool' / WRITER_CONFIG['dead_letter_dir'] / f'{os.getpid()}.jsonl'
+    entries = [json.loads(line) for line in dead_letter.read_text().splitlines()]
+    assert [e['row']['user_id'] for e in entries] == [2]
+    assert 'NOT NULL' in entries[0]['error']
+
+
+def test_transient_error_keeps_rows_for_retry(tmp_path, make_writer):
+    # Bulk insert dan percobaan baris pertama gagal sementara
+    db = FakeDatabase(down=2)
+    writer = make_writer(db)
+    writer.enqueue(row(user_id=1))
+    writer.enqueue(row(user_id=2))
+    writer.flush()
+
+    assert db.rows == []
+    stats = writer.stats()
+    assert stats['buffered'] == 2 and stats['pending_segments'] == 1 and stats['dead_lettered'] == 0
+    segments = [name for name in os.listdir(tmp_path / 'spool') if name.endswith('.jsonl')]
+    assert segments
+
+    writer.flush()
+    assert [r['user_id'] for r in db.rows] == [1, 2]
+    assert writer.stats()['buffered'] == 0
+
+
+def test_full_buffer_rejects_rows(make_writer):
+    db = FakeDatabase(down=10 ** 6)
+    writer = make_writer(db, max_buffer=2)
+    assert writer.enqueue(row())
+    assert writer.enqueue(row())
+    assert not writer.enqueue(row())
+    assert writer.stats()['rejected'] == 1
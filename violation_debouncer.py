@@ -0,0 +1,143 @@
+import time
+from collections import deque
+
+# Pengaturan debounce pelanggaran per jenis. Jendela dihitung dalam frame
+# (browser mengirim 1 frame/detik). Sebuah jenis pelanggaran menjadi aktif jika
+# muncul di minimal `required` dari `window` frame terakhir, dan baru dianggap
+# selesai jika jumlahnya turun ke `release` atau kurang (hysteresis). Setiap
+# laporan memakai token dari bucket per jenis (`burst` token, terisi `rate`
+# token/detik); selama masih aktif, laporan diulang tiap `repeat` detik.
+DEBOUNCE_CONFIG = {
+    'levels': {
+        # Pelanggaran berat langsung dilaporkan dan tidak terhalang jenis lain
+        'berat': {'window': 3, 'required': 1, 'release': 0, 'rate': 1 / 5.0, 'burst': 2, 'repeat': 15.0},
+        'ringan': {'window': 5, 'required': 3, 'release': 1, 'rate': 1 / 20.0, 'burst': 1, 'repeat': 30.0},
+    },
+    'types': {
+        # Posisi bahu/kepala di batas ambang mudah berkedip antar frame
+        'Bahu tidak terlihat dengan jelas': {'window': 10, 'required': 8, 'release': 3, 'repeat': 60.0},
+        'Kepala terlalu sering menengok ke kiri': {'window': 8, 'required': 5, 'release': 2},
+        'Kepala terlalu sering menengok ke kanan': {'window': 8, 'required': 5, 'release': 2},
+    },
+}
+
+LEVEL_ORDER = {'berat': 0, 'ringan': 1}
+
+
+def debounce_settings(message, level, config=None):
+    config = config or DEBOUNCE_CONFIG
+    settings = dict(config['levels'].get(level, config['levels']['ringan']))
+    settings.update(config['types'].get(message, {}))
+    return settings
+
+
+class _TypeState:
+    """Status debounce satu jenis pelanggaran dalam satu sesi"""
+
+    def __init__(self, level, settings, now):
+        self.level = level
+        self.settings = settings
+        self.history = deque(maxlen=settings['window'])
+        self.hits = 0
+        self.active = False
+        self.pending = False
+        self.last_emit = None
+        self.tokens = float(settings['burst'])
+        self.refilled_at = now
+        self.screenshot_path = None
+
+    def observe(self, hit, now):
+        if len(self.history) == self.history.maxlen:
+            self.hits -= self.history[0]
+        self.history.append(1 if hit else 0)
+        self.hits += 1 if hit else 0
+
+        if not self.active and self.hits >= self.settings['required']:
+            self.active = True
+            self.pending = True
+        elif self.active and self.hits <= self.settings['release']:
+            self.active = False
+            self.pending = False
+
+        repeat = self.settings.get('repeat')
+        if self.active and repeat and self.last_emit is not None and now - self.last_emit >= repeat:
+            self.pending = True
+
+    def _refill(self, now):
+        self.tokens = min(float(self.settings['burst']),
+                          self.tokens + (now - self.refilled_at) * self.settings['rate'])
+        self.refilled_at = now
+
+    def take_token(self, now):
+        self._refill(now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def idle(self, now):
+        """Tidak aktif, jendela bersih dan bucket sudah penuh lagi: state boleh dibuang"""
+        if self.active or self.hits:
+            return False
+        self._refill(now)
+        return self.tokens >= self.settings['burst']
+
+
+class ViolationDebouncer:
+    """Debounce pelanggaran per (sesi, jenis pelanggaran)
+
+    Dipanggil sekali per frame dengan semua temuan frame itu. Setiap jenis punya
+    jendela hysteresis dan token bucket sendiri, sehingga pelanggaran yang terus
+    berlangsung (mis. wajah tidak terdeteksi) tidak menutupi pelanggaran berat
+    lain yang muncul bersamaan, sementara temuan yang berkedip antar frame tidak
+    membanjiri callback dan database.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or DEBOUNCE_CONFIG
+        self._states = {}
+        self.stats = {'observed': 0, 'emitted': 0, 'suppressed': 0, 'rate_limited': 0}
+
+    def observe(self, findings, now=None):
+        """findings: list (message, level, screenshot_path) dari satu frame
+
+        Return list temuan yang perlu dilaporkan, pelanggaran berat lebih dulu.
+        """
+        now = time.time() if now is None else now
+        seen = {}
+        for message, level, screenshot_path in findings:
+            self.stats['observed'] += 1
+            # Satu frame bisa menghasilkan temuan yang sama lebih dari sekali
+            if message not in seen or (screenshot_path and not seen[message][1]):
+                seen[message] = (level, screenshot_path)
+
+        for message, (level, screenshot_path) in seen.items():
+            if message not in self._states:
+                self._states[message] = _TypeState(level, debounce_settings(message, level, self.config), now)
+            if screenshot_path:
+                self._states[message].screenshot_path = screenshot_path
+
+        emitted = []
+        for message, state in list(self._states.items()):
+            hit = message in seen
+            state.observe(hit, now)
+            if hit and not state.pending:
+                self.stats['suppressed'] += 1
+            if state.pending:
+                if state.take_token(now):
+                    state.pending = False
+                    state.last_emit = now
+                    emitted.append((message, state.level, state.screenshot_path))
+                    state.screenshot_path = None
+                else:
+                    self.stats['rate_limited'] += 1
+            if state.idle(now):
+                # Jenis yang sudah lama tidak muncul dibuang agar state tidak menumpuk
+                del self._states[message]
+
+        self.stats['emitted'] += len(emitted)
+        emitted.sort(key=lambda finding: LEVEL_ORDER.get(finding[1], len(LEVEL_ORDER)))
+        return emitted
+
+    def reset(self):
+        self._states.clear()
@@ -0,0 +1,275 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Pengaturan penulis log pelanggaran
+WRITER_CONFIG = {
+    'spool_dir': 'instance/violation_spool',
+    'max_batch_size': 500,   # flush segera jika buffer mencapai jumlah ini
+    'flush_interval': 1.0,   # detik, flush berkala walau buffer belum penuh
+    'max_buffer': 20000,     # batas baris yang belum masuk database (backpressure)
+    'retry_delay': 2.0,      # detik menunggu sebelum mencoba ulang flush yang gagal
+    'dead_letter_dir': 'dead_letter',  # subfolder spool untuk baris yang tidak bisa di-insert
+}
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ViolationWriter:
+    """Penulis log pelanggaran di background
+
+    Setiap baris langsung ditulis ke spool file (append-only) lalu ditampung di
+    memori; thread flusher memasukkannya ke database dengan bulk insert. Spool file
+    dihapus setelah commit berhasil, dan spool yang tertinggal dari proses yang
+    crash dimasukkan ulang saat start. Jika crash terjadi tepat setelah commit,
+    baris bisa tercatat dua kali (at-least-once).
+
+    Jika bulk insert gagal, baris dicoba satu per satu. Baris yang gagal dengan
+    error data (permanent_errors) dipindah ke dead-letter spool agar tidak
+    menahan baris lain; error lain (mis. database mati) dicoba ulang nanti.
+    """
+
+    def __init__(self, flush_fn, spool_dir=None, max_batch_size=None, flush_interval=None,
+                 max_buffer=None, retry_delay=None, permanent_errors=(ValueError, KeyError, TypeError)):
+        self.flush_fn = flush_fn
+        self.permanent_errors = permanent_errors
+        self.spool_dir = spool_dir or WRITER_CONFIG['spool_dir']
+        self.max_batch_size = max_batch_size or WRITER_CONFIG['max_batch_size']
+        self.flush_interval = flush_interval or WRITER_CONFIG['flush_interval']
+        self.max_buffer = max_buffer or WRITER_CONFIG['max_buffer']
+        self.retry_delay = retry_delay or WRITER_CONFIG['retry_delay']
+
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._started = False
+        self.is_running = False
+        self._thread = None
+
+        self._buffer = []
+        self._segment_file = None
+        self._segment_path = None
+        self._segment_seq = 0
+        self._pending = deque()  # (path, rows) yang menunggu insert
+        self._buffered = 0
+
+        self._stats = {
+            'enqueued': 0,
+            'flushed': 0,
+            'rejected': 0,
+            'flushes': 0,
+            'flush_failures': 0,
+            'dead_lettered': 0,
+            'recovered': 0,
+            'max_buffered': 0,
+            'last_flush_rows': 0,
+            'last_flush_seconds': 0.0,
+            'total_flush_seconds': 0.0,
+        }
+
+    def start(self):
+        """Pulihkan spool lama lalu jalankan thread flusher"""
+        with self._cond:
+            if self._started:
+                return
+            self._started = True
+            os.makedirs(self.spool_dir, exist_ok=True)
+            self._recover()
+            self._open_segment()
+            self.is_running = True
+
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Flush sisa buffer lalu hentikan thread"""
+        with self._cond:
+            if not self.is_running:
+                return
+            self.is_running = False
+            self._cond.notify()
+        self._thread.join(timeout=10)
+
+    def enqueue(self, row):
+        """Catat satu baris; return False jika buffer penuh (database tertinggal jauh)"""
+        if not self._started:
+            self.start()
+
+        line = json.dumps(row) + '\n'
+        with self._cond:
+            if self._buffered >= self.max_buffer:
+                self._stats['rejected'] += 1
+                return False
+
+            self._segment_file.write(line)
+            self._segment_file.flush()
+            self._buffer.append(row)
+            self._buffered += 1
+            self._stats['enqueued'] += 1
+            self._stats['max_buffered'] = max(self._stats['max_buffered'], self._buffered)
+
+            if len(self._buffer) >= self.max_batch_size:
+                self._cond.notify()
+        return True
+
+    def flush(self):
+        """Paksa flush sekarang (blocking)"""
+        with self._cond:
+            self._rotate()
+        self._flush_pending()
+
+    def stats(self):
+        """Metrik backpressure dan latensi flush"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats['buffered'] = self._buffered
+            stats['pending_segments'] = len(self._pending)
+        stats['avg_flush_seconds'] = (stats['total_flush_seconds'] / stats['flushes']
+                                      if stats['flushes'] else 0.0)
+        return stats
+
+    def _open_segment(self):
+        self._segment_seq += 1
+        self._segment_path = os.path.join(self.spool_dir, f"{os.getpid()}-{self._segment_seq}.jsonl")
+        self._segment_file = open(self._segment_path, 'a', encoding='utf-8')
+
+    def _rotate(self):
+        """Tutup segment aktif dan jadikan antrean flush (dipanggil dengan lock)"""
+        if not self._buffer:
+            return
+        self._segment_file.flush()
+        os.fsync(self._segment_file.fileno())
+        self._segment_file.close()
+        self._pending.append((self._segment_path, self._buffer))
+        self._buffer = []
+        self._open_segment()
+
+    def _recover(self):
+        """Masukkan kembali spool milik proses yang sudah tidak hidup"""
+        for name in sorted(os.listdir(self.spool_dir)):
+            if not name.endswith('.jsonl'):
+                continue
+            try:
+                pid = int(name.split('-', 1)[0])
+            except ValueError:
+                continue
+            if pid != os.getpid() and _pid_alive(pid):
+                continue
+
+            path = os.path.join(self.spool_dir, name)
+            rows = []
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        rows.append(json.loads(line))
+                    except ValueError:
+                        # Baris terakhir bisa terpotong jika proses mati saat menulis
+                        continue
+            if rows:
+                self._pending.append((path, rows))
+                self._buffered += len(rows)
+                self._stats['recovered'] += len(rows)
+            else:
+                os.remove(path)
+
+    def _flush_pending(self):
+        with self._flush_lock:
+            return self._flush_segments()
+
+    def _flush_segments(self):
+        while True:
+            with self._cond:
+                if not self._pending:
+                    return True
+                path, rows = self._pending[0]
+
+            started = time.perf_counter()
+            dead = 0
+            try:
+                self.flush_fn(rows)
+            except Exception as e:
+                print(f"Error flushing violation log: {e}")
+                with self._cond:
+                    self._stats['flush_failures'] += 1
+                dead = self._flush_rows(path, rows)
+                if dead is None:
+                    return False
+            elapsed = time.perf_counter() - started
+
+            os.remove(path)
+            with self._cond:
+                self._pending.popleft()
+                self._buffered -= len(rows)
+                self._stats['flushes'] += 1
+                self._stats['flushed'] += len(rows) - dead
+                self._stats['last_flush_rows'] = len(rows)
+                self._stats['last_flush_seconds'] = elapsed
+                self._stats['total_flush_seconds'] += elapsed
+
+    def _flush_rows(self, path, rows):
+        """Insert baris satu per satu setelah bulk insert gagal
+
+        Return jumlah baris yang masuk dead-letter jika semua baris selesai, atau
+        None jika berhenti karena error sementara; sisa baris ditulis ulang ke segment.
+        """
+        dead = 0
+        for done, row in enumerate(rows):
+            try:
+                self.flush_fn([row])
+            except self.permanent_errors as e:
+                self._dead_letter(row, e)
+                dead += 1
+            except Exception as e:
+                print(f"Error flushing violation log: {e}")
+                remaining = rows[done:]
+                tmp_path = path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.writelines(json.dumps(r) + '\n' for r in remaining)
+                os.replace(tmp_path, path)
+                with self._cond:
+                    self._pending[0] = (path, remaining)
+                    self._buffered -= done
+                    self._stats['flushed'] += done - dead
+                return None
+        return dead
+
+    def _dead_letter(self, row, error):
+        print(f"Baris log pelanggaran dipindah ke dead-letter: {error}")
+        directory = os.path.join(self.spool_dir, WRITER_CONFIG['dead_letter_dir'])
+        os.makedirs(directory, exist_ok=True)
+        entry = {'row': row, 'error': str(error), 'failed_at': time.time()}
+        with open(os.path.join(directory, f"{os.getpid()}.jsonl"), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+        with self._cond:
+            self._stats['dead_lettered'] += 1
+
+    def _run(self):
+        """Loop flusher"""
+        while True:
+            with self._cond:
+                if self.is_running and len(self._buffer) < self.max_batch_size:
+                    self._cond.wait(self.flush_interval)
+                self._rotate()
+                running = self.is_running
+
+            if not self._flush_pending() and running:
+                time.sleep(self.retry_delay)
+            if not running:
+                break
+
+        with self._cond:
+            self._segment_file.close()
+            if not self._buffer and os.path.exists(self._segment_path):
+                os.remove(self._segment_path)